@@ -0,0 +1,27 @@
+"""
+ASGI 진입점 (uvicorn 등)
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 2
+
+- /genai-api/qa_v2: 비동기 뷰 (pybo/views/genai_async_views.py). LangGraph는 공용 이벤트 루프에서 실행되고
+  MCP 연결 풀 / LLM 클라이언트를 공유하므로, 워커 하나가 I/O를 기다리는 QA 요청을 동시에 여러 개 처리
+- 그 외 모든 경로(다른 /genai-api 라우트, 화면, 로그인 등): 기존 Flask 앱을 WSGI 어댑터로 연결 (스레드 풀에서 실행)
+기존 방식(flask run)도 그대로 동작함 (/qa_v2는 Flask 뷰가 같은 공용 루프로 처리)
+"""
+from starlette.applications import Starlette
+from starlette.routing import Mount
+
+try:
+    from a2wsgi import WSGIMiddleware
+except ImportError:  # a2wsgi가 없으면 starlette 내장 어댑터 (폐기 예정)
+    from starlette.middleware.wsgi import WSGIMiddleware
+
+from pybo import create_app
+from pybo.views import genai_async_views
+
+flask_app = create_app()
+
+app = Starlette(routes=[
+    *genai_async_views.routes,
+    Mount("/", app=WSGIMiddleware(flask_app)),
+])
@@ -0,0 +1,213 @@
+"""
+에이전트 벤치마크: 실제 LLM/MCP 호출을 한 번 기록해 두고, 이후에는 네트워크 없이 재생하며 시나리오별로 측정
+- e2e:      기록된 백엔드 지연시간(× --scale)을 포함한 전체 소요시간
+- overhead: 백엔드 지연 0으로 재생했을 때의 소요시간 (에이전트 루프/프롬프트 조립/파싱 등 프레임워크 자체 비용)
+- llm_calls / tool_calls: 실행 한 번에 발생한 LLM/도구 호출 수 (ReAct 반복 횟수 변화 확인)
+
+    # 1) 기록 (RunPod, MCP 서버, DB가 살아 있는 환경에서 한 번)
+    python bench_agent.py record                         # 전체 시나리오
+    python bench_agent.py record --scenario qa_rag report
+
+    # 2) 재생 측정 (노트북, 네트워크 없이)
+    python bench_agent.py run -n 5
+    python bench_agent.py run --scale 0.1 --save bench_before.json
+    python bench_agent.py run --baseline bench_before.json --tolerance 0.2   # 회귀 시 종료 코드 1
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+
+from pybo.service import replay
+
+FIXTURE_DIR = os.path.join(BASE_DIR, "data", "agent_fixtures")
+
+
+@dataclass
+class Scenario:
+    name: str
+    description: str
+    run: Callable[[], str]
+
+
+def _service():
+    from pybo.service.genai_service import get_genai_service
+    return get_genai_service()
+
+
+def _qa_graph(question: str) -> str:
+    from pybo.agent.qa_graph import run_qa
+    return run_qa(question)
+
+
+SCENARIOS = [
+    Scenario("qa_rag", "법령 질문 (RAG)",
+             lambda: _service().answer_qa_with_log("지역아동센터 종사자 인건비 기준에 대해 알려줘")),
+    Scenario("qa_db", "단순 통계 조회 (DB 템플릿, LLM 없음)",
+             lambda: _service().answer_qa_with_log("강남구의 2025년 아동 인구 예측치를 알려줘")),
+    Scenario("qa_mixed", "복합 질문 (RAG + DB)",
+             lambda: _service().answer_qa_with_log("강남구 아동 인구 변화에 맞춰서 필요한 인건비 지원 정책을 추천해줘")),
+    Scenario("qa_graph", "qa_v2 (LangGraph)",
+             lambda: _qa_graph("지역아동센터 인건비 기준 알려줘")),
+    Scenario("report", "보고서 생성",
+             lambda: _service().generate_report_with_data("", district="강남구", start_year=2023, end_year=2030)),
+    Scenario("policy", "정책 제안",
+             lambda: _service().generate_policy("", district="강남구")),
+]
+
+
+def fixture_path(fixture_dir: str, name: str) -> str:
+    return os.path.join(fixture_dir, f"{name}.jsonl")
+
+
+def _reset_caches() -> None:
+    # 반복 실행 시 도구 결과 캐시에 걸려 호출이 줄어들지 않도록 매번 비움
+    from pybo.service.tool_cache import get_tool_cache
+    get_tool_cache().invalidate()
+
+
+def record(scenarios: list[Scenario], fixture_dir: str) -> None:
+    for scenario in scenarios:
+        path = fixture_path(fixture_dir, scenario.name)
+        recorder = replay.record_to(path)
+        _reset_caches()
+        started = time.perf_counter()
+        answer = scenario.run()
+        elapsed = time.perf_counter() - started
+        # 재생 결과가 기록 당시와 같은지 확인용
+        recorder.write({"kind": "meta", "key": "answer", "answer": answer, "elapsed": round(elapsed, 4)})
+        print(f"[record] {scenario.name}: {recorder.count - 1}건 기록, {elapsed:.2f}초 -> {path}")
+        replay.stop()
+
+
+def _percentile(values: list[float], p: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+
+def _measure(scenario: Scenario, fixture: replay.Fixture, runs: int) -> tuple[list[float], dict, bool]:
+    latencies = []
+    last = {}
+    expected = fixture.meta("answer")
+    matches = True
+    for _ in range(runs):
+        fixture.rewind()
+        _reset_caches()
+        started = time.perf_counter()
+        answer = scenario.run()
+        latencies.append(time.perf_counter() - started)
+        last = fixture.stats()
+        if expected is not None and answer != expected["answer"]:
+            matches = False
+    return latencies, last, matches
+
+
+def run(scenarios: list[Scenario], fixture_dir: str, runs: int, scale: float) -> dict:
+    results = {}
+    for scenario in scenarios:
+        path = fixture_path(fixture_dir, scenario.name)
+        if not os.path.exists(path):
+            print(f"[skip] {scenario.name}: 기록 없음 ({path}) - 먼저 record 실행")
+            continue
+
+        fixture = replay.replay_from(path, scale=0.0)
+        scenario.run()  # 워밍업 (모듈 임포트, 그래프 컴파일, 연결 등 1회성 비용 제외)
+        overhead, _, _ = _measure(scenario, fixture, runs)
+
+        fixture.scale = scale
+        e2e, stats, matches = _measure(scenario, fixture, runs)
+        replay.stop()
+
+        results[scenario.name] = {
+            "e2e_p50_ms": round(statistics.median(e2e) * 1000, 2),
+            "e2e_p95_ms": round(_percentile(e2e, 0.95) * 1000, 2),
+            "overhead_p50_ms": round(statistics.median(overhead) * 1000, 2),
+            "backend_ms": round(stats["waited_sec"] * 1000, 2),
+            "llm_calls": stats["llm_calls"],
+            "tool_calls": stats["tool_calls"],
+            "misses": stats["misses"],
+            "answer_match": matches,
+        }
+    return results
+
+
+def print_table(results: dict) -> None:
+    header = f"{'scenario':<10} {'e2e p50':>10} {'e2e p95':>10} {'overhead':>10} {'backend':>10} {'llm':>4} {'tool':>5} {'miss':>5} {'answer':>7}"
+    print(header)
+    print("-" * len(header))
+    for name, r in results.items():
+        print(
+            f"{name:<10} {r['e2e_p50_ms']:>8.1f}ms {r['e2e_p95_ms']:>8.1f}ms {r['overhead_p50_ms']:>8.1f}ms "
+            f"{r['backend_ms']:>8.1f}ms {r['llm_calls']:>4} {r['tool_calls']:>5} {r['misses']:>5} "
+            f"{'same' if r['answer_match'] else 'DIFF':>7}"
+        )
+
+
+def compare(results: dict, baseline: dict, tolerance: float, min_delta_ms: float = 5.0) -> list[str]:
+    """기준 결과 대비 회귀 목록 (시간은 tolerance 비율 + 최소 min_delta_ms 이상 느려진 경우만)"""
+    regressions = []
+    for name, r in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        for key in ("e2e_p50_ms", "overhead_p50_ms"):
+            if r[key] > base[key] * (1 + tolerance) and r[key] - base[key] > min_delta_ms:
+                regressions.append(f"{name}: {key} {base[key]:.1f} -> {r[key]:.1f}")
+        for key in ("llm_calls", "tool_calls"):
+            if r[key] > base[key]:
+                regressions.append(f"{name}: {key} {base[key]} -> {r[key]}")
+        if r["misses"] or not r["answer_match"]:
+            regressions.append(f"{name}: 기록과 다른 요청/답변 (프롬프트 또는 도구 인자 변경 시 다시 record)")
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="에이전트 기록/재생 벤치마크")
+    parser.add_argument("command", choices=["record", "run", "list"])
+    parser.add_argument("--scenario", nargs="*", help="실행할 시나리오 (기본 전체)")
+    parser.add_argument("--fixtures", default=FIXTURE_DIR, help="기록 파일 폴더")
+    parser.add_argument("-n", "--runs", type=int, default=5, help="시나리오별 반복 횟수")
+    parser.add_argument("--scale", type=float, default=1.0, help="재생 지연시간 배율 (0이면 지연 없음)")
+    parser.add_argument("--save", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="허용 지연 증가 비율")
+    args = parser.parse_args()
+
+    scenarios = [s for s in SCENARIOS if not args.scenario or s.name in args.scenario]
+    if args.command == "list":
+        for s in SCENARIOS:
+            print(f"{s.name:<10} {s.description}")
+        return 0
+
+    # 앱/클라이언트를 만들기 전에 기록·재생 계층을 켜 둠 (시나리오마다 파일만 바꿔 가며 사용)
+    replay.install()
+    from pybo import create_app
+    app = create_app()
+    with app.app_context():
+        if args.command == "record":
+            record(scenarios, args.fixtures)
+            return 0
+        results = run(scenarios, args.fixtures, args.runs, args.scale)
+
+    print_table(results)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"[regression] {line}")
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+MCP 도구 호출 마이크로벤치마크: 호출마다 연결 + initialize (기존 방식) vs 연결 풀 (MCPSessionPool)
+
+    python bench_mcp_session.py                              # 로컬 대역 MCP 서버(echo 도구)로 측정
+    python bench_mcp_session.py --url http://127.0.0.1:8000/mcp --tool db_forecast_search --args '{"district": "강남구"}'
+    python bench_mcp_session.py -n 200 -c 8                  # 200회, 동시 8개
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")  # pybo 패키지 임포트용 (DB는 사용하지 않음)
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+
+from pybo.agent.mcp_session_pool import MCPSessionPool
+
+
+def start_echo_server() -> str:
+    """도구 실행 시간이 0인 대역 서버 (연결/프로토콜 오버헤드만 측정)"""
+    import uvicorn
+    from mcp.server.fastmcp import FastMCP
+
+    mcp = FastMCP("bench", log_level="WARNING")
+
+    @mcp.tool()
+    def echo(text: str = "") -> str:
+        return text
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    port = sock.getsockname()[1]
+    sock.close()
+
+    server = uvicorn.Server(uvicorn.Config(mcp.streamable_http_app(), host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return f"http://127.0.0.1:{port}/mcp"
+
+
+def call_per_connection(url: str, tool: str, args: dict) -> str:
+    """기존 ToolClient.call_tool 방식: 호출마다 새 이벤트 루프 + 연결 + initialize"""
+    async def run():
+        async with streamable_http_client(url) as (read, write, _):
+            async with ClientSession(read, write) as session:
+                await session.initialize()
+                res = await session.call_tool(tool, args)
+                return res.content[0].text if res.content else ""
+    return asyncio.run(run())
+
+
+def measure(label: str, fn, n: int, concurrency: int) -> None:
+    fn()  # 워밍업 (풀은 여기서 연결)
+    latencies = []
+
+    def one(_):
+        t = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - t)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(n)))
+    total = time.perf_counter() - started
+
+    latencies.sort()
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"{label:<22} 평균 {statistics.mean(latencies) * 1000:7.2f}ms  "
+          f"p95 {p95 * 1000:7.2f}ms  처리량 {n / total:7.1f}회/초")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MCP 도구 호출 오버헤드 비교")
+    parser.add_argument("--url", help="MCP 서버 주소 (없으면 로컬 대역 서버 사용)")
+    parser.add_argument("--tool", default="echo")
+    parser.add_argument("--args", default='{"text": "ping"}', help="도구 인자 (JSON)")
+    parser.add_argument("-n", type=int, default=100, help="호출 횟수")
+    parser.add_argument("-c", "--concurrency", type=int, default=1, help="동시 호출 수")
+    args = parser.parse_args()
+
+    url = args.url or start_echo_server()
+    tool_args = json.loads(args.args)
+    pool = MCPSessionPool(url, size=max(args.concurrency, 1))
+
+    print(f"{url} / {args.tool} x {args.n}회 (동시 {args.concurrency}개)")
+    measure("호출마다 연결", lambda: call_per_connection(url, args.tool, tool_args), args.n, args.concurrency)
+    measure("연결 풀", lambda: pool.call(args.tool, tool_args), args.n, args.concurrency)
+    print(f"풀 통계: {pool.as_dict()}")
+    pool.close()
+
+
+if __name__ == "__main__":
+    main()
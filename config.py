@@ -18,6 +18,15 @@ print(f" DB 연결 설정 완료: {SQLALCHEMY_DATABASE_URI}")
 
 SQLALCHEMY_TRACK_MODIFICATIONS = False
 
+# 데이터 내보내기(export) 시 한 번에 가져올 행 수 (yield_per 묶음 크기 + Oracle 드라이버 cursor.arraysize)
+EXPORT_FETCH_ARRAYSIZE = int(os.getenv("EXPORT_FETCH_ARRAYSIZE", "1000"))
+
+# SQLAlchemy oracle 방언은 create_engine(arraysize=...)로 받은 값만 cursor.arraysize(네트워크 왕복당 행 수)에 적용함
+# (다른 DB 드라이버는 이 인자를 받지 않으므로 Oracle일 때만 지정)
+SQLALCHEMY_ENGINE_OPTIONS = (
+    {"arraysize": EXPORT_FETCH_ARRAYSIZE} if SQLALCHEMY_DATABASE_URI.startswith("oracle") else {}
+)
+
 # 시크릿 키 가져오기
 SECRET_KEY = os.getenv("FLASK_SECRET_KEY")
 if not SECRET_KEY:
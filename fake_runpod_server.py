@@ -0,0 +1,157 @@
+# 로컬 테스트용 RunPod /generate 대역 서버 (GPU, 네트워크 없이 LLM 클라이언트 테스트)
+# 실행: python fake_runpod_server.py --port 8001 --delay 0.5
+#       RUNPOD_API_URL=http://127.0.0.1:8001/generate
+# 여러 모델 버전 대역: 버전별로 서버를 띄우고 LLM_BACKENDS로 연결
+#       python fake_runpod_server.py --port 8001 --models final
+#       python fake_runpod_server.py --port 8002 --models cp100,cp200
+#       LLM_BACKENDS="final=http://127.0.0.1:8001/generate;cp100,cp200=http://127.0.0.1:8002/generate"
+# 중지 문자열(payload["stop"]): 기본은 백엔드처럼 그 앞에서 생성을 멈춤, --ignore-stop이면 무시하고 끝까지 생성
+# 생성 시간 대역: 토큰(token_size 글자)마다 token_delay초 (스트리밍/일반 응답 공통)
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeRunpodHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status: int, body: dict) -> None:
+        data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_stream(self, text: str) -> None:
+        """글자 몇 개씩 SSE(data: {"token": ...})로 chunked 전송"""
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+        def write_chunk(data: bytes) -> None:
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+
+        size = self.server.token_size
+        try:
+            for i in range(0, len(text), size):
+                event = json.dumps({"token": text[i:i + size]}, ensure_ascii=False)
+                write_chunk(f"data: {event}\n\n".encode("utf-8"))
+                with self.server.lock:
+                    self.server.generated_tokens += 1
+                time.sleep(self.server.token_delay)
+            write_chunk(b"data: [DONE]\n\n")
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # 클라이언트가 중간에 연결을 닫음 -> 생성 중단
+            with self.server.lock:
+                self.server.aborted += 1
+            self.close_connection = True
+
+    def _apply_stop(self, text: str, payload: dict) -> tuple[str, bool]:
+        stops = [s for s in (payload.get("stop") or []) if s]
+        if not self.server.honour_stop or not stops:
+            return text, False
+        positions = [p for p in (text.find(s) for s in stops) if p >= 0]
+        if not positions:
+            return text, False
+        return text[:min(positions)], True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        server = self.server
+
+        with server.lock:
+            server.requests.append(payload)
+            server.active += 1
+            server.max_active = max(server.max_active, server.active)
+        try:
+            if self.path != "/generate":
+                self._send_json(404, {"error": "not found"})
+                return
+            if server.fail_next > 0:
+                with server.lock:
+                    server.fail_next -= 1
+                self._send_json(503, {"error": "busy"})
+                return
+            if server.models and payload.get("model_version") not in server.models:
+                self._send_json(400, {"error": f"model not loaded: {payload.get('model_version')}"})
+                return
+
+            time.sleep(server.delay)
+            text, stopped = self._apply_stop(server.reply(payload), payload)
+            if payload.get("stream"):
+                self._send_stream(text)
+            else:
+                tokens = -(-len(text) // server.token_size)
+                time.sleep(server.token_delay * tokens)
+                with server.lock:
+                    server.generated_tokens += tokens
+                self._send_json(200, {"text": text, "stop_reason": "stop_sequence" if stopped else "eos"})
+        finally:
+            with server.lock:
+                server.active -= 1
+
+
+class FakeRunpodServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, delay: float = 0.0, token_delay: float = 0.0, token_size: int = 3,
+                 models: tuple = (), honour_stop: bool = True):
+        super().__init__(address, FakeRunpodHandler)
+        self.models = tuple(models)       # 지정하면 이 model_version만 처리 (그 외는 400)
+        self.delay = delay                # 첫 응답까지 지연
+        self.token_delay = token_delay    # 스트리밍 시 토큰 간 지연
+        self.token_size = token_size      # 스트리밍 토큰 하나의 글자 수
+        self.honour_stop = honour_stop    # False면 중지 문자열을 무시 (클라이언트 측 중단 테스트용)
+        self.responses: list[str] = []    # 지정하면 순서대로 이 텍스트를 응답
+        self.lock = threading.Lock()
+        self.requests: list[dict] = []
+        self.active = 0
+        self.max_active = 0
+        self.fail_next = 0  # 다음 N개 요청은 503 (재시도 테스트용)
+        self.generated_tokens = 0  # 실제로 생성(전송)한 토큰 수
+        self.aborted = 0           # 클라이언트가 중간에 끊은 스트리밍 응답 수
+
+    def reply(self, payload: dict) -> str:
+        with self.lock:
+            if self.responses:
+                return self.responses.pop(0)
+        return f"[{payload.get('model_version', 'final')}] {payload.get('input', '')[-40:]}"
+
+    @property
+    def url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/generate"
+
+
+def start_fake_server(port: int = 0, delay: float = 0.0, token_delay: float = 0.0,
+                      models: tuple = ()) -> FakeRunpodServer:
+    """테스트 코드에서 백그라운드 스레드로 띄우기"""
+    server = FakeRunpodServer(("127.0.0.1", port), delay=delay, token_delay=token_delay, models=models)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8001)
+    parser.add_argument("--delay", type=float, default=0.5)
+    parser.add_argument("--token-delay", type=float, default=0.05)
+    parser.add_argument("--models", default="", help="처리할 model_version 목록 (쉼표 구분, 비우면 전부)")
+    parser.add_argument("--ignore-stop", action="store_true", help="중지 문자열을 무시하고 끝까지 생성")
+    args = parser.parse_args()
+
+    models = tuple(m.strip() for m in args.models.split(",") if m.strip())
+    srv = FakeRunpodServer(("127.0.0.1", args.port), delay=args.delay, token_delay=args.token_delay, models=models,
+                           honour_stop=not args.ignore_stop)
+    print(f"fake runpod server: {srv.url} (delay={args.delay}s, models={','.join(models) or 'all'})")
+    srv.serve_forever()
@@ -4,18 +4,23 @@ import sys
 BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 sys.path.insert(0, BASE_DIR)
 
-import time
-import requests
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from contextlib import nullcontext
+from typing import Optional
 
 from mcp.server.fastmcp import FastMCP
 from mcp.server.transport_security import TransportSecuritySettings
 
 from pybo.service.rag_service import RagService
+from pybo.service.llm_client import LLMError, get_llm_client
+from pybo.service import metrics
+from pybo.service.tool_cache import get_tool_cache, register_default_versions
+from pybo.agent.tool_transport import app_context, in_process_call
+from pybo.agent.prompts import GENERATION_TASKS, generation_task_input
 from pybo import db
 from pybo.models import RegionForecast
 from sqlalchemy import func
+from starlette.requests import Request
+from starlette.responses import Response
 
 
 # mcp서버 (stateless + json 응답 권장 설정 패턴)
@@ -38,30 +43,40 @@ mcp = FastMCP(
     ),
 )
 
-# Runpod 호출 세션
-RUNPOD_URL = os.getenv("RUNPOD_API_URL")
-
-session = requests.Session()
-retry = Retry(
-    total=2,
-    backoff_factor=0.6,
-    status_forcelist=(429,500,502,503,504),
-    allowed_methods=frozenset(["POST"]),
-    raise_on_status=False,
-)
-adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=10)
-session.mount("http://", adapter)
-session.mount("https://", adapter)
+# Runpod 호출 클라이언트 (비동기, keep-alive 풀 + 동시성 제한, model_version별 백엔드 라우팅)
+llm_client = get_llm_client()
 
 DEFAULT_TEMP = 0.3
 DEFAULT_MAX_NEW_TOKENS = 512
 
 rag = RagService()
 
+# 도구 결과 캐시 (같은 질문/조회 조건이면 인덱스·DB 조회 생략, 데이터/인덱스 버전이 바뀌면 무효화)
+tool_cache = get_tool_cache()
+register_default_versions(tool_cache, app_context)  # inprocess 모드면 ToolClient와 같은 캐시를 공유
+
+
+# Prometheus 수집용 (MCP 서버 프로세스의 LLM/도구 지표)
+@mcp.custom_route("/metrics", methods=["GET"])
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+def _tool_timer(tool: str):
+    # inprocess 호출이면 같은 프로세스의 ToolClient가 같은 지표에 기록하므로 생략
+    return nullcontext() if in_process_call() else metrics.timer(metrics.TOOL_LATENCY, tool=tool)
+
 @mcp.tool()
 def rag_search(question: str) -> str:
     # "질문과 관련된 법령, 지침 근거(RAG 컨텍스트)를 반환"
-    return rag.get_relevant_context(question)
+    args = {"question": question}
+    cached, status = tool_cache.lookup("rag_search", args)
+    print(f"[ToolCache] rag_search cache={status}")
+    if cached is not None:
+        return cached
+    with _tool_timer("rag_search"):
+        context = rag.get_relevant_context(question)
+    tool_cache.put("rag_search", args, context)
+    return context
 
 @mcp.tool()
 def db_forecast_search(district: str = "전체", start_year: int = 2023, end_year: int = 2030) -> str:
@@ -71,6 +86,23 @@ def db_forecast_search(district: str = "전체", start_year: int = 2023, end_yea
     :param start_year: 시작 연도 (기본 2023)
     :param end_year: 종료 연도 (기본 2030)
     """
+    # 기본값을 채운 인자로 키를 만들어 생략 여부와 관계없이 같은 조회는 같은 항목 사용
+    args = {"district": district, "start_year": start_year, "end_year": end_year}
+    cached, status = tool_cache.lookup("db_forecast_search", args)
+    print(f"[ToolCache] db_forecast_search cache={status}")
+    if cached is not None:
+        return cached
+    result = _query_forecast(district, start_year, end_year)
+    tool_cache.put("db_forecast_search", args, result)
+    return result
+
+
+def _query_forecast(district: str, start_year: int, end_year: int) -> str:
+    with _tool_timer("db_forecast_search"):
+        return _query_forecast_rows(district, start_year, end_year)
+
+
+def _query_forecast_rows(district: str, start_year: int, end_year: int) -> str:
     try:
         if district == "전체":
             summary = (
@@ -110,42 +142,35 @@ def db_forecast_search(district: str = "전체", start_year: int = 2023, end_yea
         return f"DB 조회 중 오류 발생: {str(e)}"
 
 @mcp.tool()
-def create_report_task(data_context: str, district: str) -> str:
+async def create_report_task(data_context: str, district: str, model_version: str = "final") -> str:
     """
     수집된 통계 데이터를 바탕으로 서울시 아동복지 보고서를 작성합니다.
     :param data_context: DB 등에서 조회된 통계 데이터 텍스트
     :param district: 대상 자치구 이름
+    :param model_version: 생성에 사용할 모델 버전
     """
-    instruction = (
-        "너는 서울시 아동복지 정책 전문가다. 반드시 한국어로 답해.\n"
-        "제공된 데이터를 바탕으로 아래 형식을 정확히 지켜서 보고서를 작성해. (딱 3줄만, 추가 설명 금지)\n"
-        "- 요약: 한 문장\n"
-        "- 가능 요인: 한 문장\n"
-        "- 추가 데이터: 한 문장\n"
-        "※ 데이터 범위 밖은 추측하지 말고 '자료에 없음'이라고 말해."
-    )
-    input_text = f"지역: {district}\n데이터:\n{data_context}"
-    
+    task = GENERATION_TASKS["create_report_task"]
+    input_text = generation_task_input(district, data_context)
+
     # 내부적으로 llama_generate 도구의 로직을 사용하거나 호출
-    return llama_generate(instruction, input_text, model_version="final", temperature=0.1)
+    return await _generate(task["instruction"], input_text, model_version=model_version,
+                           temperature=task["temperature"], task_type=task["task_type"])
 
 @mcp.tool()
-def create_policy_task(data_context: str, district: str) -> str:
+async def create_policy_task(data_context: str, district: str, model_version: str = "final") -> str:
     """
     통계 데이터를 분석하여 자치구 맞춤형 정책 아이디어 3가지를 제안합니다.
     :param data_context: DB 등에서 조회된 통계 데이터 텍스트
     :param district: 대상 자치구 이름
+    :param model_version: 생성에 사용할 모델 버전
     """
-    instruction = (
-        "너는 서울시 아동복지 정책 전문가다. 반드시 한국어로 답해라.\n"
-        "제공된 데이터를 바탕으로 정책 아이디어 3가지를 한 줄씩만 제시해라. 추가 설명 금지.\n"
-        "형식:\n1) ...\n2) ...\n3) ...\n"
-    )
-    input_text = f"지역: {district}\n데이터:\n{data_context}"
-    return llama_generate(instruction, input_text, model_version="final", temperature=0.3)
+    task = GENERATION_TASKS["create_policy_task"]
+    input_text = generation_task_input(district, data_context)
+    return await _generate(task["instruction"], input_text, model_version=model_version,
+                           temperature=task["temperature"], task_type=task["task_type"])
 
 @mcp.tool()
-def llama_generate(
+async def llama_generate(
     instruction: str,
     input_text: str,
     model_version: str = "final",
@@ -153,38 +178,51 @@ def llama_generate(
     max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS,
     timeout_connect:  float = 10.0,
     timeout_read: float = 180.0,
+    stop: Optional[list[str]] = None,
 ) -> str:
-    # RUNPOD /generate 호출 결과 반환
-    if not RUNPOD_URL:
-        return "RUNPOD_API_URL이 설정되지 않았습니다."
-    
-    start = time.time()
-    payload = {
-        "instruction": instruction,
-        "input": input_text,
-        "model_version": model_version,
-        "max_new_tokens": max_new_tokens,
-        "temperature": temperature,
-    }
+    # RUNPOD /generate 호출 결과 반환 (stop: 이 문자열이 나오면 생성 중단, 결과에는 포함하지 않음)
+    return await _generate(
+        instruction, input_text, model_version, temperature, max_new_tokens,
+        timeout=(timeout_connect, timeout_read), stop=stop,
+    )
+
+
+async def _generate(
+    instruction: str,
+    input_text: str,
+    model_version: str = "final",
+    temperature: float = DEFAULT_TEMP,
+    max_new_tokens: int = DEFAULT_MAX_NEW_TOKENS,
+    timeout: tuple = (10.0, 180.0),
+    task_type: str = "generate",
+    stop: Optional[list[str]] = None,
+) -> str:
+    # 지연시간/토큰 수는 llm_client에서 model_version, task_type별로 기록됨
+    # model_version별 백엔드는 llm_client의 라우터가 선택 (LLM_BACKENDS / RUNPOD_API_URL)
+    if not llm_client.router.has_backend(model_version):
+        return f"model_version={model_version} 에 연결된 LLM 백엔드가 없습니다."
 
     try:
-        res = session.post(
-            RUNPOD_URL,
-            json=payload,
-            headers={"Content-Type": "application/json"},
-            timeout=(timeout_connect, timeout_read)
+        return await llm_client.agenerate(
+            instruction,
+            input_text,
+            model_version=model_version,
+            max_new_tokens=max_new_tokens,
+            temperature=temperature,
+            timeout=timeout,
+            task_type=task_type,
+            stop=stop,
         )
-        if not (200 <= res.status_code < 300):
+
+    except LLMError as e:
+        metrics.FALLBACK_RESPONSES.inc(source="mcp", kind=e.kind)
+        if e.kind == "timeout":
+            return "AI 서버 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
+        if e.kind == "status":
             return "AI 서버 오류로 답변 생성에 실패했습니다. 잠시 후 재시도 해주세요."
-        
-        _elapsed = time.time() - start
-        return (res.json().get("text","") or "").strip()
-    
-    except requests.exceptions.Timeout:
-        return "AI 서버 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
-    except requests.exceptions.RequestException:
         return "AI 서버 통신 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
     except Exception:
+        metrics.FALLBACK_RESPONSES.inc(source="mcp", kind="unknown")
         return "AI 서버 처리 중 알 수 없는 오류가 발생했습니다."
     
 if __name__ == "__main__":
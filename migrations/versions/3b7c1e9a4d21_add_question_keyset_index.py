@@ -0,0 +1,24 @@
+"""add question (create_date, id) index for keyset paging
+
+Revision ID: 3b7c1e9a4d21
+Revises: fee148399c62
+Create Date: 2026-10-19 10:12:05.113402
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7c1e9a4d21'
+down_revision = 'fee148399c62'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_question_create_date_id', 'question', ['create_date', 'id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_question_create_date_id', table_name='question')
@@ -0,0 +1,47 @@
+"""add Oracle Text indexes for Q&A search
+
+Revision ID: 8e2f5a0c7b94
+Revises: 3b7c1e9a4d21
+Create Date: 2026-10-19 11:03:47.520981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2f5a0c7b94'
+down_revision = '3b7c1e9a4d21'
+branch_labels = None
+depends_on = None
+
+# (인덱스명, 테이블, 컬럼) - 한국어 형태소 lexer + 커밋 시 동기화
+CONTEXT_INDEXES = [
+    ('ix_question_subject_ctx', 'question', 'subject'),
+    ('ix_question_content_ctx', 'question', 'content'),
+    ('ix_answer_content_ctx', 'answer', 'content'),
+]
+
+
+def upgrade():
+    # Oracle이 아닌 DB(로컬 SQLite 등)는 인메모리 색인을 사용하므로 생략
+    if op.get_bind().dialect.name != 'oracle':
+        return
+
+    op.execute(
+        "BEGIN ctx_ddl.create_preference('qna_korean_lexer', 'KOREAN_MORPH_LEXER'); END;"
+    )
+    for name, table, column in CONTEXT_INDEXES:
+        op.execute(
+            f"CREATE INDEX {name} ON {table}({column}) INDEXTYPE IS CTXSYS.CONTEXT "
+            "PARAMETERS('LEXER qna_korean_lexer SYNC (ON COMMIT)')"
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'oracle':
+        return
+
+    for name, _, _ in CONTEXT_INDEXES:
+        op.execute(f"DROP INDEX {name}")
+    op.execute("BEGIN ctx_ddl.drop_preference('qna_korean_lexer'); END;")
@@ -0,0 +1,54 @@
+"""
+보고서/정책 사전 생성 (야간 배치)
+
+자치구(전체 + 25개) x 분석 기간 x 모델 버전 조합을 미리 생성해서 genai_precomputed 테이블에 저장한다.
+현재 지역 데이터 버전으로 이미 만들어진 항목은 건너뛴다.
+
+    python precompute_genai_results.py                      # 바뀐 항목만
+    python precompute_genai_results.py --force              # 전부 다시 생성
+    python precompute_genai_results.py --only report -c 4   # 보고서만, 동시 4개
+
+crontab 예시 (매일 새벽 3시):
+    0 3 * * * cd /app && python precompute_genai_results.py >> logs/precompute.log 2>&1
+
+기간/모델 버전 목록은 PRECOMPUTE_YEAR_RANGES, PRECOMPUTE_MODEL_VERSIONS 환경변수로 변경
+"""
+import argparse
+import time
+
+from pybo import create_app
+from pybo.service.precompute_service import PrecomputeService, PRECOMPUTE_CONCURRENCY
+
+
+def main():
+    parser = argparse.ArgumentParser(description="보고서/정책 사전 생성")
+    parser.add_argument("--only", choices=["report", "policy"], help="한 종류만 생성")
+    parser.add_argument("--force", action="store_true", help="데이터 버전이 같아도 다시 생성")
+    parser.add_argument("-c", "--concurrency", type=int, default=PRECOMPUTE_CONCURRENCY,
+                        help="LLM 백엔드로 동시에 보낼 작업 수")
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        service = PrecomputeService()
+        task_types = (args.only,) if args.only else ("report", "policy")
+        tasks = service.plan(task_types, force=args.force)
+        print(f"데이터 버전 {service.data_version()} / 생성 대상 {len(tasks)}건 (동시 {args.concurrency}개)")
+
+        done = 0
+
+        def on_progress(task, status, elapsed):
+            nonlocal done
+            done += 1
+            label = f"{task.task_type} {task.district} {task.model_version}"
+            if task.task_type == "report":
+                label += f" {task.start_year}~{task.end_year}"
+            print(f"[{done}/{len(tasks)}] {label}: {status} ({elapsed:.1f}초)")
+
+        started = time.time()
+        summary = service.run(tasks, concurrency=args.concurrency, on_progress=on_progress)
+        print(f"완료: 저장 {summary['stored']}건, 실패 {summary['failed']}건 ({time.time() - started:.1f}초)")
+
+
+if __name__ == "__main__":
+    main()
@@ -29,6 +29,9 @@ def create_app():
         genai_views,
     )
 
+    # g.user 지연 로딩
+    app.app_ctx_globals_class = auth_views.LazyUserGlobals
+
     app.register_blueprint(main_views.bp)
     app.register_blueprint(auth_views.bp)
     app.register_blueprint(question_views.bp)
@@ -36,4 +39,8 @@ def create_app():
     app.register_blueprint(data_views.bp)
     app.register_blueprint(predict_views.bp)
     app.register_blueprint(genai_views.bp)
+
+    # 도구를 같은 프로세스에서 직접 호출할 때(TOOL_TRANSPORT=inprocess) 요청 밖에서도 DB 사용
+    from .agent import tool_transport
+    tool_transport.init_app(app)
     return app
\ No newline at end of file
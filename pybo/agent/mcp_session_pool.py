@@ -0,0 +1,191 @@
+# MCP 서버 연결 풀 (초기화된 ClientSession을 계속 유지해서 도구 호출마다 연결/initialize 하지 않음)
+# 세션은 공용 백그라운드 루프(async_runtime)에서 돌고, 동기 코드는 call()로 사용
+import asyncio
+import atexit
+import os
+import threading
+from typing import Optional
+
+from mcp import ClientSession
+from mcp.client.streamable_http import streamable_http_client
+
+from pybo.service import async_runtime
+
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))                  # URL당 유지할 세션 수 (= 동시 호출 수)
+MCP_CALL_TIMEOUT = float(os.getenv("MCP_CALL_TIMEOUT", "300"))        # 도구 호출 1건 제한 시간(초)
+MCP_RECONNECT_DELAY = float(os.getenv("MCP_RECONNECT_DELAY", "1.0"))  # 연결 실패 후 재연결 대기(초), 연속 실패 시 2배씩 증가
+MCP_RECONNECT_MAX_DELAY = 30.0
+
+_STOP = object()
+
+
+def _root_error(error: BaseException) -> BaseException:
+    # anyio TaskGroup이 감싼 예외에서 실제 원인 꺼내기 (로그/오류 메시지용)
+    while isinstance(error, BaseExceptionGroup) and error.exceptions:
+        error = error.exceptions[0]
+    return error
+
+
+class PoolStats:
+    def __init__(self):
+        self.calls = 0
+        self.connects = 0
+        self.failures = 0
+        self.retries = 0
+
+    def as_dict(self) -> dict:
+        return {"calls": self.calls, "connects": self.connects, "failures": self.failures, "retries": self.retries}
+
+
+class MCPSessionPool:
+    """
+    세션마다 작업 태스크 하나가 연결을 열고 initialize 한 뒤, 공용 큐의 도구 호출을 차례로 처리한다.
+    (연결 컨텍스트는 연 태스크 안에서 닫아야 하므로 세션을 태스크 밖으로 빌려주지 않음)
+    - 호출 중 연결 오류가 나면 해당 세션을 닫고 바로 재연결, 그 호출은 새 세션에서 한 번 더 시도
+    - 서버에 연결할 수 없으면 대기 중인 호출을 바로 실패 처리 (호출 측이 제한 시간까지 기다리지 않게)
+    """
+
+    def __init__(self, url: str, size: int = MCP_POOL_SIZE, call_timeout: float = MCP_CALL_TIMEOUT):
+        self.url = url
+        self.size = size
+        self.call_timeout = call_timeout
+        self.stats = PoolStats()
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._connected = 0
+        self._closed = False
+
+    def _ensure_started(self) -> None:
+        # 백그라운드 루프 안에서만 호출
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+            self._workers = [asyncio.create_task(self._worker()) for _ in range(self.size)]
+
+    async def _worker(self) -> None:
+        delay = MCP_RECONNECT_DELAY
+        held: list = []  # 끊긴 세션에서 실패한 호출 (새 세션에서 한 번 더 시도)
+        while not self._closed:
+            try:
+                async with streamable_http_client(self.url) as (read, write, _):
+                    async with ClientSession(read, write) as session:
+                        await session.initialize()
+                        self.stats.connects += 1
+                        self._connected += 1
+                        delay = MCP_RECONNECT_DELAY
+                        try:
+                            if await self._serve(session, held) is _STOP:
+                                return
+                        finally:
+                            self._connected -= 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                e = _root_error(e)
+                self.stats.failures += 1
+                if held and held[0][3] == 0:
+                    # 호출 중 세션이 끊긴 경우 (서버 재시작 등) 바로 재연결해서 다시 시도
+                    print(f"[MCPSessionPool] {self.url} 세션 끊김, 재연결 후 다시 호출합니다: {e!r}")
+                    held[0] = held[0][:3] + (1,)
+                    continue
+                for job in held:
+                    if not job[2].done():
+                        job[2].set_exception(e)
+                held.clear()
+                print(f"[MCPSessionPool] {self.url} 연결 오류, {delay:.0f}초 후 재연결합니다: {e!r}")
+                if self._connected == 0:
+                    self._fail_pending(e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, MCP_RECONNECT_MAX_DELAY)
+
+    async def _serve(self, session: ClientSession, held: list):
+        while True:
+            job = held.pop() if held else await self._queue.get()
+            if job is _STOP:
+                return _STOP
+            tool_name, arguments, future, retries = job
+            if future.done():  # 호출 측에서 이미 취소/시간 초과
+                continue
+            try:
+                result = await session.call_tool(tool_name, arguments)
+            except Exception:
+                # 세션이 끊겼을 수 있으므로 (서버 재시작 시 McpError "Session terminated" 포함)
+                # 이 세션은 버리고, 새 세션에서 한 번만 다시 시도
+                if retries == 0:
+                    self.stats.retries += 1
+                held.append(job)
+                raise
+            if not future.done():
+                future.set_result(result)
+
+    def _fail_pending(self, error: Exception) -> None:
+        while not self._queue.empty():
+            job = self._queue.get_nowait()
+            if job is _STOP:
+                self._queue.put_nowait(job)
+                return
+            future = job[2]
+            if not future.done():
+                future.set_exception(error)
+
+    async def _call(self, tool_name: str, arguments: dict):
+        if self._closed:
+            raise RuntimeError("MCP 연결 풀이 종료되었습니다.")
+        self._ensure_started()
+        self.stats.calls += 1
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((tool_name, arguments, future, 0))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), self.call_timeout)
+        finally:
+            future.cancel()  # 시간 초과/취소된 호출은 작업 태스크가 건너뜀
+
+    async def acall(self, tool_name: str, arguments: dict):
+        """비동기 호출 (어느 이벤트 루프에서 불러도 됨). MCP CallToolResult 반환"""
+        return await async_runtime.run_async(self._call(tool_name, arguments))
+
+    def call(self, tool_name: str, arguments: dict):
+        """동기 호출 (Flask 워커 등 여러 스레드에서 동시에 사용 가능)"""
+        return async_runtime.run_sync(self._call(tool_name, arguments))
+
+    async def _close(self, timeout: float) -> None:
+        self._closed = True
+        if self._queue is None:
+            return
+        for _ in self._workers:
+            self._queue.put_nowait(_STOP)
+        done, pending = await asyncio.wait(self._workers, timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+    def close(self, timeout: float = 5.0) -> None:
+        """열린 세션을 정상 종료 (진행 중인 호출은 timeout까지 기다림)"""
+        if self._closed:
+            return
+        try:
+            async_runtime.run_sync(self._close(timeout), timeout=timeout + 1)
+        except Exception as e:
+            print(f"[MCPSessionPool] 종료 중 오류: {e}")
+
+    def as_dict(self) -> dict:
+        return dict(self.stats.as_dict(), url=self.url, size=self.size, connected=self._connected)
+
+
+# URL별 싱글톤 (ToolClient, qa_graph 공용)
+_pools: dict[str, MCPSessionPool] = {}
+_pools_lock = threading.Lock()
+
+
+def get_mcp_pool(url: str) -> MCPSessionPool:
+    with _pools_lock:
+        if url not in _pools:
+            _pools[url] = MCPSessionPool(url)
+        return _pools[url]
+
+
+def close_all() -> None:
+    for pool in list(_pools.values()):
+        pool.close()
+
+
+# async_runtime의 루프 종료(atexit)보다 먼저 실행됨 (나중에 등록된 것이 먼저 실행)
+atexit.register(close_all)
@@ -0,0 +1,85 @@
+# 프롬프트 토큰 예산 관리 (시스템 프롬프트 / 대화 기록 / Observation / 참조 자료)
+import os
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from pybo.service.token_counter import count_tokens
+
+PROMPT_MAX_TOKENS = int(os.getenv("PROMPT_MAX_TOKENS", "3000"))              # instruction + input 전체 상한
+OBSERVATION_MAX_TOKENS = int(os.getenv("OBSERVATION_MAX_TOKENS", "700"))     # 도구 결과 1건 상한
+RAG_CONTEXT_MAX_TOKENS = int(os.getenv("RAG_CONTEXT_MAX_TOKENS", "1500"))    # 검색 문서 전체 상한
+MIN_SECTION_TOKENS = 32  # 이보다 적게 남으면 통째로 제외
+
+HEAD_MARKER = "\n…(이하 생략)"
+TAIL_MARKER = "(앞부분 생략)…\n"
+
+
+@dataclass
+class PromptSection:
+    name: str
+    text: str
+    priority: int = 0                 # 클수록 먼저 잘림, 0은 자르지 않음 (시스템 프롬프트, 질문 등)
+    max_tokens: Optional[int] = None  # 전체 예산과 별개로 이 구간만의 상한
+    keep: str = "head"                # 자를 때 남길 쪽: head(앞부분) / tail(최근 내용)
+
+
+def truncate_to_tokens(text: str, limit: int, keep: str = "head",
+                       counter: Callable[[str], int] = count_tokens) -> str:
+    """토큰 수가 limit 이하가 되도록 자름 (글자 수 기준 이진 탐색)"""
+    if counter(text) <= limit:
+        return text
+    if limit <= 0:
+        return ""
+
+    marker = HEAD_MARKER if keep == "head" else TAIL_MARKER
+    limit -= counter(marker)
+    lo, hi = 0, len(text)
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        part = text[:mid] if keep == "head" else text[-mid:]
+        if counter(part) <= limit:
+            lo = mid
+        else:
+            hi = mid - 1
+
+    if lo == 0:
+        return ""
+    return text[:lo] + marker if keep == "head" else marker + text[-lo:]
+
+
+class PromptBudget:
+    """
+    구간별 토큰 수를 세고, 합계가 max_tokens를 넘으면 우선순위가 낮은 구간부터 잘라서 맞춤.
+    호출마다 구간별 토큰 수를 로그로 남김
+    """
+
+    def __init__(self, max_tokens: int = PROMPT_MAX_TOKENS, counter: Callable[[str], int] = count_tokens):
+        self.max_tokens = max_tokens
+        self.counter = counter
+
+    def fit(self, sections: list[PromptSection], label: str = "") -> dict[str, str]:
+        texts, before, after = {}, {}, {}
+        for s in sections:
+            before[s.name] = self.counter(s.text)
+            text = s.text
+            if s.priority > 0 and s.max_tokens is not None and before[s.name] > s.max_tokens:
+                text = truncate_to_tokens(text, s.max_tokens, s.keep, self.counter)
+            texts[s.name] = text
+            after[s.name] = self.counter(text) if text is not s.text else before[s.name]
+
+        total = sum(after.values())
+        for s in sorted(sections, key=lambda s: s.priority, reverse=True):
+            if total <= self.max_tokens or s.priority == 0:
+                break
+            allowed = after[s.name] - (total - self.max_tokens)
+            text = truncate_to_tokens(texts[s.name], allowed, s.keep, self.counter) if allowed >= MIN_SECTION_TOKENS else ""
+            tokens = self.counter(text)
+            total += tokens - after[s.name]
+            texts[s.name], after[s.name] = text, tokens
+
+        parts = [
+            f"{name}={after[name]}" + (f"(<-{before[name]})" if after[name] != before[name] else "")
+            for name in after
+        ]
+        print(f"[PromptBudget{' ' + label if label else ''}] {', '.join(parts)} / total={total} (limit {self.max_tokens})")
+        return texts
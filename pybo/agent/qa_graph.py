@@ -1,78 +1,173 @@
 import os
-import asyncio
-from typing import TypedDict
+import time
+from typing import Annotated, Awaitable, Callable, TypedDict
 
 from langgraph.graph import StateGraph, END
-from mcp import ClientSession
-from mcp.client.streamable_http import streamable_http_client
+
+from pybo.agent.tool_transport import get_tool_transport
+from pybo.agent.prompt_budget import PromptBudget, PromptSection, OBSERVATION_MAX_TOKENS, RAG_CONTEXT_MAX_TOKENS
+from pybo.service import async_runtime
+from pybo.service.query_router import lookup_answer, lookup_args, lookup_failed, match_query, route_query
 
 MCP_URL = os.getenv("MCP_URL", "http://127.0.0.1:8000/mcp")
 
+_budget = PromptBudget()
+
+def _merge_timings(left: dict, right: dict) -> dict:
+    # 병렬 노드(rag / db)가 같은 단계에서 각각 기록하므로 합쳐서 보관
+    return {**(left or {}), **(right or {})}
+
 class QAState(TypedDict):
     question: str
-    pdf_context: str
+    model_version: str
+    route: str          # greeting / lookup / docs / data (query_router.route_query)
+    district: str
+    years: list[int]
+    pdf_context: str    # rag_search 결과
+    data_context: str   # db_forecast_search 결과
+    context: str        # join에서 토큰 예산에 맞춰 합친 참조 자료
     answer: str
+    timings: Annotated[dict[str, float], _merge_timings]  # 노드별 소요시간(초)
 
-def _is_greeting(q: str) -> bool:
-    greetings = ["안녕", "반가워", "하이", "hello", "hi", "누구"]
-    q_low = (q or "").lower()
-    return any(g in q_low for g in greetings) and len((q or "").strip()) < 15
+GREETING_INSTRUCTION = (
+    "너는 서울시 아동복지 정책 전문가이자 친절한 상담사야. "
+    "사용자의 인사에 반갑게 화답하고 무엇을 도와줄지 짧고 친절하게 물어봐."
+)
+QA_INSTRUCTION = (
+    "너는 서울시 아동복지 정책 전문가다. 반드시 한국어로 답변해라. "
+    "반드시 제공된 '참조 자료'에 근거해서만 답해라. "
+    "참조 자료에 없는 내용은 추측하지 말고 '자료에 없음'이라고 말해라. "
+    "질문과 직접 관련 없는 법령/지침은 생략해라. "
+    "상담사처럼 친절한 말투(~해요, ~입니다)를 사용해라."
+)
 
 async def _call_tool(tool_name: str, args: dict) -> str:
-    async with streamable_http_client(MCP_URL) as (read, write, _):
-        async with ClientSession(read, write) as session:
-            await session.initialize()
-            res = await session.call_tool(tool_name, arguments=args)
-            return res.content[0].text if res.content else ""
+    # MCP 서버 호출(연결 풀) 또는 같은 프로세스에서 직접 호출 (TOOL_TRANSPORT)
+    res = await get_tool_transport(MCP_URL).acall(tool_name, args)
+    return res.content[0].text if res.content else ""
+
+def _timed(name: str, node: Callable[[QAState], Awaitable[dict]]):
+    """노드 실행 시간을 state["timings"][name]에 기록"""
+    async def run(state: QAState) -> dict:
+        started = time.perf_counter()
+        update = await node(state)
+        return {**update, "timings": {name: round(time.perf_counter() - started, 4)}}
+    return run
+
+async def node_router(state: QAState) -> dict:
+    intent = route_query(state["question"])
+    return {"route": intent.kind, "district": intent.entities.district, "years": intent.entities.years}
+
+def _branches(state: QAState) -> list[str]:
+    # 인사말은 검색 없이 바로 답변, 단순 통계 조회는 DB 값으로 템플릿 답변, 통계 질문은 문서 검색과 DB 조회를 동시에 실행
+    if state["route"] == "greeting":
+        return ["answer"]
+    if state["route"] == "lookup":
+        return ["lookup"]
+    if state["route"] == "data":
+        return ["rag", "db"]
+    return ["rag"]
+
+async def node_lookup(state: QAState) -> dict:
+    entities = match_query(state["question"])
+    data = await _call_tool("db_forecast_search", lookup_args(entities))
+    if lookup_failed(data):
+        # 조회 실패/데이터 없음이면 일반 질문처럼 문서 검색 후 LLM 답변
+        return {"route": "docs"}
+    return {"data_context": data, "answer": lookup_answer(entities, data)}
 
-async def node_rag(state: QAState) -> QAState:
-    state["pdf_context"] = await _call_tool("rag_search", {"question": state["question"]})
-    return state
+def _after_lookup(state: QAState) -> str:
+    return END if state["answer"] else "rag"
 
-async def node_answer(state: QAState) -> QAState:
+async def node_rag(state: QAState) -> dict:
+    return {"pdf_context": await _call_tool("rag_search", {"question": state["question"]})}
+
+async def node_db(state: QAState) -> dict:
+    args = {"district": state["district"] or "전체"}
+    if state["years"]:
+        args.update(start_year=state["years"][0], end_year=state["years"][-1])
+    return {"data_context": await _call_tool("db_forecast_search", args)}
+
+async def node_join(state: QAState) -> dict:
+    # 통계 수치는 짧고 답변의 근거이므로 검색 문서(관련도 순, 뒷부분부터)보다 나중에 자름
+    texts = _budget.fit([
+        PromptSection("system", QA_INSTRUCTION),
+        PromptSection("question", state["question"]),
+        PromptSection("data", state["data_context"], priority=1, max_tokens=OBSERVATION_MAX_TOKENS),
+        PromptSection("context", state["pdf_context"], priority=2, max_tokens=RAG_CONTEXT_MAX_TOKENS),
+    ], label="qa_graph")
+    parts = []
+    if texts["data"]:
+        parts.append(f"[통계 데이터]\n{texts['data']}")
+    if texts["context"]:
+        parts.append(f"[관련 법령/지침]\n{texts['context']}" if texts["data"] else texts["context"])
+    return {"context": "\n\n".join(parts)}
+
+async def node_answer(state: QAState) -> dict:
     q = state["question"]
 
-    if _is_greeting(q):
-        instruction = (
-            "너는 서울시 아동복지 정책 전문가이자 친절한 상담사야. "
-            "사용자의 인사에 반갑게 화답하고 무엇을 도와줄지 짧고 친절하게 물어봐."
-        )
+    if state["route"] == "greeting":
+        instruction = GREETING_INSTRUCTION
         input_text = f"사용자 질문: {q}"
     else:
-        instruction = (
-            "너는 서울시 아동복지 정책 전문가다. 반드시 한국어로 답변해라. "
-            "반드시 제공된 '참조 자료'에 근거해서만 답해라. "
-            "참조 자료에 없는 내용은 추측하지 말고 '자료에 없음'이라고 말해라. "
-            "질문과 직접 관련 없는 법령/지침은 생략해라. "
-            "상담사처럼 친절한 말투(~해요, ~입니다)를 사용해라."
-        )
-        input_text = f"참조 자료:\n{state['pdf_context']}\n\n질문: {q}"
-
-    state["answer"] = await _call_tool(
+        instruction = QA_INSTRUCTION
+        input_text = f"참조 자료:\n{state['context']}\n\n질문: {q}"
+
+    answer = await _call_tool(
         "llama_generate",
         {
             "instruction": instruction,
             "input_text": input_text,
-            "model_version": "final",
+            "model_version": state["model_version"],
             "temperature": 0.3,
             "max_new_tokens": 512,
         },
     )
-    return state
+    return {"answer": answer}
 
 def build_graph():
+    # router -> (greeting) answer
+    #        -> (lookup)   lookup (DB 값 템플릿, LLM 없음) [-> 조회 실패 시 rag -> join -> answer]
+    #        -> (docs)     rag -> join -> answer
+    #        -> (data)     rag + db (동시 실행) -> join -> answer
     g = StateGraph(QAState)
-    g.add_node("rag", node_rag)
-    g.add_node("answer", node_answer)
-    g.set_entry_point("rag")
-    g.add_edge("rag", "answer")
+    g.add_node("router", _timed("router", node_router))
+    g.add_node("rag", _timed("rag", node_rag))
+    g.add_node("db", _timed("db", node_db))
+    g.add_node("lookup", _timed("lookup", node_lookup))
+    g.add_node("join", _timed("join", node_join))
+    g.add_node("answer", _timed("answer", node_answer))
+    g.set_entry_point("router")
+    g.add_conditional_edges("router", _branches, ["answer", "lookup", "rag", "db"])
+    g.add_conditional_edges("lookup", _after_lookup, ["rag", END])
+    g.add_edge("rag", "join")
+    g.add_edge("db", "join")
+    g.add_edge("join", "answer")
     g.add_edge("answer", END)
     return g.compile()
 
-# Flask에서 동기 함수로 쓰기 쉽게 래핑
+# 그래프는 한 번만 컴파일하고, 실행은 항상 공용 백그라운드 루프(async_runtime)에서
+# (요청마다 이벤트 루프를 만들지 않음, MCP 연결 풀/LLM 클라이언트와 같은 루프)
 _graph = build_graph()
 
-def run_qa(question: str) -> str:
-    state = {"question": question, "pdf_context": "", "answer": ""}
-    final_state = asyncio.run(_graph.ainvoke(state))
-    return final_state["answer"]
+def _initial_state(question: str, model_version: str) -> QAState:
+    return {
+        "question": question, "model_version": model_version, "route": "", "district": "", "years": [],
+        "pdf_context": "", "data_context": "", "context": "", "answer": "", "timings": {},
+    }
+
+async def ainvoke_qa(question: str, model_version: str = "final") -> QAState:
+    """최종 state 전체 (route, 노드별 timings 포함)"""
+    started = time.perf_counter()
+    final_state = await async_runtime.run_async(_graph.ainvoke(_initial_state(question, model_version)))
+    final_state["timings"]["total"] = round(time.perf_counter() - started, 4)
+    print(f"[qa_graph] route={final_state['route']} timings={final_state['timings']}")
+    return final_state
+
+async def arun_qa(question: str, model_version: str = "final") -> str:
+    """ASGI 뷰 등 다른 이벤트 루프에서 await (취소도 그래프 실행까지 전파됨)"""
+    return (await ainvoke_qa(question, model_version))["answer"]
+
+# Flask(동기 워커)에서 사용
+def run_qa(question: str, model_version: str = "final") -> str:
+    return async_runtime.run_sync(ainvoke_qa(question, model_version))["answer"]
@@ -1,36 +1,193 @@
 import json
+import os
 import re
+from dataclasses import dataclass
+from typing import Callable
 from pybo.agent.tool_client import ToolClient
+from pybo.agent.prompts import GENERATION_TASKS, generation_task_input
+from pybo.agent.prompt_budget import PromptBudget, PromptSection, OBSERVATION_MAX_TOKENS, truncate_to_tokens
+from pybo.service import metrics
+
+# 모델이 지어낸 다음 턴/관찰 결과를 잘라내는 기준 문자열 (LLM 요청의 중지 문자열로도 전달해 생성을 일찍 끝냄)
+STOP_WORDS = ["Observation:", "사용자 질문:", "질문:", "Q:", "A:", "### Input:", "###"]
+
+# 내부에서 LLM을 호출하는 도구. 요청한 model_version으로 생성되도록 인자를 덮어씀
+MODEL_VERSION_TOOLS = ("create_report_task", "create_policy_task", "llama_generate")
+
+# 한 응답에서 실행할 최대 Action 수 (서로 독립적인 조회를 한 번의 루프에서 동시에 실행)
+AGENT_MAX_ACTIONS = int(os.getenv("AGENT_MAX_ACTIONS", "3"))
+
+
+@dataclass
+class PlanStep:
+    """고정 도구 파이프라인의 한 단계. args는 앞 단계 결과(name -> 결과 텍스트)로 도구 인자를 만듦"""
+    name: str
+    tool: str
+    args: Callable[[dict], dict]
+
+
+class FinalAnswerStreamer:
+    """
+    스트리밍 응답에서 'Final Answer:' 이후 구간만 골라서 내보냄.
+    중지 문자열(STOP_WORDS)의 앞부분일 수 있는 꼬리는 확정될 때까지 보류한다.
+    """
+    MARKER = "Final Answer:"
+
+    def __init__(self):
+        self.text = ""
+        self._start = -1     # 최종 답변 시작 위치
+        self._emitted = -1   # 지금까지 내보낸 위치
+        self._stopped = False
+        self._hold = max(len(w) for w in STOP_WORDS) - 1
+
+    def _answer_end(self, final: bool) -> int:
+        body = self.text[self._start:]
+        cut = min((body.find(w) for w in STOP_WORDS if w in body), default=-1)
+        if cut >= 0:
+            self._stopped = True
+            return self._start + cut
+        return len(self.text) if final else max(self._start, len(self.text) - self._hold)
+
+    def _emit(self, final: bool) -> list[str]:
+        if self._stopped:
+            return []
+        if self._start < 0:
+            pos = self.text.find(self.MARKER)
+            if pos < 0:
+                return []
+            self._start = pos + len(self.MARKER)
+            self._emitted = self._start
+
+        end = self._answer_end(final)
+        chunk = self.text[self._emitted:end]
+        if self._emitted == self._start:
+            chunk = chunk.lstrip()  # 'Final Answer:' 뒤 공백 제거
+        if not chunk:
+            return []
+        self._emitted = end
+        return [chunk] if chunk else []
+
+    def feed(self, token: str) -> list[str]:
+        self.text += token
+        return self._emit(final=False)
+
+    def finish(self) -> list[str]:
+        return self._emit(final=True)
 
 class ToolAgent:
     """도구를 사용하여 자율적으로 사고하고 답변하는 에이전트 엔진"""
     
-    def __init__(self, llm_callback, max_iterations: int = 3):
+    def __init__(self, llm_callback, max_iterations: int = 3, llm_stream_callback=None):
         """
         :param llm_callback: LLM을 호출할 수 있는 콜백 함수 (instruction, input -> response)
         :param max_iterations: 최대 루프 반복 횟수
+        :param llm_stream_callback: 토큰 스트리밍 콜백 (instruction, input -> 토큰 iterator), 없으면 스트리밍 미지원
         """
         self.tool_client = ToolClient()
         self.llm_callback = llm_callback
+        self.llm_stream_callback = llm_stream_callback
         self.max_iterations = max_iterations
+        self.budget = PromptBudget()
 
-    def run(self, query: str, instruction: str, history=None) -> str:
+    def run(self, query: str, instruction: str, history=None, task_type: str = "agent",
+            model_version: str = "final") -> str:
         """사용자의 질문에 대해 에이전트 루프를 실행합니다."""
-        context = ""
-        if history:
-            context = "### 대화 기록 (History):\n" + "\n".join(history[-4:]) + "\n\n"
-        
-        current_chain = f"{context}사용자 질문: {query}\n"
-        
+        answer = ""
+        for event, data in self.run_events(query, instruction, history=history, stream=False,
+                                           task_type=task_type, model_version=model_version):
+            if event == "done":
+                answer = data
+        return answer
+
+    def run_events(self, query: str, instruction: str, history=None, stream: bool = True,
+                   task_type: str = "agent", model_version: str = "final"):
+        """
+        에이전트 루프를 실행하면서 진행 상황을 이벤트로 내보냅니다.
+        ("step", dict)  : 도구 호출 등 중간 단계
+        ("token", str)  : 최종 답변(Final Answer) 토큰 (stream=True일 때 생성되는 즉시)
+        ("done", str)   : 최종 답변 전체
+        task_type은 지표 라벨 (report / policy / qa 등)
+        model_version은 에이전트 LLM 호출과 생성 도구(MODEL_VERSION_TOOLS) 모두에 적용
+        """
+        iterations = 0
+        for event, data in self._run_loop(query, instruction, history, stream, task_type, model_version):
+            if event == "iteration":
+                iterations = data
+                continue
+            if event == "done":
+                metrics.AGENT_ITERATIONS.observe(iterations, task_type=task_type)
+            yield event, data
+
+    def run_plan_events(self, plan: list[PlanStep], model_version: str = "final", stream: bool = False,
+                        task_type: str = "agent"):
+        """
+        호출 순서가 정해진 임무(보고서/정책)는 LLM에게 다음 Action을 묻지 않고 파이프라인을 바로 실행.
+        LLM은 생성 도구(create_report_task 등) 안에서 한 번만 호출된다. 마지막 단계 결과가 최종 답변
+        이벤트 형식은 run_events와 같음. stream=True면 마지막 생성 도구(GENERATION_TASKS) 대신
+        같은 지침/입력으로 LLM을 직접 스트리밍 호출해 token 이벤트를 내보냄
+        """
+        results: dict[str, str] = {}
+        for i, step in enumerate(plan):
+            tool_input = step.args(results)
+            if step.tool in MODEL_VERSION_TOOLS:
+                tool_input = dict(tool_input, model_version=model_version)
+
+            print(f"--- [Agent Plan EXEC] {step.tool}({tool_input}) ---")
+            yield "step", {"iteration": i + 1, "action": step.tool, "input": tool_input}
+            if stream and self.llm_stream_callback is not None and step is plan[-1] and step.tool in GENERATION_TASKS:
+                results[step.name] = yield from self._stream_generation(step.tool, tool_input, model_version)
+                continue
+            results[step.name], cache_status = self.tool_client.call_tool_traced(step.tool, tool_input)
+            print(f"--- [Agent Observation] {step.tool} (cache={cache_status}) ---")
+
+        metrics.AGENT_ITERATIONS.observe(len(plan), task_type=task_type)
+        yield "done", results[plan[-1].name].strip()
+
+    def _stream_generation(self, tool_name: str, tool_input: dict, model_version: str):
+        """생성 도구와 같은 지침/입력으로 LLM 스트리밍 호출 (token 이벤트를 내보내고 전체 텍스트를 반환)"""
+        task = GENERATION_TASKS[tool_name]
+        tokens = []
+        for token in self.llm_stream_callback(
+            task["instruction"],
+            generation_task_input(tool_input["district"], tool_input["data_context"]),
+            model_version=model_version,
+            temperature=task["temperature"],
+            task_type=task["task_type"],
+        ):
+            tokens.append(token)
+            yield "token", token
+        print(f"--- [Agent Observation] {tool_name} (stream) ---")
+        return "".join(tokens)
+
+    def _run_loop(self, query: str, instruction: str, history, stream: bool, task_type: str, model_version: str):
+        stream = stream and self.llm_stream_callback is not None
+
+        # 이전 단계들 (응답 + Observation / 시스템 지시, 단계별 토큰 상한). 매 호출마다 토큰 예산에 맞춰 다시 조립
+        steps: list[tuple[str, int]] = []
+
         for i in range(self.max_iterations):
             # LLM 호출 - 접두어를 주어 ReAct 유도
-            llm_input = f"{current_chain}\nThought: "
-            response_text = self.llm_callback(instruction, llm_input) or ""
+            yield "iteration", i + 1
+            llm_input = self._build_input(instruction, query, history, steps, i + 1)
+            if stream:
+                streamer = FinalAnswerStreamer()
+                for token in self.llm_stream_callback(
+                    instruction, llm_input, model_version=model_version, task_type=task_type, stop=STOP_WORDS
+                ):
+                    for chunk in streamer.feed(token):
+                        yield "token", chunk
+                for chunk in streamer.finish():
+                    yield "token", chunk
+                response_text = streamer.text
+            else:
+                response_text = self.llm_callback(
+                    instruction, llm_input, model_version=model_version, task_type=task_type, stop=STOP_WORDS
+                ) or ""
             
             # 모델이 아무것도 답변하지 않는 경우 (예: Thought: 뒤가 비어있음)
             if not response_text.strip():
                 print(f"[Warning] Empty LLM response in loop {i+1}. Nudging...")
-                current_chain += f"\nThought: (이곳에 질문에 대한 분석을 적거나 바로 답변하십시오.)"
+                steps.append((f"\nThought: (이곳에 질문에 대한 분석을 적거나 바로 답변하십시오.)", OBSERVATION_MAX_TOKENS))
                 continue
 
             # 모델이 자체적으로 'Thought:'를 포함해서 답하는 경우 처리
@@ -40,8 +197,9 @@ class ToolAgent:
                 response = "Thought: " + response_text.strip()
             
             # 할루시네이션 방지: 모델이 Observation: 혹은 다음 질문을 지어내면 잘라냄
+            # (보통은 중지 문자열로 백엔드/클라이언트에서 이미 멈춤. 중지 문자열을 지원하지 않는 백엔드 대비)
             # '### Input:' 등 불필요한 흔적 추가 제거
-            for stop_word in ["Observation:", "사용자 질문:", "질문:", "Q:", "A:", "### Input:", "###"]:
+            for stop_word in STOP_WORDS:
                 if stop_word in response:
                     response = response.split(stop_word)[0].strip()
 
@@ -53,14 +211,16 @@ class ToolAgent:
                 # 임무상황(보고서/정책)이 아닐 때는 짧은 답변도 허용
                 is_mission = "지시상황" in query or "임무" in query
                 if not is_mission and len(ans) > 0:
-                    return ans
+                    yield "done", ans
+                    return
                 
                 # 답변 내용이 너무 부실하거나 빈 경우 (QA 루프 방지)
                 if len(ans) < 5:
                     print("[Warning] Final Answer is too short. Requesting substance.")
-                    current_chain += f"\n{response}\n시스템: 'Final Answer:' 뒤에 실질적이고 구체적인 답변 내용을 한국어로 작성하십시오."
+                    steps.append((f"\n{response}\n시스템: 'Final Answer:' 뒤에 실질적이고 구체적인 답변 내용을 한국어로 작성하십시오.", OBSERVATION_MAX_TOKENS))
                     continue
-                return ans
+                yield "done", ans
+                return
 
             # 2. 일반 QA에 대한 암시적 답변 허용 (Report/Policy 임무가 아닐 때만)
             if "Action:" not in response:
@@ -69,18 +229,28 @@ class ToolAgent:
                     # 모델이 '시스템:' 지침을 앵무새처럼 따라하지 않았는지 확인
                     if len(clean_ans) > 2 and "시스템:" not in clean_ans:
                         print("[Info] Detected implicit answer for general QA. Returning...")
-                        return clean_ans
+                        yield "done", clean_ans
+                        return
             
             # 3. Action 파싱 및 도구 실행
             try:
                 if "Action:" in response:
-                    tool_name, tool_input = self._parse_action(response)
-                    
-                    print(f"--- [Agent Action EXEC] {tool_name}({tool_input}) ---")
-                    observation = self.tool_client.call_tool(tool_name, tool_input)
-                    
+                    actions = []
+                    for tool_name, tool_input in self._parse_actions(response):
+                        if tool_name in MODEL_VERSION_TOOLS and isinstance(tool_input, dict):
+                            tool_input = dict(tool_input, model_version=model_version)
+                        print(f"--- [Agent Action EXEC] {tool_name}({tool_input}) ---")
+                        yield "step", {"iteration": i + 1, "action": tool_name, "input": tool_input}
+                        actions.append((tool_name, tool_input))
+
+                    # 같은 응답의 Action들은 서로의 결과를 모르므로 독립적 -> 동시에 실행
+                    observations = []
+                    for (tool_name, _), (text, cache_status) in zip(actions, self.tool_client.call_tools_traced(actions)):
+                        print(f"--- [Agent Observation] {tool_name} (cache={cache_status}) ---")
+                        observations.append(text)
+
                     # 결과를 체인에 추가하고 다음 Thought 유도
-                    current_chain += f"\n{response}\nObservation: {observation}\n"
+                    steps.append(self._observation_step(response, actions, observations))
                 else:
                     # 루프 마지막인데도 Action/Final Answer가 없으면 본문을 답변으로 간주
                     if i == self.max_iterations - 1:
@@ -88,37 +258,86 @@ class ToolAgent:
                         final_text = response.replace("Thought:", "").strip()
                         if "시스템:" in final_text:
                             final_text = final_text.split("시스템:")[0].strip()
-                        return final_text
+                        yield "done", final_text
+                        return
                     
                     # 형식을 지키도록 재요구 (더 구체적으로 표현)
-                    current_chain += f"\n{response}\n시스템: 다음 단계는 'Action: <도구명>'과 'Action Input: {{...}}'를 사용하여 도구를 호출하거나, 'Final Answer: <답변>'으로 마무리하는 것입니다."
+                    steps.append((f"\n{response}\n시스템: 다음 단계는 'Action: <도구명>'과 'Action Input: {{...}}'를 사용하여 도구를 호출하거나, 'Final Answer: <답변>'으로 마무리하는 것입니다.", OBSERVATION_MAX_TOKENS))
             except Exception as e:
                 print(f"[ToolAgent Error] {e}")
-                current_chain += f"\n{response}\nObservation: 오류 발생({str(e)}). 한 번에 하나의 Action만 JSON 형식으로 제출하십시오.\n"
+                steps.append((f"\n{response}\nObservation: 오류 발생({str(e)}). 각 Action 뒤에 Action Input을 JSON 형식으로 제출하십시오.\n", OBSERVATION_MAX_TOKENS))
+
+        yield "done", "미안해, 답변을 생성하는 데 실패했어. 다시 한번 물어봐 줄래?"
 
-        return "미안해, 답변을 생성하는 데 실패했어. 다시 한번 물어봐 줄래?"
+    @staticmethod
+    def _observation_step(response: str, actions: list[tuple], observations: list[str]) -> tuple[str, int]:
+        """도구 결과를 한 단계로 묶음. 여러 건이면 결과마다 OBSERVATION_MAX_TOKENS까지 잘라서 도구명과 함께 나열"""
+        if len(actions) == 1:
+            return f"\n{response}\nObservation: {observations[0]}\n", OBSERVATION_MAX_TOKENS
+        parts = [
+            f"[{n}] {tool_name}: {truncate_to_tokens(str(observation), OBSERVATION_MAX_TOKENS)}"
+            for n, ((tool_name, _), observation) in enumerate(zip(actions, observations), 1)
+        ]
+        return f"\n{response}\nObservation:\n" + "\n".join(parts) + "\n", OBSERVATION_MAX_TOKENS * len(actions)
+
+    def _build_input(self, instruction: str, query: str, history, steps: list[tuple[str, int]], iteration: int) -> str:
+        """
+        토큰 예산 안에서 LLM 입력 조립. 잘리는 순서: 대화 기록 -> 오래된 단계 -> 최근 단계
+        (시스템 프롬프트와 질문은 자르지 않음, 도구 결과 1건은 OBSERVATION_MAX_TOKENS까지만)
+        """
+        context = "### 대화 기록 (History):\n" + "\n".join(history) + "\n\n" if history else ""
+        sections = [
+            PromptSection("system", instruction),
+            PromptSection("question", f"사용자 질문: {query}\n"),
+            PromptSection("history", context, priority=len(steps) + 1, keep="tail"),
+        ]
+        for n, (step, max_tokens) in enumerate(steps):
+            sections.append(
+                PromptSection(f"step{n + 1}", step, priority=len(steps) - n, max_tokens=max_tokens)
+            )
+
+        texts = self.budget.fit(sections, label=f"agent loop {iteration}")
+        chain = texts["history"] + texts["question"] + "".join(texts[f"step{n + 1}"] for n in range(len(steps)))
+        return f"{chain}\nThought: "
 
     def _parse_action(self, response: str) -> tuple:
-        """LLM의 응답에서 첫 번째 도구 이름과 인자를 정규표현식으로 정교하게 추출합니다."""
-        # Action: 뒤의 도구명 추출
-        action_match = re.search(r"Action:\s*(\w+)", response)
-        if not action_match:
+        """LLM의 응답에서 첫 번째 도구 이름과 인자를 추출합니다."""
+        return self._parse_actions(response)[0]
+
+    def _parse_actions(self, response: str) -> list[tuple]:
+        """
+        LLM의 응답에서 모든 Action / Action Input 쌍을 순서대로 추출합니다. (최대 AGENT_MAX_ACTIONS개)
+        같은 도구 + 같은 인자의 중복 호출은 한 번만 남깁니다.
+        """
+        matches = list(re.finditer(r"Action:\s*(\w+)", response))
+        if not matches:
             raise ValueError("응답에서 Action 도구명을 찾을 수 없습니다.")
-        tool_name = action_match.group(1).strip()
 
-        # Action Input: 뒤의 JSON 블록 추출
-        # Llama3가 여러 개의 JSON을 출력하는 경우를 대비해 첫 번째 블록만 추출
-        if "Action Input:" not in response:
-            raise ValueError("Action Input 항목을 찾을 수 없습니다.")
-            
-        content_after_action = response.split("Action Input:")[1]
-        
-        # 중괄호 균형을 맞춰서 첫 번째 완결된 JSON 블록 찾기
+        actions = []
+        for n, match in enumerate(matches):
+            tool_name = match.group(1).strip()
+            # 이 Action부터 다음 Action 전까지에서 Action Input을 찾음
+            end = matches[n + 1].start() if n + 1 < len(matches) else len(response)
+            segment = response[match.end():end]
+            if "Action Input:" not in segment:
+                raise ValueError(f"{tool_name}의 Action Input 항목을 찾을 수 없습니다.")
+
+            action = (tool_name, self._parse_json_block(segment.split("Action Input:", 1)[1]))
+            if action not in actions:
+                actions.append(action)
+
+        if len(actions) > AGENT_MAX_ACTIONS:
+            print(f"[Warning] {len(actions)}개의 Action 중 앞의 {AGENT_MAX_ACTIONS}개만 실행합니다.")
+        return actions[:AGENT_MAX_ACTIONS]
+
+    @staticmethod
+    def _parse_json_block(content: str) -> dict:
+        """중괄호 균형을 맞춰서 첫 번째 완결된 JSON 블록을 파싱합니다."""
         brace_count = 0
         json_start = -1
         json_end = -1
         
-        for i, char in enumerate(content_after_action):
+        for i, char in enumerate(content):
             if char == '{':
                 if brace_count == 0:
                     json_start = i
@@ -132,12 +351,12 @@ class ToolAgent:
         if json_start == -1 or json_end == -1:
             raise ValueError("Action Input에서 유효한 JSON 중괄호 블록을 찾을 수 없습니다.")
             
-        json_str = content_after_action[json_start:json_end].strip()
+        json_str = content[json_start:json_end].strip()
         
         try:
             # 큰 따옴표 교체 (Llama3 실수 보정)
             if "'" in json_str and '"' not in json_str:
                 json_str = json_str.replace("'", '"')
-            return tool_name, json.loads(json_str)
+            return json.loads(json_str)
         except json.JSONDecodeError:
             raise ValueError(f"JSON 파싱 실패: {json_str}")
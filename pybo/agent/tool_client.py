@@ -1,25 +1,96 @@
 import asyncio
 import os
-from mcp import ClientSession
-from mcp.client.streamable_http import streamable_http_client
+from pybo.agent.tool_transport import app_context, get_tool_transport
+from pybo.service import async_runtime, metrics
+from pybo.service.single_flight import SingleFlight, make_flight_key
+from pybo.service.tool_cache import LOCAL_INDEX_TOOLS, ToolResultCache, get_tool_cache, register_default_versions
+
+# 에이전트 한 단계에서 동시에 실행할 도구 호출 수
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "3"))
+
+# 모든 ToolClient 인스턴스가 공유 (여러 요청 스레드의 동일한 도구 호출을 하나로 합침)
+_tool_flights = SingleFlight()
+
+# 도구 결과 캐시 (db_forecast_search / rag_search, 데이터/인덱스 버전이 바뀌면 무효화)
+_tool_cache = get_tool_cache()
+register_default_versions(_tool_cache, app_context)
 
 class ToolClient:
-    """MCP 서버와 통신하며 도구를 호출하는 전담 클라이언트"""
+    """MCP 서버와 통신하며 도구를 호출하는 전담 클라이언트 (TOOL_TRANSPORT=inprocess면 같은 프로세스에서 직접 호출)"""
     
-    def __init__(self, mcp_url: str = None):
+    def __init__(self, mcp_url: str = None, transport=None, cache: ToolResultCache = None):
         self.mcp_url = mcp_url or os.getenv("MCP_URL", "http://127.0.0.1:8000/mcp")
+        self.transport = transport or get_tool_transport(self.mcp_url)
+        self.cache = cache or _tool_cache
+
+    def _cacheable(self, tool_name: str) -> bool:
+        # rag_search 등은 인덱스가 있는 프로세스에서 직접 실행할 때만 캐시 (MCP 서버 호출이면 이쪽 파일로는 버전을 알 수 없음)
+        return tool_name not in LOCAL_INDEX_TOOLS or getattr(self.transport, "name", "") == "inprocess"
+
+    @staticmethod
+    def _format(result) -> str:
+        return result.content[0].text if result.content else "결과 없음"
 
     async def call_tool_async(self, tool_name: str, arguments: dict) -> str:
         """비동기 방식으로 MCP 도구를 호출합니다."""
         try:
-            async with streamable_http_client(self.mcp_url) as (read, write, _):
-                async with ClientSession(read, write) as session:
-                    await session.initialize()
-                    result = await session.call_tool(tool_name, arguments)
-                    return result.content[0].text if result.content else "결과 없음"
+            return self._format(await self.transport.acall(tool_name, arguments))
+        except Exception as e:
+            return f"MCP 도구 호출 오류 ({tool_name}): {str(e)}"
+
+    def _call_tool_sync(self, tool_name: str, arguments: dict) -> str:
+        try:
+            return self._format(self.transport.call(tool_name, arguments))
         except Exception as e:
             return f"MCP 도구 호출 오류 ({tool_name}): {str(e)}"
 
+    def call_tool_traced(self, tool_name: str, arguments: dict) -> tuple[str, str]:
+        """
+        call_tool과 같지만 캐시 상태(hit / miss / stale / off)를 함께 반환 (에이전트 추적 로그용)
+        """
+        cacheable = self._cacheable(tool_name)
+        cached, status = self.cache.lookup(tool_name, arguments) if cacheable else (None, "off")
+        if cached is not None:
+            return cached, status
+
+        key = make_flight_key(self.mcp_url, tool_name, arguments)
+        with metrics.timer(metrics.TOOL_LATENCY, tool=tool_name):
+            text = _tool_flights.do(key, lambda: self._call_tool_sync(tool_name, arguments))
+        if cacheable:
+            self.cache.put(tool_name, arguments, text)
+        return text, status
+
     def call_tool(self, tool_name: str, arguments: dict) -> str:
-        """동기 방식으로 MCP 도구를 호출합니다. (GenAIService 등에서 사용)"""
-        return asyncio.run(self.call_tool_async(tool_name, arguments))
+        """
+        동기 방식으로 MCP 도구를 호출합니다. (GenAIService 등에서 사용)
+        캐시에 있으면 바로 반환하고, 같은 도구 + 같은 인자의 호출이 이미 진행 중이면 그 결과를 함께 받습니다.
+        """
+        return self.call_tool_traced(tool_name, arguments)[0]
+
+    async def call_tools_async(self, calls: list[tuple[str, dict]],
+                               max_concurrency: int = TOOL_MAX_CONCURRENCY) -> list[tuple[str, str]]:
+        """여러 도구를 동시에 호출 (최대 max_concurrency개). (결과, 캐시 상태)를 calls 순서대로 반환"""
+        sem = asyncio.Semaphore(max_concurrency)
+
+        async def call(tool_name: str, arguments: dict) -> tuple[str, str]:
+            async with sem:
+                # call_tool_traced의 캐시/중복 호출 합치기/지표 기록을 그대로 사용
+                return await asyncio.to_thread(self.call_tool_traced, tool_name, arguments)
+
+        return list(await asyncio.gather(*(call(name, args) for name, args in calls)))
+
+    def call_tools_traced(self, calls: list[tuple[str, dict]]) -> list[tuple[str, str]]:
+        """동기 방식의 여러 도구 동시 호출. 한 건이면 바로 호출합니다."""
+        if len(calls) == 1:
+            return [self.call_tool_traced(*calls[0])]
+        return async_runtime.run_sync(self.call_tools_async(calls))
+
+    def call_tools(self, calls: list[tuple[str, dict]]) -> list[str]:
+        return [text for text, _ in self.call_tools_traced(calls)]
+
+    def stats(self) -> dict:
+        return {
+            "coalescing": _tool_flights.as_dict(),
+            "transport": self.transport.stats(),
+            "cache": self.cache.stats(),
+        }
@@ -0,0 +1,159 @@
+# 도구 호출 경로 선택
+# - mcp:       MCP 서버(mcp_servers/taike_tools_server.py)에 streamable-HTTP로 호출 (원격 배포)
+# - inprocess: 도구 서버 모듈을 같은 프로세스에 올리고 @mcp.tool() 함수를 직접 호출 (같은 컨테이너에 있을 때)
+# 두 경로 모두 FastMCP의 인자 검증/결과 변환을 거쳐 같은 CallToolResult를 돌려준다
+import asyncio
+import contextvars
+import importlib
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from contextvars import ContextVar
+from typing import Optional
+
+from mcp import types
+
+from pybo.agent.mcp_session_pool import get_mcp_pool
+from pybo.service import async_runtime, replay
+
+TOOL_TRANSPORT = os.getenv("TOOL_TRANSPORT", "mcp")  # mcp / inprocess
+TOOL_SERVER_MODULE = os.getenv("TOOL_SERVER_MODULE", "mcp_servers.taike_tools_server")
+# 같은 프로세스 도구 호출을 실행하는 작업 스레드 수 (스레드마다 이벤트 루프 하나를 계속 사용)
+TOOL_INPROCESS_WORKERS = int(os.getenv("TOOL_INPROCESS_WORKERS", "8"))
+
+# 요청 밖(작업 큐, 사전 생성 스레드)에서 직접 호출할 때 DB 접근용 앱 컨텍스트
+_app = None
+
+# InProcessTransport로 실행 중인 도구 호출인지 (도구 서버가 ToolClient와 같은 지표를 중복 기록하지 않도록)
+_in_process_call: ContextVar[bool] = ContextVar("in_process_tool_call", default=False)
+
+
+def init_app(app) -> None:
+    global _app
+    _app = app
+
+
+def app_context():
+    """요청 중이면 그대로, 아니면 등록된 앱의 컨텍스트 (앱이 없으면 아무것도 하지 않음)"""
+    from flask import has_app_context
+    if has_app_context() or _app is None:
+        return nullcontext()
+    return _app.app_context()
+
+
+def in_process_call() -> bool:
+    return _in_process_call.get()
+
+
+class MCPHttpTransport:
+    name = "mcp"
+
+    def __init__(self, url: str):
+        self.url = url
+
+    async def acall(self, tool_name: str, arguments: dict) -> types.CallToolResult:
+        return await get_mcp_pool(self.url).acall(tool_name, arguments)
+
+    def call(self, tool_name: str, arguments: dict) -> types.CallToolResult:
+        return get_mcp_pool(self.url).call(tool_name, arguments)
+
+    def stats(self) -> dict:
+        return dict(get_mcp_pool(self.url).as_dict(), transport=self.name)
+
+
+class InProcessTransport:
+    """
+    FastMCP.call_tool을 직접 호출 (pydantic 인자 검증 포함).
+    결과는 MCP 서버의 CallTool 처리와 같은 방식으로 CallToolResult로 변환:
+    예외 -> isError + 메시지, 구조화 결과만 있으면 JSON 텍스트
+
+    FastMCP는 동기 도구(rag_search, db_forecast_search 등)를 await한 루프에서 그대로 실행하므로
+    도구 호출은 전용 작업 스레드의 이벤트 루프에서 실행 (공용 루프의 LLM 요청, MCP 연결 풀이 멈추지 않음).
+    작업 스레드의 루프는 만들어 둔 것을 계속 사용하고, 비동기 도구의 LLM 호출은 run_async로 공용 루프의 클라이언트를 사용
+    """
+    name = "inprocess"
+
+    def __init__(self, server=None, module: str = TOOL_SERVER_MODULE, max_workers: int = TOOL_INPROCESS_WORKERS):
+        self._server = server
+        self.module = module
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="inprocess-tool")
+        self.calls = 0
+        self.errors = 0
+
+    @property
+    def server(self):
+        # 도구 서버 모듈은 처음 호출할 때 로드 (RAG 모델 등 초기화 비용이 큼)
+        if self._server is None:
+            with self._lock:
+                if self._server is None:
+                    print(f"[ToolTransport] 도구 서버 모듈 로드: {self.module}")
+                    self._server = importlib.import_module(self.module).mcp
+        return self._server
+
+    async def acall(self, tool_name: str, arguments: dict) -> types.CallToolResult:
+        return await self._acall(tool_name, arguments, self._current_app())
+
+    async def _acall(self, tool_name: str, arguments: dict, app) -> types.CallToolResult:
+        self.calls += 1
+        token = _in_process_call.set(True)
+        try:
+            # contextvars(_in_process_call 등)를 작업 스레드로 복사
+            context = contextvars.copy_context()
+            results = await asyncio.get_running_loop().run_in_executor(
+                self._executor, context.run, self._call_in_worker, app, tool_name, arguments
+            )
+        except Exception as e:
+            self.errors += 1
+            return types.CallToolResult(content=[types.TextContent(type="text", text=str(e))], isError=True)
+        finally:
+            _in_process_call.reset(token)
+
+        structured = None
+        if isinstance(results, tuple) and len(results) == 2:
+            content, structured = results
+        elif isinstance(results, dict):
+            structured = results
+            content = [types.TextContent(type="text", text=json.dumps(results, indent=2))]
+        else:
+            content = results
+        return types.CallToolResult(content=list(content), structuredContent=structured)
+
+    @staticmethod
+    def _current_app():
+        from flask import current_app, has_app_context
+        return current_app._get_current_object() if has_app_context() else _app
+
+    def _worker_loop(self) -> asyncio.AbstractEventLoop:
+        loop = getattr(self._local, "loop", None)
+        if loop is None:
+            loop = self._local.loop = asyncio.new_event_loop()
+        return loop
+
+    def _call_in_worker(self, app, tool_name: str, arguments: dict):
+        # 작업 스레드에서는 DB 세션이 요청 스레드와 섞이지 않도록 앱 컨텍스트를 새로 만듦
+        with app.app_context() if app is not None else nullcontext():
+            return self._worker_loop().run_until_complete(self.server.call_tool(tool_name, arguments))
+
+    def call(self, tool_name: str, arguments: dict) -> types.CallToolResult:
+        # 공용 루프에 맡기고 결과를 기다림 (호출한 스레드의 앱을 작업 스레드에 전달)
+        return async_runtime.run_sync(self._acall(tool_name, arguments, self._current_app()))
+
+    def stats(self) -> dict:
+        return {"transport": self.name, "module": self.module, "calls": self.calls, "errors": self.errors}
+
+
+_inprocess: Optional[InProcessTransport] = None
+
+
+def get_tool_transport(mcp_url: str, kind: str = None):
+    """TOOL_TRANSPORT 설정에 따른 도구 호출 경로 (inprocess는 프로세스당 하나, 기록/재생 모드면 감싸서 반환)"""
+    global _inprocess
+    if (kind or TOOL_TRANSPORT) == "inprocess":
+        if _inprocess is None:
+            _inprocess = InProcessTransport()
+        return replay.wrap_tool_transport(_inprocess)
+    return replay.wrap_tool_transport(MCPHttpTransport(mcp_url))
@@ -58,6 +58,11 @@ class Question(db.Model):
     user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='CASCADE'))
     user = db.relationship('Users', backref=db.backref('question_set'))
 
+    # 목록 keyset 페이징 (create_date, id) 정렬용 인덱스
+    __table_args__ = (
+        db.Index('ix_question_create_date_id', 'create_date', 'id'),
+    )
+
 
 class Answer(db.Model):
     __tablename__ = 'answer'
@@ -109,4 +114,26 @@ class GenAIChatLog(db.Model):
     user = db.relationship(
         'Users',
         backref=db.backref('genai_chat_logs', lazy='dynamic')
-    )
\ No newline at end of file
+    )
+
+class GenAIPrecomputed(db.Model):
+    """야간 배치로 미리 생성해 둔 보고서/정책 (data_version이 현재 데이터와 같을 때만 사용)"""
+    __tablename__ = 'genai_precomputed'
+    __table_args__ = (
+        db.UniqueConstraint('task_type', 'district', 'start_year', 'end_year', 'model_version',
+                            name='uq_genai_precomputed_key'),
+    )
+
+    id = db.Column(db.Integer, db.Sequence('genai_precomputed_seq'), primary_key=True)
+
+    task_type = db.Column(db.String(20), nullable=False)      # report / policy
+    district = db.Column(db.String(50), nullable=False)
+    start_year = db.Column(db.Integer, nullable=False, default=0)  # policy는 0
+    end_year = db.Column(db.Integer, nullable=False, default=0)
+    model_version = db.Column(db.String(20), nullable=False)
+
+    data_version = db.Column(db.String(40), nullable=False)   # 생성 당시 지역 데이터 버전
+    result = db.Column(db.Text(), nullable=False)
+    elapsed_sec = db.Column(db.Float)
+
+    created_at = db.Column(db.DateTime(), nullable=False, server_default=db.func.now())
@@ -0,0 +1,73 @@
+# 프로세스 공용 백그라운드 이벤트 루프 (동기 Flask 워커에서 비동기 클라이언트를 쓰기 위함)
+import asyncio
+import atexit
+import threading
+from concurrent.futures import Future
+
+_loop: asyncio.AbstractEventLoop | None = None
+_thread: threading.Thread | None = None
+_lock = threading.Lock()
+
+
+def get_loop() -> asyncio.AbstractEventLoop:
+    """백그라운드 스레드에서 계속 도는 이벤트 루프 (최초 호출 시 시작)"""
+    global _loop, _thread
+    if _loop is not None:
+        return _loop
+    with _lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            thread = threading.Thread(target=loop.run_forever, name="pybo-async-loop", daemon=True)
+            thread.start()
+            _loop, _thread = loop, thread
+    return _loop
+
+
+def submit(coro) -> Future:
+    return asyncio.run_coroutine_threadsafe(coro, get_loop())
+
+
+def run_sync(coro, timeout: float | None = None, is_cancelled=None, poll_interval: float = 0.5):
+    """
+    코루틴을 백그라운드 루프에서 실행하고 결과를 기다림 (동기 코드용).
+    is_cancelled()가 True가 되거나 대기 중 예외(GeneratorExit 등)가 나면 작업도 취소한다.
+    """
+    future = submit(coro)
+    try:
+        if is_cancelled is None:
+            return future.result(timeout=timeout)
+
+        waited = 0.0
+        while True:
+            try:
+                return future.result(timeout=poll_interval)
+            except TimeoutError:
+                waited += poll_interval
+                if is_cancelled():
+                    future.cancel()
+                    raise asyncio.CancelledError("호출 측에서 요청을 취소했습니다.")
+                if timeout is not None and waited >= timeout:
+                    raise
+    except BaseException:
+        future.cancel()
+        raise
+
+
+async def run_async(coro):
+    """다른 이벤트 루프(MCP 서버, ASGI 등)에서 백그라운드 루프의 코루틴을 await (취소도 전파됨)"""
+    loop = get_loop()
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        return await coro
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+
+def _shutdown() -> None:
+    if _loop is not None and _loop.is_running():
+        _loop.call_soon_threadsafe(_loop.stop)
+
+
+atexit.register(_shutdown)
@@ -0,0 +1,167 @@
+# 세션/사용자별 대화 기록 저장소 (토큰 수 기준으로 오래된 턴부터 제거)
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from pybo.service.token_counter import count_tokens
+
+try:  # 여러 워커가 대화 기록을 공유하려면 redis 필요 (CONVERSATION_BACKEND=redis)
+    import redis
+except ImportError:
+    redis = None
+
+CONVERSATION_BACKEND = os.getenv("CONVERSATION_BACKEND", "local")  # local | redis
+CONVERSATION_REDIS_URL = os.getenv("CONVERSATION_REDIS_URL", "redis://localhost:6379/0")
+CONVERSATION_MAX_TOKENS = int(os.getenv("CONVERSATION_MAX_TOKENS", "600"))            # 대화 하나당 기록 토큰 상한
+CONVERSATION_IDLE_TTL = int(os.getenv("CONVERSATION_IDLE_TTL", "1800"))              # 이 시간 동안 안 쓰면 삭제(초)
+CONVERSATION_GLOBAL_MAX_TOKENS = int(os.getenv("CONVERSATION_GLOBAL_MAX_TOKENS", "2000000"))  # 전체 상한 (local)
+
+
+class LocalConversationBackend:
+    """
+    프로세스 내부 저장소 (기본값, 테스트용).
+    오래 안 쓴 대화부터 제거(LRU)하며, 전체 토큰 합이 global_max_tokens를 넘지 않게 유지
+    """
+
+    def __init__(self, idle_ttl: int = CONVERSATION_IDLE_TTL, global_max_tokens: int = CONVERSATION_GLOBAL_MAX_TOKENS):
+        self.idle_ttl = idle_ttl
+        self.global_max_tokens = global_max_tokens
+        self._lock = threading.Lock()
+        self._data: OrderedDict[str, tuple[list, int, float]] = OrderedDict()  # id -> (turns, 토큰 합, 마지막 사용)
+        self._total_tokens = 0
+        self.evictions = 0
+
+    def get(self, conversation_id: str) -> Optional[list]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._data.get(conversation_id)
+            if entry is None:
+                return None
+            turns, tokens, last_used = entry
+            if now - last_used > self.idle_ttl:
+                self._remove(conversation_id)
+                return None
+            self._data[conversation_id] = (turns, tokens, now)
+            self._data.move_to_end(conversation_id)
+            return list(turns)
+
+    def set(self, conversation_id: str, turns: list) -> None:
+        tokens = sum(t["tokens"] for t in turns)
+        now = time.monotonic()
+        with self._lock:
+            self._remove(conversation_id)
+            self._data[conversation_id] = (list(turns), tokens, now)
+            self._total_tokens += tokens
+            self._evict(now)
+
+    def delete(self, conversation_id: str) -> None:
+        with self._lock:
+            self._remove(conversation_id)
+
+    def _remove(self, conversation_id: str) -> None:
+        entry = self._data.pop(conversation_id, None)
+        if entry is not None:
+            self._total_tokens -= entry[1]
+
+    def _evict(self, now: float) -> None:
+        # 맨 앞이 가장 오래 안 쓴 대화
+        while self._data:
+            oldest_id, (_, _, last_used) = next(iter(self._data.items()))
+            if now - last_used <= self.idle_ttl and self._total_tokens <= self.global_max_tokens:
+                break
+            self._remove(oldest_id)
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "backend": "local",
+                "conversations": len(self._data),
+                "tokens": self._total_tokens,
+                "global_max_tokens": self.global_max_tokens,
+                "evictions": self.evictions,
+            }
+
+
+class RedisConversationBackend:
+    """
+    여러 워커 프로세스가 공유하는 저장소.
+    유휴 만료는 키 TTL로 처리하고, 전체 메모리 상한은 redis의 maxmemory + allkeys-lru 설정에 맡김
+    """
+
+    KEY_PREFIX = "pybo:conversation:"
+
+    def __init__(self, url: str = CONVERSATION_REDIS_URL, idle_ttl: int = CONVERSATION_IDLE_TTL):
+        if redis is None:
+            raise RuntimeError("CONVERSATION_BACKEND=redis 사용에는 redis 패키지가 필요합니다.")
+        self.client = redis.Redis.from_url(url)
+        self.idle_ttl = idle_ttl
+
+    def get(self, conversation_id: str) -> Optional[list]:
+        key = self.KEY_PREFIX + conversation_id
+        raw = self.client.get(key)
+        if raw is None:
+            return None
+        self.client.expire(key, self.idle_ttl)
+        return json.loads(raw)
+
+    def set(self, conversation_id: str, turns: list) -> None:
+        self.client.setex(self.KEY_PREFIX + conversation_id, self.idle_ttl, json.dumps(turns, ensure_ascii=False))
+
+    def delete(self, conversation_id: str) -> None:
+        self.client.delete(self.KEY_PREFIX + conversation_id)
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+
+class ConversationStore:
+    """대화별 ring buffer. 새 턴을 넣을 때 max_tokens를 넘으면 가장 오래된 턴부터 버림"""
+
+    def __init__(self, backend=None, max_tokens: int = CONVERSATION_MAX_TOKENS):
+        self.backend = backend or LocalConversationBackend()
+        self.max_tokens = max_tokens
+
+    def history(self, conversation_id: Optional[str]) -> list[str]:
+        """에이전트에 넘길 형식 ["Q: ...", "A: ...", ...]"""
+        if not conversation_id:
+            return []
+        lines = []
+        for turn in self.backend.get(conversation_id) or []:
+            lines.append(f"Q: {turn['q']}")
+            lines.append(f"A: {turn['a']}")
+        return lines
+
+    def append(self, conversation_id: Optional[str], question: str, answer: str) -> None:
+        if not conversation_id or not answer:
+            return
+        turn = {"q": question, "a": answer, "tokens": count_tokens(question) + count_tokens(answer)}
+        if turn["tokens"] > self.max_tokens:
+            return  # 한 턴이 상한보다 크면 기록하지 않음 (다음 질문의 프롬프트만 키움)
+
+        turns = (self.backend.get(conversation_id) or []) + [turn]
+        total = sum(t["tokens"] for t in turns)
+        while total > self.max_tokens:
+            total -= turns.pop(0)["tokens"]
+        self.backend.set(conversation_id, turns)
+
+    def clear(self, conversation_id: str) -> None:
+        self.backend.delete(conversation_id)
+
+    def stats(self) -> dict:
+        return {"max_tokens": self.max_tokens, **self.backend.stats()}
+
+
+# 싱글톤 인스턴스
+_conversation_store_instance = None
+
+
+def get_conversation_store() -> ConversationStore:
+    global _conversation_store_instance
+    if _conversation_store_instance is None:
+        backend = RedisConversationBackend() if CONVERSATION_BACKEND == "redis" else LocalConversationBackend()
+        _conversation_store_instance = ConversationStore(backend=backend)
+    return _conversation_store_instance
@@ -1,5 +1,15 @@
 from pybo.service.region_repository import RegionRepository
 
+# 비교 API에서 허용하는 지표: metric -> (실측 컬럼, 예측 컬럼)
+COMPARE_METRICS = {
+    "child_user": ("child_user", "predicted_child_user"),
+    "single_parent": ("single_parent", "single_parent"),
+    "basic_beneficiaries": ("basic_beneficiaries", "basic_beneficiaries"),
+    "multicultural_hh": ("multicultural_hh", "multicultural_hh"),
+    "academy_cnt": ("academy_cnt", "academy_cnt"),
+    "grdp": ("grdp", "grdp"),
+}
+
 # 대시보드, 머신러닝 예측 관련 데이터를 DB에서 조회하고 가공하는 서비스 클래스
 class DataService:
 
@@ -207,4 +217,79 @@ class DataService:
             "success": True,
             "district": district,
             "items": items,
-        }
\ No newline at end of file
+        }
+
+    # 자치구 비교/순위 (열 단위 응답)
+    def get_compare_data(self, districts: list[str] | None, metric: str = "child_user") -> dict:
+
+        if metric not in COMPARE_METRICS:
+            return {
+                "success": False,
+                "error": f"지원하지 않는 지표입니다: {metric}",
+                "metrics": list(COMPARE_METRICS),
+            }
+
+        actual_col, forecast_col = COMPARE_METRICS[metric]
+        rows = self.region_repo.get_compare_rows(actual_col, forecast_col)
+
+        # (구, 연도) -> 값, 연도 -> 예측 여부
+        values: dict[tuple[str, int], float] = {}
+        year_is_pred: dict[int, bool] = {}
+        for r in rows:
+            if r.district in (None, "", " ") or r.value is None:
+                continue
+            year = int(r.year)
+            values[(r.district, year)] = float(r.value)
+            year_is_pred[year] = bool(r.is_pred)
+
+        years = sorted(year_is_pred)
+        all_districts = sorted({d for d, _ in values})
+
+        # 선택 구가 없거나 '전체'면 모든 구 반환
+        if not districts or "전체" in districts:
+            selected = all_districts
+        else:
+            selected = [d for d in districts if d in all_districts]
+
+        series = {d: [] for d in selected}
+        rank = {d: [] for d in selected}
+        percentile = {d: [] for d in selected}
+        share = {d: [] for d in selected}
+        totals = []
+
+        # 순위, 백분위, 비중은 항상 서울시 전체 구 기준으로 계산
+        for year in years:
+            year_values = {d: values[(d, year)] for d in all_districts if (d, year) in values}
+            total = sum(year_values.values())
+            ordered = sorted(year_values.values(), reverse=True)
+            n = len(ordered)
+            totals.append(total)
+
+            for d in selected:
+                v = year_values.get(d)
+                if v is None:
+                    series[d].append(None)
+                    rank[d].append(None)
+                    percentile[d].append(None)
+                    share[d].append(None)
+                    continue
+
+                r = ordered.index(v) + 1  # 동점은 같은 순위
+                below = sum(1 for x in ordered if x < v)
+                series[d].append(round(v, 2))
+                rank[d].append(r)
+                percentile[d].append(round(below / (n - 1) * 100, 1) if n > 1 else 100.0)
+                share[d].append(round(v / total * 100, 2) if total else None)
+
+        return {
+            "success": True,
+            "metric": metric,
+            "years": years,
+            "is_pred": [year_is_pred[y] for y in years],
+            "districts": selected,
+            "total": [round(t, 2) for t in totals],
+            "values": series,
+            "rank": rank,
+            "percentile": percentile,
+            "share": share,
+        }
@@ -0,0 +1,123 @@
+import csv
+import io
+
+from sqlalchemy import DateTime, Float, Integer
+
+from pybo.models import RegionData, RegionForecast
+from pybo.service.region_repository import RegionRepository
+
+try:  # parquet 내보내기는 pyarrow가 설치된 경우에만 지원
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+EXPORT_MODELS = {
+    "region_data": RegionData,
+    "region_forecast": RegionForecast,
+}
+
+EXPORT_FORMATS = ("csv", "parquet")
+
+
+class _StreamSink(io.RawIOBase):
+    """ParquetWriter가 쓴 바이트를 모아두었다가 꺼내갈 수 있게 하는 버퍼 (tell은 누적 위치 유지)"""
+
+    def __init__(self):
+        self._chunks = []
+        self._pos = 0
+
+    def writable(self):
+        return True
+
+    def write(self, b):
+        data = bytes(b)
+        self._chunks.append(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+# RegionData / RegionForecast 테이블을 CSV, Parquet으로 스트리밍 내보내기
+class ExportService:
+
+    def __init__(self, region_repo: RegionRepository | None = None):
+        self.region_repo = region_repo or RegionRepository()
+
+    # 요청 파라미터 검증 (오류 메시지 반환, 정상이면 None)
+    def validate(self, dataset: str, fmt: str, columns: list[str]) -> str | None:
+        model = EXPORT_MODELS.get(dataset)
+        if model is None:
+            return f"지원하지 않는 데이터셋입니다: {dataset}"
+        if fmt not in EXPORT_FORMATS:
+            return f"지원하지 않는 형식입니다: {fmt}"
+        if fmt == "parquet" and pa is None:
+            return "parquet 내보내기에는 pyarrow 패키지가 필요합니다."
+
+        available = model.__table__.columns.keys()
+        unknown = [c for c in columns if c not in available]
+        if unknown:
+            return f"존재하지 않는 컬럼입니다: {', '.join(unknown)}"
+        return None
+
+    def resolve_columns(self, dataset: str, columns: list[str]) -> list[str]:
+        return columns or list(EXPORT_MODELS[dataset].__table__.columns.keys())
+
+    def iter_csv(self, dataset, columns, start_year, end_year, districts, arraysize):
+        model = EXPORT_MODELS[dataset]
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+
+        # 엑셀에서 한글이 깨지지 않도록 BOM 포함
+        writer.writerow(columns)
+        yield "\ufeff" + buf.getvalue()
+
+        for rows in self.region_repo.iter_export_rows(
+            model, columns, start_year, end_year, districts, arraysize
+        ):
+            buf.seek(0)
+            buf.truncate(0)
+            writer.writerows(rows)
+            yield buf.getvalue()
+
+    def iter_parquet(self, dataset, columns, start_year, end_year, districts, arraysize):
+        model = EXPORT_MODELS[dataset]
+        schema = pa.schema([
+            (c, self._arrow_type(model.__table__.columns[c].type)) for c in columns
+        ])
+
+        sink = _StreamSink()
+        writer = pq.ParquetWriter(sink, schema)
+        try:
+            # arraysize 단위 배치를 row group 하나로 기록하고 바로 내보냄
+            for rows in self.region_repo.iter_export_rows(
+                model, columns, start_year, end_year, districts, arraysize
+            ):
+                arrays = [pa.array([r[i] for r in rows], type=schema.field(i).type)
+                          for i in range(len(columns))]
+                writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                chunk = sink.drain()
+                if chunk:
+                    yield chunk
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    @staticmethod
+    def _arrow_type(col_type):
+        if isinstance(col_type, Integer):
+            return pa.int64()
+        if isinstance(col_type, Float):
+            return pa.float64()
+        if isinstance(col_type, DateTime):
+            return pa.timestamp("us")
+        return pa.string()
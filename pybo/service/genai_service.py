@@ -1,4 +1,3 @@
-import requests
 import json
 import os
 import time
@@ -11,15 +10,20 @@ from pybo import db
 from pybo.models import RegionForecast
 from sqlalchemy import func
 
-from requests.adapters import HTTPAdapter
-from urllib3.util.retry import Retry
+from pybo.service import metrics
+from pybo.service.llm_client import LLMError, get_llm_client
+from pybo.service.conversation_store import get_conversation_store
+from pybo.service.query_router import Intent, lookup_answer, lookup_args, lookup_failed, match_query, route_query
 
 # 리팩토링된 에이전트 모듈 임포트
-from pybo.agent.tool_agent import ToolAgent
+from pybo.agent.tool_agent import PlanStep, ToolAgent
 from pybo.agent.prompts import QA_SYSTEM_PROMPT, REPORT_SYSTEM_PROMPT, POLICY_SYSTEM_PROMPT
 
 load_dotenv()
 
+# 보고서/정책처럼 도구 호출 순서가 정해진 임무는 ReAct 루프 대신 고정 파이프라인으로 실행 (0이면 ReAct 루프 사용)
+AGENT_FAST_PATH = os.getenv("AGENT_FAST_PATH", "1") == "1"
+
 
 @dataclass
 class QueryMeta:
@@ -33,21 +37,14 @@ class GenAIService:
         self.api_url = os.getenv("RUNPOD_API_URL")
         self._rag_service = None
 
-        # 세션 + Retry 설정 (런포드 일시 장애에 강해짐)
-        self.session = requests.Session()
-        retry = Retry(
-            total=2, # 최대 재시도 횟수
-            backoff_factor=0.6, # 0.6s, 1.2s 형태로 증가
-            status_forcelist=(429, 500, 502, 503, 504),
-            allowed_methods=frozenset(["POST"]),
-            raise_on_status=False,
-        )
-        adapter = HTTPAdapter(max_retries=retry, pool_connections=10, pool_maxsize=10)
-        self.session.mount("http://", adapter)
-        self.session.mount("https://", adapter)
+        # 비동기 LLM 클라이언트 (keep-alive 풀, 동시성 제한, 재시도 포함)
+        self.llm_client = get_llm_client()
 
         self.default_settings = {"temperature": 0.3, "max_new_tokens": 512}
 
+        # 대화 기록 (세션/사용자별, 토큰 수 상한)
+        self.conversations = get_conversation_store()
+
         self._summarizer = None
 
     @property
@@ -63,7 +60,10 @@ class GenAIService:
     def agent(self):
         # 에이전트 엔진 초기화 (LLM 콜백 전달)
         if not hasattr(self, "_agent_instance"):
-            self._agent_instance = ToolAgent(llm_callback=self._call_llama3)
+            self._agent_instance = ToolAgent(
+                llm_callback=self._call_llama3,
+                llm_stream_callback=self._stream_llama3,
+            )
         return self._agent_instance
 
     @staticmethod
@@ -83,64 +83,112 @@ class GenAIService:
         model_version: str = "final",
         temperature: Optional[float] = None,
         timeout: Tuple[float, float] = (10.0, 180.0),  # (connect, read)
+        task_type: str = "generate",
+        stop: Optional[list] = None,
     ) -> str:
         start = time.time()
-        headers = {"Content-Type": "application/json"}
-        payload = {
-            "instruction": instruction,
-            "input": input_text,
-            "model_version": model_version,
-            "max_new_tokens": max_new_tokens or self.default_settings["max_new_tokens"],
-            "temperature": temperature if temperature is not None else self.default_settings["temperature"],
-        }
 
         try:
-            response = self.session.post(self.api_url, json=payload, headers=headers, timeout=timeout)
-            # raise_for_status는 Retry와 같이 쓸 때 불편해질 수 있으니 여기선 status_code로 처리
-            if not (200 <= response.status_code < 300):
-                print(f"[LLM ERROR] status={response.status_code}, body={response.text[:300]}")
-                return "AI 서버 오류로 답변 생성에 실패했습니다. 잠시 후 다시 시도해주세요."
-
+            text = self.llm_client.generate(
+                instruction,
+                input_text,
+                model_version=model_version,
+                max_new_tokens=max_new_tokens or self.default_settings["max_new_tokens"],
+                temperature=temperature if temperature is not None else self.default_settings["temperature"],
+                timeout=timeout,
+                task_type=task_type,
+                stop=stop,
+            )
             elapsed = time.time() - start
             print(f"--- AI 추론 완료 (소요시간: {elapsed:.2f}초) ---")
+            return text
 
-            return (response.json().get("text", "") or "").strip()
-
-        except requests.exceptions.Timeout:
-            print("[LLM TIMEOUT] AI 서버 응답 지연")
-            return "AI 서버 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
-        except requests.exceptions.RequestException as e:
+        except LLMError as e:
+            metrics.FALLBACK_RESPONSES.inc(source="web", kind=e.kind)
+            if e.kind == "timeout":
+                print("[LLM TIMEOUT] AI 서버 응답 지연")
+                return "AI 서버 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
+            if e.kind == "status":
+                print(f"[LLM ERROR] {e}")
+                return "AI 서버 오류로 답변 생성에 실패했습니다. 잠시 후 다시 시도해주세요."
+            if e.kind == "cancelled":
+                print("[LLM CANCELLED] 클라이언트 요청 취소")
+                return ""
             print(f"[LLM REQUEST ERROR] {e}")
             return "AI 서버 통신 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
         except Exception as e:
+            metrics.FALLBACK_RESPONSES.inc(source="web", kind="unknown")
             print(f"[LLM UNKNOWN ERROR] {e}")
             return "AI 서버 처리 중 알 수 없는 오류가 발생했습니다."
 
-    # 보고서 (Agentic AI - 에이전트 엔진에게 위임)
-    def generate_report_with_data(self, user_prompt: str, **kwargs) -> str:
-        district = kwargs.get("district", "전체")
-        start_year = kwargs.get("start_year", 2023)
-        end_year = kwargs.get("end_year", 2030)
-        
-        mission = (
+    # 런포드 스트리밍 호출 (토큰 단위, 오류 시 안내 문구를 한 번에 내보냄)
+    def _stream_llama3(
+        self,
+        instruction: str,
+        input_text: str,
+        max_new_tokens: Optional[int] = None,
+        model_version: str = "final",
+        temperature: Optional[float] = None,
+        timeout: Tuple[float, float] = (10.0, 180.0),
+        task_type: str = "generate",
+        stop: Optional[list] = None,
+    ):
+        start = time.time()
+        first_token_at = None
+        try:
+            for token in self.llm_client.stream(
+                instruction,
+                input_text,
+                model_version=model_version,
+                max_new_tokens=max_new_tokens or self.default_settings["max_new_tokens"],
+                temperature=temperature if temperature is not None else self.default_settings["temperature"],
+                timeout=timeout,
+                task_type=task_type,
+                stop=stop,
+            ):
+                if first_token_at is None:
+                    first_token_at = time.time() - start
+                yield token
+            elapsed = time.time() - start
+            print(f"--- AI 스트리밍 완료 (첫 토큰: {first_token_at or elapsed:.2f}초, 전체: {elapsed:.2f}초) ---")
+
+        except LLMError as e:
+            metrics.FALLBACK_RESPONSES.inc(source="web", kind=e.kind)
+            if e.kind == "timeout":
+                print("[LLM TIMEOUT] AI 서버 응답 지연")
+                yield "AI 서버 응답이 지연되고 있습니다. 잠시 후 다시 시도해주세요."
+            elif e.kind == "status":
+                print(f"[LLM ERROR] {e}")
+                yield "AI 서버 오류로 답변 생성에 실패했습니다. 잠시 후 다시 시도해주세요."
+            elif e.kind != "cancelled":
+                print(f"[LLM REQUEST ERROR] {e}")
+                yield "AI 서버 통신 중 오류가 발생했습니다. 잠시 후 다시 시도해주세요."
+        except Exception as e:
+            metrics.FALLBACK_RESPONSES.inc(source="web", kind="unknown")
+            print(f"[LLM UNKNOWN ERROR] {e}")
+            yield "AI 서버 처리 중 알 수 없는 오류가 발생했습니다."
+
+    @staticmethod
+    def _report_mission(district: str, start_year: int, end_year: int) -> str:
+        return (
             f"[지시상황: {district} 지역아동센터 분석 보고서 작성 임무]\n"
             f"1. db_forecast_search를 사용하여 {start_year}~{end_year}년 인구 데이터를 먼저 조회하라.\n"
             f"2. 위 데이터 수치를 바탕으로 분석하여 create_report_task 도구로 보고서를 작성하라.\n"
             "3. 인사말이나 진행 설명은 생략하고 오직 보고서의 최종 결과물만 'Final Answer:'로 제출하라."
         )
-        raw_response = self.agent.run(mission, instruction=REPORT_SYSTEM_PROMPT)
-        
+
+    @staticmethod
+    def _wrap_report(district: str, content: str) -> str:
         report_data = {
             "title": f"{district} 아동복지 데이터 분석 보고서",
             "summary": "AI 자율 분석 기반 보고서",
-            "content": raw_response
+            "content": content
         }
         return json.dumps(report_data, ensure_ascii=False)
 
-    # 정책 아이디어 (에이전트 위임)
-    def generate_policy(self, user_prompt: str, **kwargs) -> str:
-        district = kwargs.get("district", "전체")
-        mission = (
+    @staticmethod
+    def _policy_mission(district: str) -> str:
+        return (
             f"[지시상황: {district} 지역 맞춤형 정책 제안 임무]\n"
             "**반드시 아래 순서대로 실행하십시오:**\n"
             "1단계: db_forecast_search를 호출하여 지역의 통계 트렌드를 먼저 확인하라.\n"
@@ -148,50 +196,139 @@ class GenAIService:
             "**주의: 1단계 결과가 나오기 전에 2단계를 앞서서 진행하지 마십시오.**\n"
             "최종 결과인 정책 본문만 'Final Answer:'로 제출하십시오."
         )
-        return self.agent.run(mission, instruction=POLICY_SYSTEM_PROMPT)
+
+    @staticmethod
+    def _report_plan(district: str, start_year: int, end_year: int) -> list[PlanStep]:
+        # _report_mission과 같은 순서: 데이터 조회 -> 보고서 작성
+        return [
+            PlanStep("data", "db_forecast_search",
+                     lambda r: {"district": district, "start_year": start_year, "end_year": end_year}),
+            PlanStep("report", "create_report_task",
+                     lambda r: {"data_context": r["data"], "district": district}),
+        ]
+
+    @staticmethod
+    def _policy_plan(district: str) -> list[PlanStep]:
+        # _policy_mission과 같은 순서: 통계 조회 -> 정책 생성
+        return [
+            PlanStep("data", "db_forecast_search", lambda r: {"district": district}),
+            PlanStep("policy", "create_policy_task",
+                     lambda r: {"data_context": r["data"], "district": district}),
+        ]
+
+    # 임무 실행 (고정 파이프라인 또는 ReAct 루프, 이벤트 형식은 동일)
+    def _run_mission(self, mission: str, plan: list[PlanStep], instruction: str, task_type: str,
+                     stream: bool = True, model_version: str = "final"):
+        if AGENT_FAST_PATH:
+            return self.agent.run_plan_events(plan, model_version=model_version, stream=stream, task_type=task_type)
+        return self.agent.run_events(
+            mission, instruction=instruction, stream=stream, task_type=task_type, model_version=model_version
+        )
+
+    # 보고서 (Agentic AI - 에이전트 엔진에게 위임)
+    def generate_report_with_data(self, user_prompt: str, **kwargs) -> str:
+        answer = ""
+        for event, data in self.stream_report_with_data(user_prompt, stream=False, **kwargs):
+            if event == "done":
+                answer = data
+        return answer
+
+    # 보고서 스트리밍 (("step"|"token"|"done", data) 이벤트)
+    def stream_report_with_data(self, user_prompt: str, **kwargs):
+        district = kwargs.get("district", "전체")
+        start_year = kwargs.get("start_year", 2023)
+        end_year = kwargs.get("end_year", 2030)
+
+        stream = kwargs.get("stream", True)  # False면 토큰 이벤트 없이 step/done만
+
+        for event, data in self._run_mission(
+            self._report_mission(district, start_year, end_year),
+            self._report_plan(district, start_year, end_year),
+            REPORT_SYSTEM_PROMPT, "report", stream=stream,
+            model_version=kwargs.get("model_version", "final"),
+        ):
+            if event == "done":
+                data = self._wrap_report(district, data)
+            yield event, data
+
+    # 정책 아이디어 (에이전트 위임)
+    def generate_policy(self, user_prompt: str, **kwargs) -> str:
+        answer = ""
+        for event, data in self.stream_policy(user_prompt, stream=False, **kwargs):
+            if event == "done":
+                answer = data
+        return answer
+
+    def stream_policy(self, user_prompt: str, **kwargs):
+        district = kwargs.get("district", "전체")
+        yield from self._run_mission(
+            self._policy_mission(district), self._policy_plan(district),
+            POLICY_SYSTEM_PROMPT, "policy", stream=kwargs.get("stream", True),
+            model_version=kwargs.get("model_version", "final"),
+        )
 
     # QA (에이전트 위임)
     def answer_qa_with_log(self, question: str, **kwargs) -> str:
-        # 단기 메모리 (history) 관리
-        if not hasattr(self, "_chat_history"):
-            self._chat_history = []
-            
-        # 인사말 처리 (인사말일 때도 히스토리엔 남김)
-        greetings = ["안녕", "반가워", "하이", "hello", "hi", "누구"]
-        is_greet = any(greet in (question or "").lower() for greet in greetings) and len(question.strip()) < 15
-        
-        if is_greet:
-            # 인삿말도 에이전트의 안정적인 루프와 언어 제어를 따르도록 수정
-            answer = self.agent.run(question, instruction=QA_SYSTEM_PROMPT, history=self._chat_history)
-        else:
-            # 에이전트 실행 시 히스토리 및 QA 전용 프롬프트 전달
-            answer = self.agent.run(question, instruction=QA_SYSTEM_PROMPT, history=self._chat_history)
-        
-        # 히스토리에 추가 (추론 과정 제외, 오직 질문과 결과만 저장)
-        self._chat_history.append(f"Q: {question}")
-        self._chat_history.append(f"A: {answer}")
-        
-        # 히스토리 크기 제한 (최근 3턴 정도만 유지하여 할루시네이션 방지)
-        if len(self._chat_history) > 6:
-            self._chat_history = self._chat_history[-6:]
-            
+        answer = ""
+        for event, data in self.stream_qa_with_log(question, stream=False, **kwargs):
+            if event == "done":
+                answer = data
         return answer
 
-    # 메타 추출 (필요시 도구 내부에서 처리하거나 제거)
+    # QA 스트리밍 (완료 후 히스토리 반영)
+    # conversation_id: 세션/사용자별 대화 구분 키 (없으면 대화 기록 없이 단발 질문으로 처리)
+    def stream_qa_with_log(self, question: str, stream: bool = True, **kwargs):
+        conversation_id = kwargs.get("conversation_id")
+        history = self.conversations.history(conversation_id)
+        intent = route_query(question)
+
+        answer = None
+        if intent.kind == "lookup":
+            # 단순 통계 조회: LLM 없이 DB(도구 결과 캐시) 값으로 템플릿 답변
+            for event, data in self._answer_lookup(intent):
+                if event == "done":
+                    answer = data
+                yield event, data
+
+        if answer is None:
+            # 에이전트 실행 시 히스토리 및 QA 전용 프롬프트 전달, 추출한 자치구/연도/문서 유형을 질문 뒤에 붙임
+            # (인사말도 에이전트의 안정적인 루프와 언어 제어를 따름)
+            hint = intent.entities.hint()
+            query = f"{question}\n{hint}" if hint else question
+            for event, data in self.agent.run_events(
+                query, instruction=QA_SYSTEM_PROMPT, history=history, stream=stream, task_type="qa",
+                model_version=kwargs.get("model_version", "final"),
+            ):
+                if event == "done":
+                    answer = data
+                yield event, data
+
+        # 히스토리에 추가 (추론 과정 제외, 오직 질문과 결과만 저장, 토큰 상한 초과분은 오래된 턴부터 제거)
+        self.conversations.append(conversation_id, question, answer)
+
+    def _answer_lookup(self, intent: Intent):
+        """db_forecast_search 결과로 답변. 조회 실패/데이터 없음이면 이벤트 없이 끝남 (호출한 쪽이 에이전트로 처리)"""
+        args = lookup_args(intent.entities)
+        print(f"--- [QA Lookup] db_forecast_search({args}) ---")
+        data, cache_status = self.agent.tool_client.call_tool_traced("db_forecast_search", args)
+        print(f"--- [Agent Observation] db_forecast_search (cache={cache_status}) ---")
+        if lookup_failed(data):
+            # step 이벤트를 아직 내보내지 않았으므로 에이전트 단계 번호는 1부터 그대로
+            print("[QA Lookup] 조회 실패 또는 데이터 없음, 에이전트로 처리")
+            return
+        yield "step", {"iteration": 1, "action": "db_forecast_search", "input": args}
+        yield "done", lookup_answer(intent.entities, data)
+
+    # 메타 추출 (자치구 / 연도)
     def _extract_query_meta(self, text: str) -> QueryMeta:
+        entities = match_query(text)
         meta = QueryMeta()
-        districts = [
-            "종로구", "중구", "용산구", "성동구", "광진구", "동대문구", "중랑구", "성북구", "강북구", "도봉구",
-            "노원구", "은평구", "서대문구", "마포구", "양천구", "강서구", "구로구", "금천구", "영등포구", "동작구",
-            "관악구", "서초구", "강남구", "송파구", "강동구",
-        ]
-        for gu in districts:
-            if gu in (text or ""):
-                meta.district = gu
-                break
+        if entities.districts:
+            meta.district = entities.districts[0]
+        if entities.years:
+            meta.start_year, meta.end_year = entities.years[0], entities.years[-1]
         return meta
 
-
 # 싱글톤 인스턴스
 _genai_service_instance = None
 
@@ -0,0 +1,335 @@
+# 보고서/정책 생성 같은 오래 걸리는 에이전트 작업용 백그라운드 작업 큐
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Iterator, Optional
+
+from pybo.service.single_flight import make_flight_key
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+JOB_STORE_BACKEND = os.getenv("JOB_STORE_BACKEND", "memory")  # memory | sqlite
+JOB_STORE_PATH = os.getenv("JOB_STORE_PATH", os.path.join(BASE_DIR, "data", "jobs.sqlite"))
+JOB_MAX_WORKERS = int(os.getenv("JOB_MAX_WORKERS", "2"))    # 동시에 실행할 작업 수
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "16"))   # 대기+실행 중 작업 상한 (초과 시 429)
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "600"))    # 완료된 작업 결과 보관 시간(초)
+JOB_STALE_SEC = int(os.getenv("JOB_STALE_SEC", "1800"))     # 이 시간 동안 갱신이 없는 실행 중 작업은 중단된 것으로 봄
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# 작업 실행 함수: params -> ("step"|"token"|"done", data) 이벤트 generator
+JobRunner = Callable[[dict], Iterator[tuple]]
+
+
+class JobQueueFull(Exception):
+    """대기 중인 작업이 너무 많음"""
+
+
+class JobFailed(Exception):
+    """작업 실행 함수가 결과를 실패로 판단함 (메시지가 그대로 job.error가 됨)"""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    params: dict
+    dedup_key: str
+    status: str = "queued"  # queued / running / done / failed
+    steps: list = field(default_factory=list)
+    result: Optional[str] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    updated_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status not in ACTIVE_STATUSES
+
+    def to_dict(self) -> dict:
+        data = asdict(self)
+        data.pop("dedup_key")
+        return data
+
+
+class MemoryJobStore:
+    """프로세스 내부 저장소 (기본값)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs: dict[str, Job] = {}
+
+    def create(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    def update(self, job: Job) -> None:
+        job.updated_at = time.time()
+
+    def find_reusable(self, dedup_key: str, now: float, ttl: int) -> Optional[Job]:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.dedup_key != dedup_key:
+                    continue
+                if job.status in ACTIVE_STATUSES or (
+                    job.status == "done" and job.finished_at is not None and now - job.finished_at <= ttl
+                ):
+                    return job
+        return None
+
+    def count_active(self) -> int:
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job.status in ACTIVE_STATUSES)
+
+    def purge_expired(self, now: float, ttl: int) -> int:
+        with self._lock:
+            expired = [
+                jid for jid, job in self._jobs.items()
+                if job.finished and job.finished_at is not None and now - job.finished_at > ttl
+            ]
+            for jid in expired:
+                del self._jobs[jid]
+        return len(expired)
+
+    def fail_stale(self, now: float, stale_after: int) -> int:
+        return 0  # 같은 프로세스 안에서는 중단될 일이 없음
+
+
+class SqliteJobStore:
+    """SQLite 저장소. 서버 재시작 후에도 작업 결과를 조회할 수 있고 여러 워커 프로세스가 공유 가능"""
+
+    COLUMNS = ("id", "kind", "params", "dedup_key", "status", "steps", "result", "error",
+               "created_at", "updated_at", "finished_at")
+
+    def __init__(self, path: str = JOB_STORE_PATH):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5.0)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS genai_job ("
+            " id TEXT PRIMARY KEY, kind TEXT NOT NULL, params TEXT NOT NULL, dedup_key TEXT NOT NULL,"
+            " status TEXT NOT NULL, steps TEXT NOT NULL, result TEXT, error TEXT,"
+            " created_at REAL NOT NULL, updated_at REAL NOT NULL, finished_at REAL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS ix_genai_job_dedup ON genai_job(dedup_key, status)")
+        self._conn.commit()
+
+    def _row(self, job: Job) -> tuple:
+        return (job.id, job.kind, json.dumps(job.params, ensure_ascii=False), job.dedup_key, job.status,
+                json.dumps(job.steps, ensure_ascii=False), job.result, job.error,
+                job.created_at, job.updated_at, job.finished_at)
+
+    def _job(self, row) -> Job:
+        data = dict(zip(self.COLUMNS, row))
+        data["params"] = json.loads(data["params"])
+        data["steps"] = json.loads(data["steps"])
+        return Job(**data)
+
+    def _select(self, where: str, args: tuple) -> list[Job]:
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(self.COLUMNS)} FROM genai_job WHERE {where}", args
+            ).fetchall()
+        return [self._job(r) for r in rows]
+
+    def create(self, job: Job) -> None:
+        with self._lock:
+            self._conn.execute(
+                f"INSERT INTO genai_job ({', '.join(self.COLUMNS)}) VALUES ({', '.join('?' * len(self.COLUMNS))})",
+                self._row(job),
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        jobs = self._select("id = ?", (job_id,))
+        return jobs[0] if jobs else None
+
+    def update(self, job: Job) -> None:
+        job.updated_at = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE genai_job SET status = ?, steps = ?, result = ?, error = ?, updated_at = ?, finished_at = ?"
+                " WHERE id = ?",
+                (job.status, json.dumps(job.steps, ensure_ascii=False), job.result, job.error,
+                 job.updated_at, job.finished_at, job.id),
+            )
+            self._conn.commit()
+
+    def find_reusable(self, dedup_key: str, now: float, ttl: int) -> Optional[Job]:
+        jobs = self._select(
+            "dedup_key = ? AND (status IN ('queued', 'running') OR (status = 'done' AND finished_at >= ?))"
+            " ORDER BY created_at DESC LIMIT 1",
+            (dedup_key, now - ttl),
+        )
+        return jobs[0] if jobs else None
+
+    def count_active(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM genai_job WHERE status IN ('queued', 'running')"
+            ).fetchone()[0]
+
+    def purge_expired(self, now: float, ttl: int) -> int:
+        with self._lock:
+            cur = self._conn.execute(
+                "DELETE FROM genai_job WHERE status IN ('done', 'failed') AND finished_at < ?", (now - ttl,)
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+    def fail_stale(self, now: float, stale_after: int) -> int:
+        # 죽은 프로세스에서 실행 중이던 작업은 다시 실행할 수 없으므로 실패 처리 (대기열 상한에서도 빠짐)
+        with self._lock:
+            cur = self._conn.execute(
+                "UPDATE genai_job SET status = 'failed', error = ?, finished_at = ?, updated_at = ?"
+                " WHERE status IN ('queued', 'running') AND updated_at < ?",
+                ("서버 재시작으로 작업이 중단되었습니다.", now, now, now - stale_after),
+            )
+            self._conn.commit()
+            return cur.rowcount
+
+
+class JobQueue:
+    """
+    - submit(): 같은 종류 + 같은 파라미터의 작업이 진행 중이거나 결과가 남아 있으면 그 작업을 반환
+    - 실행은 크기가 고정된 스레드 풀에서, 대기+실행 중 작업이 max_pending 이상이면 JobQueueFull
+    - 에이전트 단계(step)마다 진행 상황을 저장하고 wait_for_update()로 기다리는 쪽을 깨움
+    """
+
+    def __init__(self, store=None, max_workers: int = JOB_MAX_WORKERS,
+                 max_pending: int = JOB_MAX_PENDING, result_ttl: int = JOB_RESULT_TTL,
+                 stale_after: int = JOB_STALE_SEC):
+        self.store = store or MemoryJobStore()
+        self.max_pending = max_pending
+        self.result_ttl = result_ttl
+        self.stale_after = stale_after
+        self._runners: dict[str, JobRunner] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="genai-job")
+        self._submit_lock = threading.Lock()
+        self._changed = threading.Condition()
+
+    def register(self, kind: str, runner: JobRunner) -> None:
+        self._runners[kind] = runner
+
+    def submit(self, kind: str, params: dict) -> tuple[Job, bool]:
+        """(job, created) 반환. created=False면 기존 작업을 재사용한 것"""
+        if kind not in self._runners:
+            raise ValueError(f"알 수 없는 작업 종류: {kind}")
+
+        now = time.time()
+        dedup_key = make_flight_key(kind, params)
+        with self._submit_lock:
+            self.store.fail_stale(now, self.stale_after)
+            self.store.purge_expired(now, self.result_ttl)
+            existing = self.store.find_reusable(dedup_key, now, self.result_ttl)
+            if existing is not None:
+                return existing, False
+            if self.store.count_active() >= self.max_pending:
+                raise JobQueueFull()
+
+            job = Job(id=uuid.uuid4().hex, kind=kind, params=params, dedup_key=dedup_key)
+            self.store.create(job)
+
+        self._executor.submit(self._run, job)
+        return job, True
+
+    def submit_completed(self, kind: str, params: dict, result: str) -> tuple[Job, bool]:
+        """
+        이미 결과가 있는 요청(사전 생성 결과 등)을 완료된 작업으로 등록 (비동기 요청도 같은 응답 형식을 받도록)
+        같은 작업이 진행 중이거나 결과가 남아 있으면 그 작업을 반환
+        """
+        now = time.time()
+        dedup_key = make_flight_key(kind, params)
+        with self._submit_lock:
+            self.store.purge_expired(now, self.result_ttl)
+            existing = self.store.find_reusable(dedup_key, now, self.result_ttl)
+            if existing is not None:
+                return existing, False
+            job = Job(id=uuid.uuid4().hex, kind=kind, params=params, dedup_key=dedup_key,
+                      status="done", result=result, finished_at=now)
+            self.store.create(job)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def _run(self, job: Job) -> None:
+        job.status = "running"
+        self._save(job)
+        try:
+            for event, data in self._runners[job.kind](job.params):
+                if event == "step":
+                    job.steps.append(data)
+                    self._save(job)
+                elif event == "done":
+                    job.result = data
+            status = "done"
+        except JobFailed as e:
+            print(f"[JOB FAILED] {job.kind} {job.id}: {e}")
+            status = "failed"
+            job.error = str(e)
+        except Exception as e:
+            print(f"[JOB ERROR] {job.kind} {job.id}: {e}")
+            status = "failed"
+            job.error = "작업 처리 중 오류가 발생했습니다."
+        # 다른 스레드의 submit()이 상태만 보고 finished_at을 읽을 수 있으므로 종료 시각을 먼저 기록
+        job.finished_at = time.time()
+        job.status = status
+        self._save(job)
+
+    def _save(self, job: Job) -> None:
+        self.store.update(job)
+        with self._changed:
+            self._changed.notify_all()
+
+    def wait_for_update(self, timeout: float = 1.0) -> None:
+        # 다른 프로세스(SQLite 공유)에서 바뀐 경우도 있으므로 timeout 후에는 다시 조회해야 함
+        with self._changed:
+            self._changed.wait(timeout)
+
+    def iter_events(self, job_id: str, poll_interval: float = 1.0) -> Iterator[tuple]:
+        """SSE용. 진행된 step을 순서대로 내보내고 끝나면 done(또는 예외)"""
+        sent = 0
+        while True:
+            job = self.get(job_id)
+            if job is None:
+                raise LookupError(job_id)
+            for step in job.steps[sent:]:
+                yield "step", step
+            sent = len(job.steps)
+            if job.status == "done":
+                yield "done", job.result
+                return
+            if job.status == "failed":
+                raise RuntimeError(job.error)
+            self.wait_for_update(poll_interval)
+
+    def stats(self) -> dict:
+        return {
+            "active": self.store.count_active(),
+            "max_pending": self.max_pending,
+            "result_ttl_sec": self.result_ttl,
+        }
+
+
+# 싱글톤 인스턴스
+_job_queue_instance = None
+
+
+def get_job_queue() -> JobQueue:
+    global _job_queue_instance
+    if _job_queue_instance is None:
+        store = SqliteJobStore() if JOB_STORE_BACKEND == "sqlite" else MemoryJobStore()
+        _job_queue_instance = JobQueue(store=store)
+    return _job_queue_instance
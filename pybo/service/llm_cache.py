@@ -0,0 +1,211 @@
+# LLM 응답 캐시 (프롬프트 + 모델 버전 + 샘플링 파라미터 완전 일치 시 재사용, SQLite 영구 저장)
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", os.path.join(BASE_DIR, "data", "llm_cache.sqlite"))
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "1") == "1"
+LLM_CACHE_MAX_TEMPERATURE = float(os.getenv("LLM_CACHE_MAX_TEMPERATURE", "0.3"))  # 이보다 높으면 캐시 안 함
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(50 * 1024 * 1024)))
+LLM_CACHE_TTL = int(os.getenv("LLM_CACHE_TTL", str(24 * 3600)))  # 초
+LLM_CACHE_SWEEP_INTERVAL = float(os.getenv("LLM_CACHE_SWEEP_INTERVAL", "60"))  # 만료 항목 정리 + 용량 재집계 주기(초)
+LLM_CACHE_ACCESS_FLUSH = int(os.getenv("LLM_CACHE_ACCESS_FLUSH", "64"))  # 조회 시각(last_access)을 모아서 기록할 건수
+
+
+def make_cache_key(instruction: str, input_text: str, model_version: str,
+                   temperature: float, max_new_tokens: int, stop: Optional[list] = None) -> str:
+    key = [instruction, input_text, model_version, round(float(temperature), 4), int(max_new_tokens)]
+    if stop:  # 중지 문자열이 있으면 응답이 달라지므로 키에 포함 (없을 때는 기존 키 유지)
+        key.append(list(stop))
+    raw = json.dumps(key, ensure_ascii=False)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    크기 상한(LRU 제거) + TTL을 가진 SQLite 캐시. 여러 워커 프로세스가 같은 파일을 공유할 수 있음
+    - 전체 크기는 저장/삭제 때마다 누적해서 관리하고 sweep_interval마다 파일 기준으로 다시 집계 (매 저장 SUM 방지)
+    - 조회 시각 갱신은 모아서 한 번에 기록 (조회마다 UPDATE + commit 방지, 제거 직전에는 반드시 반영)
+    - 이벤트 루프에서는 aget/aput 사용 (SQLite 작업과 잠금 대기를 전용 스레드에서 처리)
+    """
+
+    def __init__(
+        self,
+        path: str = LLM_CACHE_PATH,
+        max_bytes: int = LLM_CACHE_MAX_BYTES,
+        ttl: int = LLM_CACHE_TTL,
+        max_temperature: float = LLM_CACHE_MAX_TEMPERATURE,
+        enabled: bool = LLM_CACHE_ENABLED,
+        sweep_interval: float = LLM_CACHE_SWEEP_INTERVAL,
+        access_flush: int = LLM_CACHE_ACCESS_FLUSH,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.enabled = enabled
+        self.sweep_interval = sweep_interval
+        self.access_flush = access_flush
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="llm-cache")
+        self._total_bytes = 0
+        self._swept_at = 0.0
+        self._pending_access: dict[str, float] = {}  # key -> 마지막 조회 시각 (아직 기록 안 함)
+        self.hits = 0
+        self.misses = 0
+        self.skipped = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False, timeout=5.0)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS llm_cache ("
+                " key TEXT PRIMARY KEY,"
+                " text TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " model_version TEXT,"
+                " created_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_llm_cache_last_access ON llm_cache(last_access)")
+            self._conn = conn
+            self._total_bytes = self._sum_bytes(conn)
+        return self._conn
+
+    @staticmethod
+    def _sum_bytes(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM llm_cache").fetchone()[0]
+
+    def cacheable(self, temperature: float) -> bool:
+        return self.enabled and temperature <= self.max_temperature
+
+    def get(self, key: str) -> Optional[str]:
+        now = time.time()
+        with self._lock:
+            conn = self._db()
+            row = conn.execute("SELECT text, created_at, size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None or now - row[1] > self.ttl:
+                if row is not None:
+                    conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                    conn.commit()
+                    self._total_bytes -= row[2]
+                    self._pending_access.pop(key, None)
+                self.misses += 1
+                return None
+            self._pending_access[key] = now
+            if len(self._pending_access) >= self.access_flush:
+                self._flush_access(conn)
+                conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, text: str, model_version: str = "") -> None:
+        if not text:
+            return
+        now = time.time()
+        size = len(text.encode("utf-8"))
+        with self._lock:
+            conn = self._db()
+            old = conn.execute("SELECT size FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, text, size, model_version, created_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, text, size, model_version, now, now),
+            )
+            self._total_bytes += size - (old[0] if old else 0)
+            self._pending_access.pop(key, None)
+            self.stores += 1
+            self._evict(conn, now)
+            conn.commit()
+
+    async def aget(self, key: str) -> Optional[str]:
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.get, key)
+
+    async def aput(self, key: str, text: str, model_version: str = "") -> None:
+        await asyncio.get_running_loop().run_in_executor(self._executor, self.put, key, text, model_version)
+
+    def _flush_access(self, conn: sqlite3.Connection) -> None:
+        if self._pending_access:
+            conn.executemany(
+                "UPDATE llm_cache SET last_access = ? WHERE key = ?",
+                [(at, key) for key, at in self._pending_access.items()],
+            )
+            self._pending_access.clear()
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        # 주기마다 만료 항목 삭제 + 전체 크기 재집계 (다른 프로세스의 저장/삭제 반영)
+        if now - self._swept_at >= self.sweep_interval:
+            cur = conn.execute("DELETE FROM llm_cache WHERE created_at < ?", (now - self.ttl,))
+            self.evictions += cur.rowcount
+            self._total_bytes = self._sum_bytes(conn)
+            self._swept_at = now
+        if self._total_bytes <= self.max_bytes:
+            return
+        # 용량 초과분은 가장 오래 안 쓴 것부터 삭제 (모아 둔 조회 시각을 먼저 반영)
+        self._flush_access(conn)
+        for key, size in conn.execute("SELECT key, size FROM llm_cache ORDER BY last_access ASC").fetchall():
+            conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+            self.evictions += 1
+            self._total_bytes -= size
+            if self._total_bytes <= self.max_bytes:
+                break
+
+    def purge(self, model_version: Optional[str] = None) -> int:
+        with self._lock:
+            conn = self._db()
+            if model_version:
+                cur = conn.execute("DELETE FROM llm_cache WHERE model_version = ?", (model_version,))
+            else:
+                cur = conn.execute("DELETE FROM llm_cache")
+            conn.commit()
+            self._pending_access.clear()
+            self._total_bytes = self._sum_bytes(conn)
+            return cur.rowcount
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries, total = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM llm_cache"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "entries": entries,
+            "bytes": total,
+            "max_bytes": self.max_bytes,
+            "ttl_sec": self.ttl,
+            "max_temperature": self.max_temperature,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "skipped": self.skipped,
+            "stores": self.stores,
+            "evictions": self.evictions,
+        }
+
+
+# 싱글톤 인스턴스
+_llm_cache_instance = None
+
+
+def get_llm_cache() -> LLMResponseCache:
+    global _llm_cache_instance
+    if _llm_cache_instance is None:
+        _llm_cache_instance = LLMResponseCache()
+    return _llm_cache_instance
@@ -0,0 +1,555 @@
+# RunPod /generate 호출용 비동기 LLM 클라이언트 (keep-alive 커넥션 풀 + 동시성 제한)
+import asyncio
+import concurrent.futures
+import json
+import os
+import queue
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Iterator, Optional
+
+import httpx
+
+from pybo.service import async_runtime, metrics, replay
+from pybo.service.llm_cache import LLMResponseCache, get_llm_cache, make_cache_key
+from pybo.service.llm_router import ModelRouter
+from pybo.service.single_flight import AsyncSingleFlight, make_flight_key
+from pybo.service.token_counter import count_tokens
+
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))             # 전체 동시 요청 수
+LLM_PER_MODEL_CONCURRENCY = int(os.getenv("LLM_PER_MODEL_CONCURRENCY", "4"))  # model_version별, 백엔드 1대당 동시 요청 수
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 백엔드가 중지 문자열에서 생성을 멈췄을 때 응답의 stop_reason 값
+BACKEND_STOP_REASONS = ("stop_sequence", "stop")
+
+
+class LLMError(Exception):
+    """LLM 백엔드 호출 실패. kind: timeout / status / request / cancelled"""
+
+    def __init__(self, kind: str, message: str = ""):
+        super().__init__(message or kind)
+        self.kind = kind
+
+
+def find_stop(text: str, stops, start: int = 0) -> int:
+    """가장 먼저 나오는 중지 문자열의 위치 (없으면 -1)"""
+    positions = [p for p in (text.find(s, start) for s in stops if s) if p >= 0]
+    return min(positions, default=-1)
+
+
+class StopScanner:
+    """
+    스트리밍 토큰에서 중지 문자열을 찾아 그 앞부분까지만 내보냄.
+    중지 문자열의 앞부분일 수 있는 꼬리는 확정될 때까지 보류한다.
+    """
+
+    def __init__(self, stops):
+        self.stops = [s for s in stops if s]
+        self.text = ""
+        self.stopped = False
+        self._emitted = 0
+        self._hold = max((len(s) for s in self.stops), default=1) - 1
+
+    def feed(self, token: str) -> str:
+        self.text += token
+        cut = find_stop(self.text, self.stops, self._emitted)
+        if cut >= 0:
+            self.stopped = True
+            end = cut
+        else:
+            end = max(self._emitted, len(self.text) - self._hold)
+        chunk = self.text[self._emitted:end]
+        self._emitted = end
+        return chunk
+
+    def finish(self) -> str:
+        if self.stopped:
+            return ""
+        chunk = self.text[self._emitted:]
+        self._emitted = len(self.text)
+        return chunk
+
+
+class QueueStats:
+    """세마포어 대기 시간 통계"""
+
+    def __init__(self):
+        self.count = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self.waiting = 0
+        self.in_flight = 0
+
+    def record(self, wait: float) -> None:
+        self.count += 1
+        self.total_wait += wait
+        self.max_wait = max(self.max_wait, wait)
+
+    def as_dict(self) -> dict:
+        return {
+            "requests": self.count,
+            "waiting": self.waiting,
+            "in_flight": self.in_flight,
+            "avg_wait_sec": round(self.total_wait / self.count, 4) if self.count else 0.0,
+            "max_wait_sec": round(self.max_wait, 4),
+        }
+
+
+class LLMClient:
+    """
+    모든 요청은 백그라운드 이벤트 루프 하나에서 처리된다.
+    - 비동기 호출: await client.agenerate(...)  (다른 루프에서 호출해도 됨)
+    - 동기 호출:   client.generate(...)         (Flask 워커 등 기존 코드용)
+    요청마다 payload의 model_version으로 백엔드 풀을 골라 보낸다 (ModelRouter, LLM_BACKENDS 참고).
+    """
+
+    def __init__(
+        self,
+        api_url: Optional[str] = None,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        per_model_concurrency: int = LLM_PER_MODEL_CONCURRENCY,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 180.0,
+        retries: int = 2,
+        backoff_factor: float = 0.6,
+        cache: Optional[LLMResponseCache] = None,
+        router: Optional[ModelRouter] = None,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ):
+        self.api_url = api_url or os.getenv("RUNPOD_API_URL")
+        # LLM_BACKENDS가 없으면 모든 버전을 api_url 한 곳으로 보냄
+        self.router = router or ModelRouter.from_env(self.api_url)
+        self.max_concurrency = max_concurrency
+        self.per_model_concurrency = per_model_concurrency
+        self.timeout = (connect_timeout, read_timeout)
+        self.retries = retries
+        self.backoff_factor = backoff_factor
+        self.cache = cache  # None이면 응답 캐시 사용 안 함
+        self.transport = transport  # None이면 httpx 기본 (기록/재생 시 replay.FixtureHTTPTransport)
+
+        # 아래 객체들은 백그라운드 루프 안에서 처음 사용할 때 생성
+        self._http: Optional[httpx.AsyncClient] = None
+        self._global_sem: Optional[asyncio.Semaphore] = None
+        self._model_sems: dict[str, asyncio.Semaphore] = {}
+
+        self.queue_stats = QueueStats()
+        self.model_stats: dict[str, QueueStats] = {}
+        self.stop_stats = {"early_stops": 0, "saved_tokens": 0}
+
+        # 동일한 요청이 진행 중이면 합류 (모든 요청이 같은 루프에서 처리되므로 루프 단위로 충분)
+        self._flights = AsyncSingleFlight()
+
+    def _http_client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(
+                http2=False,
+                transport=self.transport,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=60.0,
+                ),
+            )
+            self._global_sem = asyncio.Semaphore(self.max_concurrency)
+        return self._http
+
+    def _model_sem(self, model_version: str) -> asyncio.Semaphore:
+        if model_version not in self._model_sems:
+            backends = max(1, len(self.router.pool(model_version)))
+            self._model_sems[model_version] = asyncio.Semaphore(self.per_model_concurrency * backends)
+            self.model_stats[model_version] = QueueStats()
+        return self._model_sems[model_version]
+
+    def build_payload(self, instruction, input_text, model_version, max_new_tokens, temperature, stop=None) -> dict:
+        payload = {
+            "instruction": instruction,
+            "input": input_text,
+            "model_version": model_version,
+            "max_new_tokens": max_new_tokens,
+            "temperature": temperature,
+        }
+        if stop:
+            payload["stop"] = list(stop)  # 백엔드가 이 문자열이 나오면 생성을 멈춤 (결과에는 포함하지 않음)
+        return payload
+
+    def _cache_key(self, payload: dict) -> Optional[str]:
+        """캐시 대상이면 키를, 아니면 None (temperature가 임계값보다 높으면 매번 새로 생성)"""
+        if self.cache is None:
+            return None
+        if not self.cache.cacheable(payload["temperature"]):
+            self.cache.skipped += 1
+            return None
+        return make_cache_key(
+            payload["instruction"], payload["input"], payload["model_version"],
+            payload["temperature"], payload["max_new_tokens"], payload.get("stop"),
+        )
+
+    async def agenerate(
+        self,
+        instruction: str,
+        input_text: str,
+        model_version: str = "final",
+        max_new_tokens: int = 512,
+        temperature: float = 0.3,
+        timeout: Optional[tuple[float, float]] = None,
+        task_type: str = "generate",
+        stop: Optional[list[str]] = None,
+    ) -> str:
+        payload = self.build_payload(instruction, input_text, model_version, max_new_tokens, temperature, stop)
+        return await async_runtime.run_async(self._generate(payload, timeout or self.timeout, task_type))
+
+    def generate(
+        self,
+        instruction: str,
+        input_text: str,
+        model_version: str = "final",
+        max_new_tokens: int = 512,
+        temperature: float = 0.3,
+        timeout: Optional[tuple[float, float]] = None,
+        is_cancelled=None,
+        task_type: str = "generate",
+        stop: Optional[list[str]] = None,
+    ) -> str:
+        """
+        동기 호출. is_cancelled()가 True를 반환하면 진행 중인 요청을 취소한다.
+        stop: 중지 문자열 목록 (가장 먼저 나온 중지 문자열 앞까지만 반환)
+        """
+        payload = self.build_payload(instruction, input_text, model_version, max_new_tokens, temperature, stop)
+        try:
+            return async_runtime.run_sync(
+                self._generate(payload, timeout or self.timeout, task_type),
+                is_cancelled=is_cancelled,
+            )
+        except (asyncio.CancelledError, concurrent.futures.CancelledError):
+            # is_cancelled로 취소하면 asyncio 쪽, 루프에서 작업이 취소되면 future.result()가 concurrent.futures 쪽 예외
+            raise LLMError("cancelled", "요청이 취소되었습니다.")
+
+    @asynccontextmanager
+    async def _slot(self, model_version: str):
+        """전체 -> 모델별 순서로 자리 확보 (대기 시간 기록)"""
+        self._http_client()
+        model_sem = self._model_sem(model_version)
+        model_stats = self.model_stats[model_version]
+
+        queued_at = time.monotonic()
+        self.queue_stats.waiting += 1
+        model_stats.waiting += 1
+        acquired = False
+        try:
+            async with self._global_sem, model_sem:
+                acquired = True
+                wait = time.monotonic() - queued_at
+                for st in (self.queue_stats, model_stats):
+                    st.waiting -= 1
+                    st.record(wait)
+                    st.in_flight += 1
+                try:
+                    yield
+                finally:
+                    self.queue_stats.in_flight -= 1
+                    model_stats.in_flight -= 1
+        finally:
+            if not acquired:  # 대기 중 취소된 경우
+                self.queue_stats.waiting -= 1
+                model_stats.waiting -= 1
+
+    def _check_backend(self, model_version: str) -> None:
+        if not self.router.has_backend(model_version):
+            raise LLMError("request", f"model_version={model_version} 에 연결된 LLM 백엔드가 없습니다. (RUNPOD_API_URL / LLM_BACKENDS 확인)")
+
+    async def _generate(self, payload: dict, timeout: tuple[float, float], task_type: str = "generate") -> str:
+        self._check_backend(payload["model_version"])
+
+        key = self._cache_key(payload)
+        if key:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                self._record(payload, task_type, "cache")
+                return cached
+
+        started = time.perf_counter()
+        try:
+            text = await self._flights.do(make_flight_key(payload), lambda: self._fetch(payload, timeout, key, task_type))
+        except LLMError as e:
+            self._record(payload, task_type, e.kind)
+            raise
+        except asyncio.CancelledError:
+            self._record(payload, task_type, "cancelled")
+            raise
+        self._record(payload, task_type, "ok", time.perf_counter() - started, text)
+        return text
+
+    @staticmethod
+    def _record(payload: dict, task_type: str, result: str, elapsed: float = None, text: str = None) -> None:
+        """요청 결과 지표 기록 (성공 시 지연시간/토큰 수 포함)"""
+        labels = {"model_version": payload["model_version"], "task_type": task_type}
+        metrics.LLM_REQUESTS.inc(result=result, **labels)
+        if result != "ok":
+            return
+        metrics.LLM_LATENCY.observe(elapsed, **labels)
+        metrics.LLM_PROMPT_TOKENS.observe(count_tokens(payload["instruction"]) + count_tokens(payload["input"]), **labels)
+        metrics.LLM_COMPLETION_TOKENS.observe(count_tokens(text), **labels)
+
+    def _record_stop(self, payload: dict, task_type: str, where: str, text: str) -> None:
+        """중지 문자열로 일찍 끝난 생성 기록. 중지하지 않았다면 max_new_tokens까지 생성했다고 보고 차이를 절약분으로 계산"""
+        saved = max(0, payload["max_new_tokens"] - count_tokens(text))
+        labels = {"model_version": payload["model_version"], "task_type": task_type}
+        metrics.LLM_EARLY_STOPS.inc(where=where, **labels)
+        metrics.LLM_SAVED_TOKENS.inc(saved, **labels)
+        self.stop_stats["early_stops"] += 1
+        self.stop_stats["saved_tokens"] += saved
+
+    async def _fetch(self, payload: dict, timeout: tuple[float, float], cache_key: Optional[str],
+                     task_type: str = "generate") -> str:
+        async with self._slot(payload["model_version"]):
+            text, stop_reason = await self._post_with_retry(self._http_client(), payload, timeout)
+
+        stops = payload.get("stop")
+        if stops:
+            if stop_reason in BACKEND_STOP_REASONS:
+                self._record_stop(payload, task_type, "backend", text)
+            cut = find_stop(text, stops)
+            if cut >= 0:  # 중지 문자열을 지원하지 않는 백엔드 (생성은 끝까지 했으므로 절약분 없음)
+                text = text[:cut].strip()
+
+        if cache_key:
+            await self.cache.aput(cache_key, text, payload["model_version"])
+        return text
+
+    # ---------------- 스트리밍 ----------------
+    async def astream(
+        self,
+        instruction: str,
+        input_text: str,
+        model_version: str = "final",
+        max_new_tokens: int = 512,
+        temperature: float = 0.3,
+        timeout: Optional[tuple[float, float]] = None,
+        task_type: str = "generate",
+        stop: Optional[list[str]] = None,
+    ) -> AsyncIterator[str]:
+        """
+        백엔드에 stream=true로 요청하고 토큰을 받는 대로 내보냄.
+        중지 문자열이 나오면 그 앞까지만 내보내고 응답 읽기를 멈춤 (연결을 닫아 백엔드 생성도 중단)
+        (백그라운드 루프 안에서 사용. 다른 스레드에서는 stream() 사용)
+        """
+        self._check_backend(model_version)
+
+        payload = self.build_payload(instruction, input_text, model_version, max_new_tokens, temperature, stop)
+        key = self._cache_key(payload)
+        if key:
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                self._record(payload, task_type, "cache")
+                yield cached
+                return
+
+        started = time.perf_counter()
+        parts = []
+        result = "ok"
+        try:
+            async for token in self._astream_backend(payload, key, timeout or self.timeout, task_type):
+                parts.append(token)
+                yield token
+        except LLMError as e:
+            result = e.kind
+            raise
+        except (asyncio.CancelledError, GeneratorExit):
+            result = "cancelled"
+            raise
+        finally:
+            self._record(payload, task_type, result, time.perf_counter() - started, "".join(parts))
+
+    async def _astream_backend(self, payload: dict, key: Optional[str], timeout,
+                               task_type: str = "generate") -> AsyncIterator[str]:
+        model_version = payload["model_version"]
+        payload = dict(payload, stream=True)
+        connect, read = timeout
+        httpx_timeout = httpx.Timeout(read, connect=connect)
+
+        async with self._slot(model_version):
+            http = self._http_client()
+            streamed = False  # 토큰을 하나라도 내보냈으면 재시도하지 않음 (같은 내용이 두 번 전달됨)
+            for attempt in range(self.retries + 1):
+                last = attempt == self.retries
+                backend = self.router.pick(model_version)
+                healthy = False
+                try:
+                    async with http.stream("POST", backend.url, json=payload, timeout=httpx_timeout) as res:
+                        healthy = res.status_code < 500
+                        if not (200 <= res.status_code < 300):
+                            body = (await res.aread()).decode("utf-8", "replace")
+                            if res.status_code not in RETRY_STATUS or last:
+                                raise LLMError("status", f"status={res.status_code}, body={body[:300]}")
+                        else:
+                            parts = []
+                            stops = payload.get("stop")
+                            scanner = StopScanner(stops) if stops else None
+                            async for token in self._iter_tokens(res):
+                                if scanner is not None:
+                                    token = scanner.feed(token)
+                                if token:
+                                    parts.append(token)
+                                    streamed = True
+                                    yield token
+                                if scanner is not None and scanner.stopped:
+                                    # 나머지는 읽지 않고 연결을 닫음 (백엔드는 연결 종료로 생성 중단)
+                                    self._record_stop(payload, task_type, "client", scanner.text)
+                                    break
+                            if scanner is not None:
+                                tail = scanner.finish()
+                                if tail:
+                                    parts.append(tail)
+                                    yield tail
+                            # 끝까지 받은 응답만 캐시 (중간에 끊기면 여기까지 오지 않음)
+                            if key:
+                                await self.cache.aput(key, "".join(parts).strip(), model_version)
+                            return
+                except httpx.TimeoutException:
+                    healthy = False
+                    raise LLMError("timeout", "AI 서버 응답 지연")
+                except httpx.TransportError as e:
+                    healthy = False
+                    if last or streamed:
+                        raise LLMError("request", str(e))
+                    metrics.LLM_RETRIES.inc(model_version=model_version, reason="transport")
+                except (asyncio.CancelledError, GeneratorExit):
+                    healthy = True  # 사용자 취소는 백엔드 실패로 보지 않음
+                    raise
+                else:
+                    metrics.LLM_RETRIES.inc(model_version=model_version, reason=str(res.status_code))
+                finally:
+                    self.router.release(backend, healthy)
+
+                # 첫 토큰을 받기 전 실패만 재시도
+                await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+    @staticmethod
+    async def _iter_tokens(res: httpx.Response) -> AsyncIterator[str]:
+        """SSE(data: {...}), NDJSON, 일반 JSON({"text": ...}) 응답을 모두 토큰 단위로 변환"""
+        content_type = res.headers.get("content-type", "")
+
+        if "application/json" in content_type:
+            text = (json.loads(await res.aread()).get("text", "") or "").strip()
+            if text:
+                yield text
+            return
+
+        is_sse = "text/event-stream" in content_type
+        async for line in res.aiter_lines():
+            line = line.strip()
+            if not line:
+                continue
+            if is_sse:
+                if not line.startswith("data:"):
+                    continue
+                line = line[5:].strip()
+            if line == "[DONE]":
+                return
+            try:
+                data = json.loads(line)
+            except json.JSONDecodeError:
+                yield line
+                continue
+            token = data.get("token", data.get("text", "")) if isinstance(data, dict) else str(data)
+            if token:
+                yield token
+
+    def stream(self, *args, **kwargs) -> Iterator[str]:
+        """
+        동기 스트리밍. 토큰을 받는 즉시 yield 한다.
+        소비하는 쪽이 generator를 닫으면 (클라이언트 연결 끊김 등) 백엔드 요청도 취소된다.
+        """
+        tokens: queue.Queue = queue.Queue()
+        done = object()
+
+        async def pump():
+            try:
+                async for token in self.astream(*args, **kwargs):
+                    tokens.put(token)
+            except BaseException as e:  # 취소 포함, 소비 측에 그대로 전달
+                tokens.put(e)
+                raise
+            finally:
+                tokens.put(done)
+
+        future = async_runtime.submit(pump())
+        try:
+            while True:
+                item = tokens.get()
+                if item is done:
+                    break
+                if isinstance(item, asyncio.CancelledError):
+                    raise LLMError("cancelled", "요청이 취소되었습니다.")
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            future.cancel()
+
+    async def _post_with_retry(self, http: httpx.AsyncClient, payload: dict, timeout) -> tuple[str, Optional[str]]:
+        """(응답 텍스트, stop_reason) 반환"""
+        connect, read = timeout
+        httpx_timeout = httpx.Timeout(read, connect=connect)
+
+        for attempt in range(self.retries + 1):
+            last = attempt == self.retries
+            # 재시도마다 다시 골라서 같은 풀의 다른 백엔드로 넘어갈 수 있게 함
+            backend = self.router.pick(payload["model_version"])
+            try:
+                res = await http.post(backend.url, json=payload, timeout=httpx_timeout)
+            except httpx.TimeoutException:
+                self.router.release(backend, False)
+                raise LLMError("timeout", "AI 서버 응답 지연")
+            except httpx.TransportError as e:
+                self.router.release(backend, False)
+                if last:
+                    raise LLMError("request", str(e))
+                metrics.LLM_RETRIES.inc(model_version=payload["model_version"], reason="transport")
+            except BaseException:  # 취소 등
+                self.router.release(backend, True)
+                raise
+            else:
+                self.router.release(backend, res.status_code < 500)
+                if 200 <= res.status_code < 300:
+                    body = res.json()
+                    return (body.get("text", "") or "").strip(), body.get("stop_reason")
+                if res.status_code not in RETRY_STATUS or last:
+                    raise LLMError("status", f"status={res.status_code}, body={res.text[:300]}")
+                metrics.LLM_RETRIES.inc(model_version=payload["model_version"], reason=str(res.status_code))
+
+            # 0.6s, 1.2s 형태로 증가
+            await asyncio.sleep(self.backoff_factor * (2 ** attempt))
+
+        raise LLMError("request", "재시도 횟수 초과")
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "per_model_concurrency": self.per_model_concurrency,
+            "queue": self.queue_stats.as_dict(),
+            "models": {m: s.as_dict() for m, s in self.model_stats.items()},
+            "coalescing": self._flights.as_dict(),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "backends": self.router.status(),
+            "stop": dict(self.stop_stats),
+        }
+
+
+# 싱글톤 인스턴스 (GenAIService, MCP 서버 공용)
+_llm_client_instance = None
+
+
+def get_llm_client() -> LLMClient:
+    global _llm_client_instance
+    if _llm_client_instance is None:
+        transport = replay.llm_transport()
+        if transport is not None:
+            # 기록/재생 중에는 응답 캐시를 쓰지 않음 (모든 요청이 기록/재생 경로를 거치도록)
+            api_url = os.getenv("RUNPOD_API_URL") or replay.REPLAY_URL
+            _llm_client_instance = LLMClient(api_url=api_url, transport=transport)
+        else:
+            _llm_client_instance = LLMClient(cache=get_llm_cache())
+    return _llm_client_instance
@@ -0,0 +1,120 @@
+# model_version -> LLM 백엔드 풀 라우팅 (버전별 상태 관리, 백엔드 전역 모델 교체 없이 버전별 동시 처리)
+import os
+import threading
+import time
+from typing import Optional
+
+# 예) LLM_BACKENDS="final=http://a:8001/generate|http://b:8001/generate;cp100,cp200=http://c:8001/generate;*=http://d:8001/generate"
+#   - ';' 로 풀 구분, '=' 왼쪽은 model_version 목록(','), 오른쪽은 백엔드 URL 목록('|')
+#   - '*' 는 풀이 지정되지 않은 버전용 (없으면 RUNPOD_API_URL 사용)
+LLM_BACKENDS = os.getenv("LLM_BACKENDS", "")
+LLM_UNHEALTHY_AFTER = int(os.getenv("LLM_UNHEALTHY_AFTER", "3"))        # 연속 실패 n회면 비정상 처리
+LLM_UNHEALTHY_COOLDOWN = float(os.getenv("LLM_UNHEALTHY_COOLDOWN", "30"))  # 비정상 백엔드 제외 시간(초)
+
+DEFAULT_POOL = "*"
+
+
+def parse_backends(value: str) -> dict[str, list[str]]:
+    pools: dict[str, list[str]] = {}
+    for item in value.split(";"):
+        versions, _, urls = item.strip().partition("=")
+        urls = [u.strip() for u in urls.split("|") if u.strip()]
+        if not urls:
+            continue
+        for version in versions.split(","):
+            if version.strip():
+                pools.setdefault(version.strip(), []).extend(urls)
+    return pools
+
+
+class Backend:
+    def __init__(self, url: str):
+        self.url = url
+        self.in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_failures = 0
+        self.unhealthy_until = 0.0
+
+    @property
+    def healthy(self) -> bool:
+        return time.monotonic() >= self.unhealthy_until
+
+    def as_dict(self) -> dict:
+        return {
+            "url": self.url,
+            "healthy": self.healthy,
+            "in_flight": self.in_flight,
+            "requests": self.requests,
+            "errors": self.errors,
+            "consecutive_failures": self.consecutive_failures,
+        }
+
+
+class ModelRouter:
+    """
+    - pick(): 해당 버전 풀에서 정상 백엔드 중 처리 중인 요청이 가장 적은 곳 선택 (모두 비정상이면 그중에서라도 선택)
+    - release(): 결과에 따라 상태 갱신. 연속 실패가 unhealthy_after 이상이면 cooldown 동안 제외
+    같은 URL은 여러 버전 풀에 있어도 하나의 Backend로 관리
+    """
+
+    def __init__(self, pools: dict[str, list[str]], unhealthy_after: int = LLM_UNHEALTHY_AFTER,
+                 cooldown: float = LLM_UNHEALTHY_COOLDOWN):
+        self.unhealthy_after = unhealthy_after
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._backends: dict[str, Backend] = {}
+        self._pools: dict[str, list[Backend]] = {}
+        self._next: dict[str, int] = {}
+        for version, urls in pools.items():
+            self._pools[version] = [self._backends.setdefault(u, Backend(u)) for u in urls]
+
+    @classmethod
+    def from_env(cls, default_url: Optional[str] = None) -> "ModelRouter":
+        pools = parse_backends(LLM_BACKENDS)
+        if default_url and DEFAULT_POOL not in pools:
+            pools[DEFAULT_POOL] = [default_url]
+        return cls(pools)
+
+    def pool(self, model_version: str) -> list[Backend]:
+        return self._pools.get(model_version) or self._pools.get(DEFAULT_POOL) or []
+
+    def has_backend(self, model_version: str) -> bool:
+        return bool(self.pool(model_version))
+
+    def pick(self, model_version: str) -> Optional[Backend]:
+        pool = self.pool(model_version)
+        if not pool:
+            return None
+        with self._lock:
+            candidates = [b for b in pool if b.healthy] or pool
+            # 같은 부하면 돌아가면서 선택
+            start = self._next.get(model_version, 0)
+            self._next[model_version] = start + 1
+            ordered = candidates[start % len(candidates):] + candidates[:start % len(candidates)]
+            backend = min(ordered, key=lambda b: b.in_flight)
+            backend.in_flight += 1
+            backend.requests += 1
+            return backend
+
+    def release(self, backend: Backend, ok: bool) -> None:
+        with self._lock:
+            backend.in_flight -= 1
+            if ok:
+                backend.consecutive_failures = 0
+                backend.unhealthy_until = 0.0
+                return
+            backend.errors += 1
+            backend.consecutive_failures += 1
+            if backend.consecutive_failures >= self.unhealthy_after:
+                backend.unhealthy_until = time.monotonic() + self.cooldown
+                print(f"[LLM ROUTER] {backend.url} 비정상 처리 ({self.cooldown:.0f}초 제외)")
+
+    def status(self) -> dict:
+        return {
+            version: {
+                "healthy": any(b.healthy for b in backends),
+                "backends": [b.as_dict() for b in backends],
+            }
+            for version, backends in self._pools.items()
+        }
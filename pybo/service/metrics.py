@@ -0,0 +1,147 @@
+# GenAI 지표 수집 (LLM 지연시간, 토큰 수, 실패 유형) + Prometheus 텍스트 형식 출력
+# Flask 앱과 MCP 서버가 각각 자기 프로세스의 지표를 /metrics 로 노출
+import threading
+import time
+from contextlib import contextmanager
+
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120, 180)
+TOKEN_BUCKETS = (32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+ITERATION_BUCKETS = (1, 2, 3, 4, 5)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, doc: str, labels: tuple = ()):
+        self.name, self.doc, self.labels = name, doc, labels
+        self._lock = threading.Lock()
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(tuple(labels.get(n, "") for n in self.labels), 0)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labels, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, doc: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS):
+        self.name, self.doc, self.labels, self.buckets = name, doc, labels, buckets
+        self._lock = threading.Lock()
+        self._values: dict[tuple, list] = {}  # key -> [버킷별 개수..., 합계, 전체 개수]
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(labels.get(n, "") for n in self.labels)
+        with self._lock:
+            data = self._values.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    data[i] += 1
+            data[-2] += value
+            data[-1] += 1
+
+    def count(self, **labels) -> int:
+        data = self._values.get(tuple(labels.get(n, "") for n in self.labels))
+        return data[-1] if data else 0
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.doc}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, data in sorted(self._values.items()):
+                for bound, n in zip(self.buckets, data):
+                    le = _format_labels(self.labels, key, 'le="%g"' % bound)
+                    lines.append(f"{self.name}_bucket{le} {n}")
+                le = _format_labels(self.labels, key, 'le="+Inf"')
+                labels = _format_labels(self.labels, key)
+                lines.append(f"{self.name}_bucket{le} {data[-1]}")
+                lines.append(f"{self.name}_sum{labels} {data[-2]:g}")
+                lines.append(f"{self.name}_count{labels} {data[-1]}")
+        return lines
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name: str, doc: str, labels: tuple = ()) -> Counter:
+        metric = Counter(name, doc, labels)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(self, name: str, doc: str, labels: tuple = (), buckets: tuple = LATENCY_BUCKETS) -> Histogram:
+        metric = Histogram(name, doc, labels, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+# LLM 백엔드 호출
+LLM_LATENCY = registry.histogram(
+    "genai_llm_latency_seconds", "LLM 백엔드 응답 시간", ("model_version", "task_type"))
+LLM_PROMPT_TOKENS = registry.histogram(
+    "genai_llm_prompt_tokens", "LLM 요청 프롬프트 토큰 수", ("model_version", "task_type"), TOKEN_BUCKETS)
+LLM_COMPLETION_TOKENS = registry.histogram(
+    "genai_llm_completion_tokens", "LLM 응답 토큰 수", ("model_version", "task_type"), TOKEN_BUCKETS)
+LLM_REQUESTS = registry.counter(
+    "genai_llm_requests_total", "LLM 요청 결과 (ok/cache/timeout/status/request/cancelled)",
+    ("model_version", "task_type", "result"))
+LLM_RETRIES = registry.counter(
+    "genai_llm_retries_total", "LLM 요청 재시도 횟수", ("model_version", "reason"))
+LLM_EARLY_STOPS = registry.counter(
+    "genai_llm_early_stops_total", "중지 문자열로 생성을 일찍 끝낸 횟수 (backend: 백엔드가 중단 / client: 스트림 읽기 중단)",
+    ("model_version", "task_type", "where"))
+LLM_SAVED_TOKENS = registry.counter(
+    "genai_llm_saved_tokens_total", "중지 문자열로 생성하지 않은 토큰 수 추정치 (max_new_tokens - 실제 생성 토큰)",
+    ("model_version", "task_type"))
+
+# 에이전트 / 도구
+AGENT_ITERATIONS = registry.histogram(
+    "genai_agent_iterations", "에이전트 실행당 루프 횟수", ("task_type",), ITERATION_BUCKETS)
+TOOL_LATENCY = registry.histogram(
+    "genai_tool_latency_seconds", "도구 호출 시간", ("tool",))
+QA_INTENTS = registry.counter(
+    "genai_qa_intents_total", "규칙 기반 질문 분류 결과 (greeting/lookup/data/docs, lookup은 LLM 없이 답변)", ("intent",))
+
+# 사용자에게 안내 문구(오류 대체 응답)를 보낸 횟수
+FALLBACK_RESPONSES = registry.counter(
+    "genai_fallback_responses_total", "LLM 오류로 안내 문구를 반환한 횟수", ("source", "kind"))
+
+
+@contextmanager
+def timer(histogram: Histogram, **labels):
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+
+
+def render() -> str:
+    return registry.render()
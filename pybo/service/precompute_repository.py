@@ -0,0 +1,52 @@
+# genai_precomputed 테이블 (미리 생성한 보고서/정책) 접근 계층
+from pybo import db
+from pybo.models import GenAIPrecomputed
+
+
+class PrecomputeRepository:
+
+    def get(self, task_type: str, district: str, start_year: int, end_year: int,
+            model_version: str) -> GenAIPrecomputed | None:
+        return GenAIPrecomputed.query.filter_by(
+            task_type=task_type,
+            district=district,
+            start_year=start_year,
+            end_year=end_year,
+            model_version=model_version,
+        ).first()
+
+    # 해당 데이터 버전으로 이미 생성된 항목들의 키
+    def get_current_keys(self, data_version: str) -> set[tuple]:
+        rows = (
+            db.session.query(
+                GenAIPrecomputed.task_type,
+                GenAIPrecomputed.district,
+                GenAIPrecomputed.start_year,
+                GenAIPrecomputed.end_year,
+                GenAIPrecomputed.model_version,
+            )
+            .filter(GenAIPrecomputed.data_version == data_version)
+            .all()
+        )
+        return {tuple(r) for r in rows}
+
+    def upsert(self, task_type: str, district: str, start_year: int, end_year: int, model_version: str,
+               data_version: str, result: str, elapsed_sec: float | None = None) -> GenAIPrecomputed:
+        row = self.get(task_type, district, start_year, end_year, model_version)
+        if row is None:
+            row = GenAIPrecomputed(
+                task_type=task_type,
+                district=district,
+                start_year=start_year,
+                end_year=end_year,
+                model_version=model_version,
+            )
+            db.session.add(row)
+        row.data_version = data_version
+        row.result = result
+        row.elapsed_sec = elapsed_sec
+        row.created_at = db.func.now()
+        return row
+
+    def commit(self):
+        db.session.commit()
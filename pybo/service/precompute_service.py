@@ -0,0 +1,165 @@
+# 보고서/정책 사전 생성 (야간 배치) 및 조회
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from pybo.service.precompute_repository import PrecomputeRepository
+from pybo.service.query_router import SEOUL_DISTRICTS
+from pybo.service.region_repository import RegionRepository
+
+
+def _parse_year_ranges(value: str) -> list[tuple[int, int]]:
+    ranges = []
+    for item in value.split(","):
+        start, _, end = item.strip().partition("-")
+        if start and end:
+            ranges.append((int(start), int(end)))
+    return ranges
+
+
+PRECOMPUTE_YEAR_RANGES = _parse_year_ranges(os.getenv("PRECOMPUTE_YEAR_RANGES", "2023-2030,2023-2026,2027-2030"))
+PRECOMPUTE_MODEL_VERSIONS = [
+    v.strip() for v in os.getenv("PRECOMPUTE_MODEL_VERSIONS", "final,cp200,cp100,base").split(",") if v.strip()
+]
+PRECOMPUTE_CONCURRENCY = int(os.getenv("PRECOMPUTE_CONCURRENCY", "2"))  # LLM 백엔드로 동시에 보낼 작업 수
+DATA_VERSION_TTL = 60  # 초
+
+# 이런 문구가 들어간 결과는 실패로 보고 저장하지 않음 (LLM/도구 오류 안내 문구)
+FAILURE_MARKERS = ("AI 서버", "MCP 도구 호출 오류", "DB 조회 중 오류", "RUNPOD_API_URL이 설정되지")
+
+
+def is_failed_result(text: str) -> bool:
+    """빈 결과이거나 오류 안내 문구가 들어간 결과 (저장/재사용하지 않음)"""
+    return not text or any(marker in text for marker in FAILURE_MARKERS)
+
+
+@dataclass(frozen=True)
+class PrecomputeTask:
+    task_type: str  # report / policy
+    district: str
+    start_year: int
+    end_year: int
+    model_version: str
+
+    @property
+    def key(self) -> tuple:
+        return (self.task_type, self.district, self.start_year, self.end_year, self.model_version)
+
+
+class PrecomputeService:
+
+    _version_lock = threading.Lock()
+    _version_cache: tuple[str, float] | None = None  # (데이터 버전, 저장 시각)
+
+    def __init__(self, precompute_repo: PrecomputeRepository = None, region_repo: RegionRepository = None):
+        self.precompute_repo = precompute_repo or PrecomputeRepository()
+        self.region_repo = region_repo or RegionRepository()
+
+    # ---------------- 조회 (요청 처리 중) ----------------
+    def data_version(self, refresh: bool = False) -> str:
+        cls = type(self)
+        with cls._version_lock:
+            cached = cls._version_cache
+            if not refresh and cached and time.monotonic() - cached[1] < DATA_VERSION_TTL:
+                return cached[0]
+
+        version = self.region_repo.get_data_version()
+        with cls._version_lock:
+            cls._version_cache = (version, time.monotonic())
+        return version
+
+    def get_report(self, district: str, start_year: int, end_year: int, model_version: str) -> Optional[str]:
+        return self._get_current("report", district, start_year, end_year, model_version)
+
+    def get_policy(self, district: str, model_version: str) -> Optional[str]:
+        return self._get_current("policy", district, 0, 0, model_version)
+
+    def _get_current(self, *key) -> Optional[str]:
+        # 현재 데이터 버전으로 만든 결과만 사용 (없거나 오래됐으면 None -> 실시간 생성)
+        row = self.precompute_repo.get(*key)
+        if row is None or row.data_version != self.data_version():
+            return None
+        return row.result
+
+    # ---------------- 배치 ----------------
+    def plan(self, task_types=("report", "policy"), force: bool = False) -> list[PrecomputeTask]:
+        districts = ["전체"] + SEOUL_DISTRICTS
+        tasks = []
+        for model_version in PRECOMPUTE_MODEL_VERSIONS:
+            for district in districts:
+                if "report" in task_types:
+                    for start_year, end_year in PRECOMPUTE_YEAR_RANGES:
+                        tasks.append(PrecomputeTask("report", district, start_year, end_year, model_version))
+                if "policy" in task_types:
+                    tasks.append(PrecomputeTask("policy", district, 0, 0, model_version))
+
+        if force:
+            return tasks
+        done = self.precompute_repo.get_current_keys(self.data_version(refresh=True))
+        return [t for t in tasks if t.key not in done]
+
+    def run(self, tasks: list[PrecomputeTask], concurrency: int = PRECOMPUTE_CONCURRENCY,
+            on_progress: Callable[[PrecomputeTask, str, float], None] = None) -> dict:
+        """
+        LLM 호출은 작업 스레드에서, DB 저장은 호출한 스레드(앱 컨텍스트)에서 처리.
+        on_progress(task, "stored"|"failed", elapsed) 로 진행 상황 전달
+        """
+        from pybo.service.genai_service import get_genai_service
+        genai_service = get_genai_service()
+
+        data_version = self.data_version(refresh=True)
+        summary = {"data_version": data_version, "total": len(tasks), "stored": 0, "failed": 0}
+
+        with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="precompute") as pool:
+            futures = {pool.submit(self._generate, genai_service, task): task for task in tasks}
+            for future in as_completed(futures):
+                task = futures[future]
+                try:
+                    text, elapsed = future.result()
+                except Exception as e:
+                    print(f"[PRECOMPUTE ERROR] {task.key}: {e}")
+                    text, elapsed = "", 0.0
+
+                if is_failed_result(text):
+                    summary["failed"] += 1
+                    status = "failed"
+                else:
+                    self.precompute_repo.upsert(*task.key, data_version=data_version,
+                                                result=text, elapsed_sec=round(elapsed, 2))
+                    self.precompute_repo.commit()
+                    summary["stored"] += 1
+                    status = "stored"
+
+                if on_progress:
+                    on_progress(task, status, elapsed)
+
+        return summary
+
+    @staticmethod
+    def _generate(genai_service, task: PrecomputeTask) -> tuple[str, float]:
+        start = time.time()
+        if task.task_type == "report":
+            text = genai_service.generate_report_with_data(
+                user_prompt="report",
+                district=task.district,
+                start_year=task.start_year,
+                end_year=task.end_year,
+                model_version=task.model_version,
+            )
+        else:
+            text = genai_service.generate_policy("", district=task.district, model_version=task.model_version)
+        return text, time.time() - start
+
+
+# 싱글톤 인스턴스
+_precompute_service_instance = None
+
+
+def get_precompute_service() -> PrecomputeService:
+    global _precompute_service_instance
+    if _precompute_service_instance is None:
+        _precompute_service_instance = PrecomputeService()
+    return _precompute_service_instance
@@ -1,16 +1,27 @@
 from flask import g
 
 from pybo.service.question_repository import QuestionRepository
+from pybo.service.search_service import QnaSearchService, qna_search
 
 
 class QnaService:  # Q&A 도메인 로직
 
-    def __init__(self, question_repo: QuestionRepository | None = None):
+    def __init__(self, question_repo: QuestionRepository | None = None,
+                 search_service: QnaSearchService | None = None):
         self.question_repo = question_repo or QuestionRepository()
+        self.search_service = search_service or qna_search
 
     def get_question_list(self, page: int, per_page: int = 10):
         return self.question_repo.get_question_page(page, per_page)
 
+    def get_question_list_keyset(self, after: str | None = None, before: str | None = None,
+                                 per_page: int = 10):
+        return self.question_repo.get_question_keyset_page(after=after, before=before,
+                                                           per_page=per_page)
+
+    def search_questions(self, query: str, page: int = 1, per_page: int = 10): # 질문/답변 검색
+        return self.search_service.search(query, page=page, per_page=per_page)
+
     def get_question_detail(self, question_id: int):
         return self.question_repo.get_question_or_404(question_id)
 
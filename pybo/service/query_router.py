@@ -0,0 +1,218 @@
+# 규칙 기반 질문 분석 / 의도 분류
+# 자치구, 연도, 지표, 문서 유형, 인사말 키워드를 정규식 하나로 한 번에 찾고(질문당 스캔 1회),
+# 그 결과로 의도를 나눔. 단순 통계 조회(lookup)는 LLM 없이 DB(도구 결과 캐시) 값으로 바로 답변
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from pybo.service import metrics
+from pybo.service.tool_cache import ERROR_MARKERS
+
+SEOUL_DISTRICTS = [
+    "종로구", "중구", "용산구", "성동구", "광진구", "동대문구", "중랑구", "성북구", "강북구", "도봉구",
+    "노원구", "은평구", "서대문구", "마포구", "양천구", "강서구", "구로구", "금천구", "영등포구", "동작구",
+    "관악구", "서초구", "강남구", "송파구", "강동구",
+]
+
+# 예측 데이터(RegionForecast)가 있는 기간. 이 밖의 연도는 바로 답하지 않고 에이전트로 넘김
+FORECAST_START_YEAR = 2023
+FORECAST_END_YEAR = 2030
+
+# db_forecast_search가 조회 결과가 없을 때 돌려주는 문구의 끝부분
+NO_DATA_SUFFIX = "데이터가 없습니다."
+
+# 서울시 전체 합계를 묻는 표현
+TOTAL_KEYWORDS = ["서울시 전체", "서울 전체", "서울시", "전체"]
+
+# 통계 조회가 필요한 질문 (수치 관련 표현)
+METRIC_KEYWORDS = ["인구", "몇 명", "몇명", "예측", "추이", "증가", "감소", "통계", "전망"]
+# 템플릿 답변(지역아동센터 이용 아동 수 예측치)이 가리키는 지표. lookup은 이 표현이 있을 때만
+CHILD_METRIC_KEYWORDS = ["아동 수", "아동수", "아동 인구", "아동인구", "이용 아동", "이용자"]
+# 아동 수 표현과 함께 쓰여도 템플릿 답변으로 충분한 표현 (그 밖의 지표 표현이 섞이면 에이전트로)
+LOOKUP_METRIC_KEYWORDS = CHILD_METRIC_KEYWORDS + ["인구", "몇 명", "몇명", "예측", "전망", "추이"]
+
+# 숫자로 바꿀 수 없는 연도 표현 (기준 연도를 알 수 없으므로 에이전트로)
+RELATIVE_YEAR_KEYWORDS = ["재작년", "작년", "올해", "금년", "내년", "내후년"]
+
+# 수치만으로 답할 수 없는 질문 (원인/비교/정책 등은 에이전트가 문서와 함께 판단)
+ANALYSIS_KEYWORDS = [
+    "왜", "원인", "이유", "영향", "비교", "분석", "정책", "추천", "제안", "대책", "방안", "어떻게", "필요",
+    "보고서", "맞춰",
+]
+
+# 문서 유형 (앞에 있는 유형이 우선)
+DOC_TYPE_KEYWORDS = {
+    "salary": ["인건비", "급여", "호봉", "수당", "보수", "연봉", "돈", "월급"],
+    "support": ["지원", "보조금", "운영비", "배치기준", "정원", "시설장", "생활복지사"],
+    "law": ["법", "조문", "시행령", "시행규칙", "아동복지법"],
+}
+
+GREETING_KEYWORDS = ["안녕", "반가워", "하이", "hello", "hi", "누구"]
+GREETING_MAX_LENGTH = 15  # 이보다 긴 질문은 인사말이 섞여 있어도 본 질문으로 처리
+
+
+def _build_keyword_table() -> dict[str, list[tuple[str, str]]]:
+    # 키워드 -> [(분류, 값)] (같은 키워드가 여러 분류에 속할 수 있음)
+    table: dict[str, list[tuple[str, str]]] = {}
+
+    def add(keyword: str, kind: str, value: str) -> None:
+        table.setdefault(keyword, []).append((kind, value))
+
+    for d in SEOUL_DISTRICTS:
+        add(d, "district", d)
+    for k in TOTAL_KEYWORDS:
+        add(k, "total", "전체")
+    for k in METRIC_KEYWORDS + CHILD_METRIC_KEYWORDS:
+        add(k, "metric", k)
+    for k in RELATIVE_YEAR_KEYWORDS:
+        add(k, "unparsed_year", k)
+    for k in ANALYSIS_KEYWORDS:
+        add(k, "analysis", k)
+    for doc_type, keywords in DOC_TYPE_KEYWORDS.items():
+        for k in keywords:
+            add(k, "doc_type", doc_type)
+    for k in GREETING_KEYWORDS:
+        add(k, "greeting", k)
+    return table
+
+
+_KEYWORDS = _build_keyword_table()
+
+# 모든 키워드(긴 것 먼저) + 연도를 하나의 정규식으로. 전방탐색 안에서 잡으므로 위치마다 검사되어
+# 겹치는 키워드도 모두 찾음 (예: "아동 수당" -> "아동 수"(지표) + "수당"(인건비)), 기존 `k in q` 검사와 같은 결과
+# 연도: 4자리(1900~2099), "25년" 같은 2자리(2000년대), 그 밖의 "숫자+년"(예: "3년")은 해석 불가로 표시
+_MATCHER = re.compile(
+    "(?=(?P<kw>" + "|".join(re.escape(k) for k in sorted(_KEYWORDS, key=len, reverse=True)) + ")"
+    r"|(?<!\d)(?P<year>(?:19|20)\d\d)(?!\d)"
+    r"|(?<!\d)(?P<short_year>\d\d)(?=\s*년)"
+    r"|(?<!\d)(?P<bad_year>\d+)(?=\s*년))"
+)
+
+
+@dataclass
+class QueryEntities:
+    districts: list[str] = field(default_factory=list)  # 질문에 나온 순서
+    years: list[int] = field(default_factory=list)      # 오름차순
+    metrics: list[str] = field(default_factory=list)
+    unparsed_years: list[str] = field(default_factory=list)  # 숫자로 바꾸지 못한 연도 표현
+    analysis: list[str] = field(default_factory=list)
+    doc_types: list[str] = field(default_factory=list)  # DOC_TYPE_KEYWORDS 우선순위 순
+    total: bool = False
+    greeting: bool = False
+
+    @property
+    def district(self) -> str:
+        """첫 번째 자치구, 없으면 "전체"를 말했을 때만 "전체" (둘 다 없으면 "")"""
+        if self.districts:
+            return self.districts[0]
+        return "전체" if self.total else ""
+
+    @property
+    def doc_type(self) -> Optional[str]:
+        return self.doc_types[0] if self.doc_types else None
+
+    def hint(self) -> str:
+        """에이전트 질문 뒤에 붙이는 추출 정보 (없으면 "")"""
+        parts = []
+        if self.district:
+            parts.append(f"자치구={self.district}")
+        if self.years:
+            parts.append(f"연도={self.years[0]}~{self.years[-1]}" if len(self.years) > 1 else f"연도={self.years[0]}")
+        if self.doc_type:
+            parts.append(f"문서유형={self.doc_type}")
+        return f"(질문 분석: {', '.join(parts)})" if parts else ""
+
+
+def match_query(text: str) -> QueryEntities:
+    """질문을 한 번 훑어 키워드/연도를 분류 (영문 인사말 때문에 소문자로 비교)"""
+    q = (text or "").lower()
+    entities = QueryEntities()
+    years, doc_types = set(), set()
+    for m in _MATCHER.finditer(q):
+        if m.group("year"):
+            years.add(int(m.group("year")))
+            continue
+        if m.group("short_year"):
+            years.add(2000 + int(m.group("short_year")))
+            continue
+        if m.group("bad_year"):
+            entities.unparsed_years.append(m.group("bad_year") + "년")
+            continue
+        for kind, value in _KEYWORDS[m.group("kw")]:
+            if kind == "district" and value not in entities.districts:
+                entities.districts.append(value)
+            elif kind == "total":
+                entities.total = True
+            elif kind == "metric":
+                entities.metrics.append(value)
+            elif kind == "analysis":
+                entities.analysis.append(value)
+            elif kind == "doc_type":
+                doc_types.add(value)
+            elif kind == "unparsed_year":
+                entities.unparsed_years.append(value)
+            elif kind == "greeting":
+                entities.greeting = True
+    entities.years = sorted(years)
+    entities.doc_types = [t for t in DOC_TYPE_KEYWORDS if t in doc_types]
+    entities.greeting = entities.greeting and len((text or "").strip()) < GREETING_MAX_LENGTH
+    return entities
+
+
+@dataclass
+class Intent:
+    kind: str  # greeting / lookup / data / docs
+    entities: QueryEntities
+
+
+def route_query(text: str) -> Intent:
+    """
+    greeting: 인사말
+    lookup:   자치구(또는 전체) 하나의 예측 기간 내 아동 수만 묻는 질문 -> 템플릿 답변
+              (다른 지표 표현, 예측 기간 밖 연도, 해석할 수 없는 연도 표현이 있으면 data)
+    data:     그 외 통계가 필요한 질문 -> 문서 검색 + DB 조회
+    docs:     법령/지침 질문 -> 문서 검색
+    """
+    e = match_query(text)
+    if e.greeting:
+        kind = "greeting"
+    elif (
+        any(m in CHILD_METRIC_KEYWORDS for m in e.metrics)
+        and all(m in LOOKUP_METRIC_KEYWORDS for m in e.metrics)
+        and e.district and len(e.districts) <= 1
+        and not e.analysis and not e.doc_types and not e.unparsed_years
+        and all(FORECAST_START_YEAR <= y <= FORECAST_END_YEAR for y in e.years)
+    ):
+        kind = "lookup"
+    elif e.districts or e.total or e.years or e.metrics or e.unparsed_years:
+        kind = "data"
+    else:
+        kind = "docs"
+    metrics.QA_INTENTS.inc(intent=kind)
+    return Intent(kind, e)
+
+
+def lookup_args(entities: QueryEntities) -> dict:
+    """lookup 질문의 db_forecast_search 인자 (연도가 없으면 예측 기간 전체)"""
+    years = entities.years or [FORECAST_START_YEAR, FORECAST_END_YEAR]
+    return {"district": entities.district or "전체", "start_year": years[0], "end_year": years[-1]}
+
+
+def lookup_failed(data: str) -> bool:
+    """템플릿으로 답할 수 없는 조회 결과 (호출/조회 실패 또는 해당 기간 데이터 없음) -> 에이전트로 처리"""
+    data = (data or "").strip()
+    return not data or data.startswith(ERROR_MARKERS) or data.endswith(NO_DATA_SUFFIX)
+
+
+def lookup_answer(entities: QueryEntities, data: str) -> str:
+    """db_forecast_search 결과를 그대로 담은 템플릿 답변"""
+    args = lookup_args(entities)
+    name = "서울시 전체" if args["district"] == "전체" else args["district"]
+    period = (
+        f"{args['start_year']}년" if args["start_year"] == args["end_year"]
+        else f"{args['start_year']}~{args['end_year']}년"
+    )
+    return (
+        f"{name}의 {period} 지역아동센터 이용 아동 수 예측치입니다.\n\n{data.strip()}\n\n"
+        "(수요 예측 모델 기준 수치이며, 원인 분석이나 정책 제안이 필요하면 이어서 질문해 주세요.)"
+    )
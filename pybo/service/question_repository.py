@@ -1,9 +1,66 @@
+import base64
+import json
+import threading
+import time
+from dataclasses import dataclass, field
 from datetime import datetime
 
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import joinedload, selectinload
+
 from pybo import db
 from pybo.models import Question, Answer
+from pybo.service.search_service import qna_search
+
+# 전체 질문 수 캐시 유지 시간(초) - 작성/삭제 시에는 즉시 무효화
+QUESTION_COUNT_TTL = 60
+
+
+@dataclass
+class KeysetPage:
+    """(create_date, id) 기준 keyset 페이지. 템플릿에서 기존 Pagination처럼 사용"""
+    items: list
+    total: int
+    per_page: int
+    offset: int = 0                      # 현재 페이지 첫 항목의 순번 (번호 표시용)
+    next_cursor: str | None = None
+    prev_cursor: str | None = None
+    has_next: bool = field(init=False)
+    has_prev: bool = field(init=False)
+
+    def __post_init__(self):
+        self.has_next = self.next_cursor is not None
+        self.has_prev = self.prev_cursor is not None
+
+    @property
+    def page(self) -> int:
+        return self.offset // self.per_page + 1
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total // self.per_page))
+
+
+def encode_cursor(question: Question, offset: int) -> str:
+    raw = json.dumps({"d": question.create_date.isoformat(), "i": question.id, "o": offset})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(token: str | None) -> tuple[datetime, int, int] | None:
+    if not token:
+        return None
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        data = json.loads(raw)
+        return datetime.fromisoformat(data["d"]), int(data["i"]), max(0, int(data["o"]))
+    except (ValueError, KeyError, TypeError):
+        return None  # 잘못된 커서는 첫 페이지로 처리
+
 
 class QuestionRepository:
+    _count_lock = threading.Lock()
+    _count_cache: tuple[int, float] | None = None  # (전체 개수, 저장 시각)
+
     def get_question_page(self, page: int, per_page: int = 10): # 질문 목록(페이징)
         return (
             Question.query
@@ -11,8 +68,79 @@ class QuestionRepository:
             .paginate(page=page, per_page=per_page)
         )
 
+    # 질문 목록 (keyset 페이징 + 작성자/답변 즉시 로딩)
+    def get_question_keyset_page(self, after: str | None = None, before: str | None = None,
+                                 per_page: int = 10) -> KeysetPage:
+        query = Question.query.options(
+            joinedload(Question.user),
+            selectinload(Question.answer_set),
+        )
+
+        before_key = decode_cursor(before)
+        after_key = decode_cursor(after)
+
+        if before_key:
+            # 이전 페이지: 기준점보다 최신 글을 오래된 순으로 읽은 뒤 뒤집음
+            d, i, offset = before_key
+            rows = (
+                query.filter(or_(Question.create_date > d,
+                                 and_(Question.create_date == d, Question.id > i)))
+                .order_by(Question.create_date.asc(), Question.id.asc())
+                .limit(per_page + 1)
+                .all()
+            )
+            has_prev = len(rows) > per_page
+            items = list(reversed(rows[:per_page]))
+            offset = max(0, offset - len(items))
+            has_next = True
+        else:
+            offset = 0
+            if after_key:
+                d, i, offset = after_key
+                query = query.filter(or_(Question.create_date < d,
+                                         and_(Question.create_date == d, Question.id < i)))
+            rows = (
+                query.order_by(Question.create_date.desc(), Question.id.desc())
+                .limit(per_page + 1)
+                .all()
+            )
+            has_next = len(rows) > per_page
+            items = rows[:per_page]
+            has_prev = after_key is not None
+
+        return KeysetPage(
+            items=items,
+            total=self.count_questions(),
+            per_page=per_page,
+            offset=offset,
+            next_cursor=encode_cursor(items[-1], offset + len(items)) if has_next and items else None,
+            prev_cursor=encode_cursor(items[0], offset) if has_prev and items else None,
+        )
+
+    # 전체 질문 수 (TTL 캐시, 매 페이지마다 COUNT(*) 하지 않음)
+    def count_questions(self) -> int:
+        cls = QuestionRepository
+        with cls._count_lock:
+            cached = cls._count_cache
+            if cached and time.monotonic() - cached[1] < QUESTION_COUNT_TTL:
+                return cached[0]
+
+        total = db.session.query(func.count(Question.id)).scalar() or 0
+        with cls._count_lock:
+            cls._count_cache = (total, time.monotonic())
+        return total
+
+    @classmethod
+    def invalidate_count(cls) -> None:
+        with cls._count_lock:
+            cls._count_cache = None
+
     def get_question_or_404(self, question_id: int) -> Question: # 질문 조회
-        return Question.query.get_or_404(question_id)
+        return (
+            Question.query
+            .options(joinedload(Question.user), selectinload(Question.answer_set))
+            .get_or_404(question_id)
+        )
 
     def create_question(self, subject: str, content: str, user): # 질문 생성
         question = Question(
@@ -23,6 +151,8 @@ class QuestionRepository:
         )
         db.session.add(question)
         db.session.commit()
+        self.invalidate_count()
+        qna_search.on_question_saved(question)
         return question
 
     def update_question(self, question: Question, subject: str, content: str) -> Question: # 질문 수정
@@ -31,11 +161,15 @@ class QuestionRepository:
         if hasattr(question, "modify_date"):
             question.modify_date = datetime.now()
         db.session.commit()
+        qna_search.on_question_saved(question)
         return question
 
     def delete_question(self, question: Question) -> None: # 질문 삭제
+        question_id = question.id
         db.session.delete(question)
         db.session.commit()
+        self.invalidate_count()
+        qna_search.on_question_deleted(question_id)
 
     def create_answer(self, question: Question, content: str, user) -> Answer: # 답변 생성
         answer = Answer(
@@ -44,4 +178,5 @@ class QuestionRepository:
         )
         question.answer_set.append(answer)
         db.session.commit()
-        return answer
\ No newline at end of file
+        qna_search.on_answer_created(answer)
+        return answer
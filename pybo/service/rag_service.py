@@ -5,11 +5,14 @@ from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
 
+from pybo.service.query_router import match_query
+from pybo.service.tool_cache import RAG_JSONL_PATH, RAG_PERSIST_DIRECTORY
+
 
 class RagService:
     def __init__(self):
-        self.persist_directory = "data/chroma_db"
-        self.jsonl_path = "data/jsonl/rag_data.jsonl"
+        self.persist_directory = RAG_PERSIST_DIRECTORY
+        self.jsonl_path = RAG_JSONL_PATH
 
         self.embeddings = HuggingFaceEmbeddings(
             model_name="jhgan/ko-sroberta-multitask",
@@ -80,14 +83,8 @@ class RagService:
 
     @staticmethod
     def _route_doc_type(question: str) -> Optional[str]:
-        q = (question or "").lower()
-        if any(k in q for k in ["인건비", "급여", "호봉", "수당", "보수", "연봉", "돈", "월급"]):
-            return "salary"
-        if any(k in q for k in ["지원", "보조금", "운영비", "배치기준", "정원", "시설장", "생활복지사"]):
-            return "support"
-        if any(k in q for k in ["법", "조문", "시행령", "시행규칙", "아동복지법"]):
-            return "law"
-        return None
+        # 키워드 목록은 query_router.DOC_TYPE_KEYWORDS (salary > support > law 우선)
+        return match_query(question).doc_type
 
     def get_relevant_context(self, question: str) -> str:
         if not self.vector_db:
@@ -1,5 +1,7 @@
 # RegionData / RegionForecast 테이블에 직접적으로 가는 계층
-from sqlalchemy import func, distinct
+import hashlib
+from sqlalchemy import func, distinct, literal, select
+from pybo import db
 from pybo.models import RegionData, RegionForecast
 
 class RegionRepository: # 대시보드, 자치구 목록 등 지역 관련 데이트 조회하기 위한 클래스 (서비스 계층에서 사용)
@@ -172,4 +174,74 @@ class RegionRepository: # 대시보드, 자치구 목록 등 지역 관련 데
             .group_by(RegionForecast.year)
             .order_by(RegionForecast.year.asc())
             .all()
-        )
\ No newline at end of file
+        )
+
+    # 자치구 비교용 실측+예측 시계열 (UNION ALL 한 번으로 전체 구 조회)
+    def get_compare_rows(self, actual_col: str, forecast_col: str):
+        actual = (
+            db.session.query(
+                RegionData.district.label("district"),
+                RegionData.year.label("year"),
+                func.sum(getattr(RegionData, actual_col)).label("value"),
+                literal(0).label("is_pred"),
+            )
+            .filter(RegionData.year.between(2015, 2022))
+            .group_by(RegionData.district, RegionData.year)
+        )
+        forecast = (
+            db.session.query(
+                RegionForecast.district.label("district"),
+                RegionForecast.year.label("year"),
+                func.sum(getattr(RegionForecast, forecast_col)).label("value"),
+                literal(1).label("is_pred"),
+            )
+            .filter(RegionForecast.year >= 2023)
+            .group_by(RegionForecast.district, RegionForecast.year)
+        )
+        return actual.union_all(forecast).all()
+
+
+    # 내보내기용 행 스트리밍 (서버 사이드 커서, arraysize 단위로 묶어서 반환)
+    def iter_export_rows(
+        self,
+        model,
+        columns: list[str],
+        start_year: int | None,
+        end_year: int | None,
+        districts: list[str] | None,
+        arraysize: int,
+    ):
+        stmt = select(*[getattr(model, c) for c in columns])
+
+        if districts:
+            stmt = stmt.where(model.district.in_(districts))
+        if start_year:
+            stmt = stmt.where(model.year >= start_year)
+        if end_year:
+            stmt = stmt.where(model.year <= end_year)
+
+        stmt = stmt.order_by(model.district, model.year, model.id).execution_options(
+            stream_results=True,
+            yield_per=arraysize,  # fetchmany 묶음 크기 (Oracle 커서 arraysize는 config.SQLALCHEMY_ENGINE_OPTIONS)
+        )
+
+        result = db.session.execute(stmt)
+        try:
+            for partition in result.partitions():
+                yield partition
+        finally:
+            result.close()
+
+    # 지역 데이터 버전 (실측/예측 테이블이 다시 적재되면 바뀌는 값)
+    def get_data_version(self) -> str:
+        actual = db.session.query(
+            func.count(RegionData.id), func.max(RegionData.year), func.sum(RegionData.child_user)
+        ).one()
+        forecast = db.session.query(
+            func.count(RegionForecast.id),
+            func.max(RegionForecast.year),
+            func.sum(RegionForecast.predicted_child_user),
+            func.max(RegionForecast.created_at),
+        ).one()
+        raw = "|".join(str(v) for v in (*actual, *forecast))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,350 @@
+# LLM / 도구 호출 기록·재생 (RunPod, MCP 서버 없이 에이전트 성능 측정용)
+# - 기록: 실제 백엔드로 보낸 LLM 요청(httpx)과 도구 호출(ToolTransport)의 요청/응답/지연시간을 JSONL 파일에 저장
+# - 재생: 같은 요청이 오면 저장된 응답을 저장된 지연시간(× scale)만큼 기다렸다가 돌려줌 (네트워크 없음)
+# LLMClient, 도구 호출 경로(get_tool_transport)를 만들기 전에 install() 또는 record_to / replay_from을 호출해야 함
+# (환경 변수 AGENT_RECORD / AGENT_REPLAY를 주면 임포트 시 자동으로 켜짐). 이후 모드 전환은 언제든 가능
+import asyncio
+import codecs
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import defaultdict
+from typing import Optional
+
+import httpx
+from mcp import types
+
+from pybo.service.tool_cache import normalize_args
+
+AGENT_RECORD = os.getenv("AGENT_RECORD")    # 기록할 파일 경로
+AGENT_REPLAY = os.getenv("AGENT_REPLAY")    # 재생할 파일 경로
+AGENT_REPLAY_SCALE = float(os.getenv("AGENT_REPLAY_SCALE", "1.0"))  # 재생 지연시간 배율 (0이면 지연 없이 바로 응답)
+
+# 재생 모드에서 RUNPOD_API_URL이 없을 때 사용할 주소 (실제로 연결하지 않음)
+REPLAY_URL = "http://replay.local/generate"
+
+
+class ReplayMiss(Exception):
+    """기록에 없는 요청 (프롬프트/도구 인자가 기록 이후 바뀐 경우)"""
+
+
+def llm_key(payload: dict) -> str:
+    return hashlib.sha256(json.dumps(payload, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def tool_key(tool_name: str, arguments: dict) -> str:
+    return hashlib.sha256(f"{tool_name}\n{normalize_args(arguments)}".encode("utf-8")).hexdigest()
+
+
+class Recorder:
+    """기록 한 건 = JSONL 한 줄. 여러 스레드/이벤트 루프에서 동시에 써도 됨"""
+
+    def __init__(self, path: str):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._file = open(path, "w", encoding="utf-8")
+        self._lock = threading.Lock()
+        self.count = 0
+
+    def write(self, record: dict) -> None:
+        with self._lock:
+            if self._file.closed:  # 기록 종료 후 늦게 닫힌 응답
+                return
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+
+class Fixture:
+    """
+    기록 파일을 읽어 요청 키별로 순서대로 응답. 같은 요청이 기록보다 많이 오면 마지막 응답을 반복
+    rewind()로 처음부터 다시 재생 (벤치마크 반복 실행)
+    """
+
+    def __init__(self, path: str, scale: float = AGENT_REPLAY_SCALE):
+        self.path = path
+        self.scale = scale
+        self._records: dict[tuple[str, str], list[dict]] = defaultdict(list)
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    self._records[(record["kind"], record["key"])].append(record)
+        self._lock = threading.Lock()
+        self.rewind()
+
+    def rewind(self) -> None:
+        with self._lock:
+            self._cursor: dict[tuple[str, str], int] = defaultdict(int)
+            self.calls = {"llm": 0, "tool": 0}
+            self.misses = 0
+            self.waited = 0.0  # 재생 중 기다린 시간 합계 (기록된 백엔드 시간 × scale)
+
+    def next(self, kind: str, key: str, label: str = "") -> dict:
+        with self._lock:
+            records = self._records.get((kind, key))
+            if not records:
+                self.misses += 1
+                raise ReplayMiss(f"기록에 없는 {kind} 요청입니다: {label or key[:12]} ({self.path})")
+            i = self._cursor[(kind, key)]
+            self._cursor[(kind, key)] += 1
+            self.calls[kind] += 1
+            return records[min(i, len(records) - 1)]
+
+    def delay(self, seconds: float) -> float:
+        seconds = max(0.0, seconds * self.scale)
+        with self._lock:
+            self.waited += seconds
+        return seconds
+
+    def meta(self, key: str) -> Optional[dict]:
+        records = self._records.get(("meta", key))
+        return records[-1] if records else None
+
+    def stats(self) -> dict:
+        return {
+            "path": self.path,
+            "scale": self.scale,
+            "llm_calls": self.calls["llm"],
+            "tool_calls": self.calls["tool"],
+            "misses": self.misses,
+            "waited_sec": round(self.waited, 4),
+        }
+
+
+_recorder: Optional[Recorder] = None
+_fixture: Optional[Fixture] = None
+_installed = False
+
+
+def install() -> None:
+    """이후 만드는 LLMClient / 도구 호출 경로에 기록·재생 계층을 끼움 (모드가 없으면 그대로 통과)"""
+    global _installed
+    _installed = True
+
+
+def record_to(path: str) -> Recorder:
+    """이후 호출을 path에 기록 (이전 기록 파일은 닫음)"""
+    global _recorder, _fixture
+    stop()
+    install()
+    _recorder = Recorder(path)
+    return _recorder
+
+
+def replay_from(path: str, scale: float = AGENT_REPLAY_SCALE) -> Fixture:
+    global _recorder, _fixture
+    stop()
+    install()
+    _fixture = Fixture(path, scale)
+    return _fixture
+
+
+def stop() -> None:
+    """기록/재생을 끝내고 계층도 해제 (이후 만드는 클라이언트는 실제 전송 + 응답 캐시 사용)"""
+    global _recorder, _fixture, _installed
+    if _recorder is not None:
+        _recorder.close()
+    _recorder = None
+    _fixture = None
+    _installed = False
+
+
+def mode() -> Optional[str]:
+    if _fixture is not None:
+        return "replay"
+    if _recorder is not None:
+        return "record"
+    return None
+
+
+# ---------------- LLM (httpx 전송 계층) ----------------
+
+class _RecordingStream(httpx.AsyncByteStream):
+    """응답 본문을 그대로 넘기면서 청크별 도착 시각(응답 헤더 기준)을 기록. 스트리밍 응답도 지연 없이 전달"""
+
+    def __init__(self, inner: httpx.AsyncByteStream, on_close):
+        self._inner = inner
+        self._on_close = on_close
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._started = time.perf_counter()
+        self.chunks: list[list] = []
+
+    async def __aiter__(self):
+        async for chunk in self._inner:
+            text = self._decoder.decode(chunk)
+            if text:
+                self.chunks.append([round(time.perf_counter() - self._started, 4), text])
+            yield chunk
+
+    async def aclose(self) -> None:
+        await self._inner.aclose()
+        self._on_close(self.chunks)
+
+
+class _ReplayStream(httpx.AsyncByteStream):
+    def __init__(self, fixture: Fixture, chunks: list[list]):
+        self._fixture = fixture
+        self._chunks = chunks
+
+    async def __aiter__(self):
+        previous = 0.0
+        for offset, text in self._chunks:
+            await asyncio.sleep(self._fixture.delay(offset - previous))
+            previous = offset
+            yield text.encode("utf-8")
+
+
+class FixtureHTTPTransport(httpx.AsyncBaseTransport):
+    """LLMClient의 httpx 전송 계층. 기록 모드면 실제 요청 후 기록, 재생 모드면 기록된 응답 반환"""
+
+    def __init__(self, inner: Optional[httpx.AsyncBaseTransport] = None):
+        self.inner = inner or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if _fixture is not None:
+            return await self._replay(_fixture, request)
+        recorder = _recorder
+        if recorder is None:
+            return await self.inner.handle_async_request(request)
+
+        payload = json.loads(request.content or b"{}")
+        record = {"kind": "llm", "key": llm_key(payload), "request": payload}
+        request.headers["Accept-Encoding"] = "identity"  # 압축 없이 받아야 본문을 그대로 기록 가능
+        started = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+        except httpx.TimeoutException as e:
+            recorder.write(dict(record, error="timeout", message=str(e), latency=round(time.perf_counter() - started, 4)))
+            raise
+        except httpx.TransportError as e:
+            recorder.write(dict(record, error="transport", message=str(e), latency=round(time.perf_counter() - started, 4)))
+            raise
+
+        record.update(
+            status=response.status_code,
+            content_type=response.headers.get("content-type", ""),
+            latency=round(time.perf_counter() - started, 4),
+        )
+        return httpx.Response(
+            response.status_code,
+            headers=response.headers,
+            stream=_RecordingStream(response.stream, lambda chunks: recorder.write(dict(record, chunks=chunks))),
+            extensions=response.extensions,
+            request=request,
+        )
+
+    @staticmethod
+    async def _replay(fixture: Fixture, request: httpx.Request) -> httpx.Response:
+        payload = json.loads(request.content or b"{}")
+        record = fixture.next("llm", llm_key(payload), f"model_version={payload.get('model_version')}")
+        await asyncio.sleep(fixture.delay(record["latency"]))
+        if record.get("error") == "timeout":
+            raise httpx.ReadTimeout(record["message"], request=request)
+        if record.get("error"):
+            raise httpx.ConnectError(record["message"], request=request)
+        return httpx.Response(
+            record["status"],
+            headers={"content-type": record["content_type"]},
+            stream=_ReplayStream(fixture, record["chunks"]),
+            request=request,
+        )
+
+    async def aclose(self) -> None:
+        await self.inner.aclose()
+
+
+def llm_transport() -> Optional[httpx.AsyncBaseTransport]:
+    """기록/재생 모드일 때만 LLMClient에 끼울 전송 계층 (평소에는 None -> httpx 기본)"""
+    return FixtureHTTPTransport() if _installed else None
+
+
+# ---------------- 도구 호출 ----------------
+
+class FixtureToolTransport:
+    """ToolTransport(mcp / inprocess)를 감싸서 도구 호출을 기록하거나 재생"""
+
+    def __init__(self, inner):
+        self.inner = inner
+        self.name = inner.name
+
+    @staticmethod
+    def _record(recorder: Recorder, tool_name: str, arguments: dict, started: float,
+                result: Optional[types.CallToolResult] = None, error: Optional[Exception] = None) -> None:
+        record = {
+            "kind": "tool",
+            "key": tool_key(tool_name, arguments),
+            "tool": tool_name,
+            "arguments": arguments,
+            "latency": round(time.perf_counter() - started, 4),
+        }
+        if error is not None:
+            record["error"] = str(error)
+        else:
+            record["result"] = result.model_dump(mode="json", by_alias=True, exclude_none=True)
+        recorder.write(record)
+
+    @staticmethod
+    def _replayed(record: dict) -> types.CallToolResult:
+        if "error" in record:
+            raise RuntimeError(record["error"])
+        return types.CallToolResult.model_validate(record["result"])
+
+    async def acall(self, tool_name: str, arguments: dict) -> types.CallToolResult:
+        fixture, recorder = _fixture, _recorder
+        if fixture is not None:
+            record = fixture.next("tool", tool_key(tool_name, arguments), tool_name)
+            await asyncio.sleep(fixture.delay(record["latency"]))
+            return self._replayed(record)
+        if recorder is None:
+            return await self.inner.acall(tool_name, arguments)
+
+        started = time.perf_counter()
+        try:
+            result = await self.inner.acall(tool_name, arguments)
+        except Exception as e:
+            self._record(recorder, tool_name, arguments, started, error=e)
+            raise
+        self._record(recorder, tool_name, arguments, started, result)
+        return result
+
+    def call(self, tool_name: str, arguments: dict) -> types.CallToolResult:
+        fixture, recorder = _fixture, _recorder
+        if fixture is not None:
+            record = fixture.next("tool", tool_key(tool_name, arguments), tool_name)
+            time.sleep(fixture.delay(record["latency"]))
+            return self._replayed(record)
+        if recorder is None:
+            return self.inner.call(tool_name, arguments)
+
+        started = time.perf_counter()
+        try:
+            result = self.inner.call(tool_name, arguments)
+        except Exception as e:
+            self._record(recorder, tool_name, arguments, started, error=e)
+            raise
+        self._record(recorder, tool_name, arguments, started, result)
+        return result
+
+    def stats(self) -> dict:
+        stats = dict(self.inner.stats(), mode=mode())
+        if _fixture is not None:
+            stats["replay"] = _fixture.stats()
+        return stats
+
+
+def wrap_tool_transport(transport):
+    return FixtureToolTransport(transport) if _installed else transport
+
+
+# 환경 변수로 켜는 경우 (python run.py 등 기존 실행 방식 그대로 기록/재생)
+if AGENT_REPLAY:
+    replay_from(AGENT_REPLAY)
+elif AGENT_RECORD:
+    record_to(AGENT_RECORD)
@@ -0,0 +1,130 @@
+# Q&A 검색용 인메모리 역색인 (한글 문자 bigram 기반, 증분 갱신)
+import heapq
+import math
+import re
+import threading
+from collections import Counter
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+# 제목은 본문보다 가중치를 높게 (토큰 빈도를 배수로 반영)
+SUBJECT_WEIGHT = 2
+
+# BM25 파라미터
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def tokenize(text: str) -> list[str]:
+    """
+    한글은 형태소 분석 없이 문자 bigram으로 쪼갠다. (조사가 붙어도 매칭되도록)
+    영문/숫자 단어는 단어 그대로 사용한다.
+    예) '강남구의 센터' -> ['강남', '남구', '구의', '센터']
+    """
+    tokens = []
+    for word in _WORD_RE.findall((text or "").lower()):
+        if word.isascii():
+            tokens.append(word)
+        elif len(word) == 1:
+            tokens.append(word)
+        else:
+            tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+    return tokens
+
+
+class NgramSearchIndex:
+    """문서(질문 id) 단위 역색인. 질문 제목/본문 + 답변 본문을 한 문서로 색인한다."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._postings: dict[str, dict[int, int]] = {}  # 토큰 -> {문서 id: tf}
+        self._docs: dict[int, Counter] = {}              # 문서 id -> 토큰 빈도 (삭제/갱신용)
+        self._doc_len: dict[int, int] = {}
+        self._total_len = 0
+
+    def __len__(self):
+        return len(self._docs)
+
+    def _add_tokens(self, doc_id: int, counts: Counter) -> None:
+        doc = self._docs.setdefault(doc_id, Counter())
+        for token, tf in counts.items():
+            self._postings.setdefault(token, {})
+            self._postings[token][doc_id] = self._postings[token].get(doc_id, 0) + tf
+        doc.update(counts)
+        added = sum(counts.values())
+        self._doc_len[doc_id] = self._doc_len.get(doc_id, 0) + added
+        self._total_len += added
+
+    def remove(self, doc_id: int) -> None:
+        with self._lock:
+            doc = self._docs.pop(doc_id, None)
+            if doc is None:
+                return
+            for token in doc:
+                posting = self._postings.get(token)
+                if posting is None:
+                    continue
+                posting.pop(doc_id, None)
+                if not posting:
+                    del self._postings[token]
+            self._total_len -= self._doc_len.pop(doc_id, 0)
+
+    def upsert(self, doc_id: int, subject: str, content: str, answers: list[str] = ()) -> None:
+        counts = Counter()
+        for _ in range(SUBJECT_WEIGHT):
+            counts.update(tokenize(subject))
+        counts.update(tokenize(content))
+        for answer in answers:
+            counts.update(tokenize(answer))
+
+        with self._lock:
+            self.remove(doc_id)
+            self._add_tokens(doc_id, counts)
+
+    def add_text(self, doc_id: int, text: str) -> None:
+        """기존 문서에 답변 등 텍스트만 추가 (문서 전체 재색인 없이)"""
+        with self._lock:
+            self._add_tokens(doc_id, Counter(tokenize(text)))
+
+    def search(self, query: str, limit: int | None = None) -> list[tuple[int, float]]:
+        """(문서 id, 점수) 목록을 점수 내림차순으로 반환"""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = len(self._docs)
+            if n_docs == 0:
+                return []
+            avg_len = self._total_len / n_docs
+
+            postings = [self._postings.get(t, {}) for t in terms]
+
+            # 모든 토큰을 포함하는 문서 우선 (희소한 토큰부터 교집합), 없으면 하나라도 포함하는 문서
+            ordered = sorted((p for p in postings if p), key=len)
+            if not ordered:
+                return []
+            candidates = set(ordered[0])
+            for p in ordered[1:]:
+                candidates.intersection_update(p)
+                if not candidates:
+                    break
+            if not candidates or len(ordered) < len(postings):
+                candidates = set().union(*ordered)
+
+            scores: dict[int, float] = {}
+            for posting in ordered:
+                idf = math.log(1 + (n_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+                for doc_id in candidates:
+                    tf = posting.get(doc_id)
+                    if not tf:
+                        continue
+                    doc_len = self._doc_len[doc_id]
+                    norm = tf * (BM25_K1 + 1) / (
+                        tf + BM25_K1 * (1 - BM25_B + BM25_B * doc_len / avg_len)
+                    )
+                    scores[doc_id] = scores.get(doc_id, 0.0) + idf * norm
+
+        if limit is None:
+            return sorted(scores.items(), key=lambda x: (-x[1], -x[0]))
+        return heapq.nlargest(limit, scores.items(), key=lambda x: (x[1], x[0]))
@@ -0,0 +1,213 @@
+import os
+import threading
+from dataclasses import dataclass
+
+from sqlalchemy import text
+from sqlalchemy.orm import joinedload, selectinload
+
+from pybo import db
+from pybo.models import Answer, Question
+from pybo.service.search_index import NgramSearchIndex
+
+# auto: Oracle이면 Oracle Text 사용, 실패하거나 다른 DB면 인메모리 bigram 색인
+# oracle_text / memory 로 강제 지정 가능
+QNA_SEARCH_BACKEND = os.getenv("QNA_SEARCH_BACKEND", "auto")
+
+
+@dataclass
+class SearchPage:
+    items: list
+    total: int
+    page: int
+    per_page: int
+    query: str
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-self.total // self.per_page))
+
+    @property
+    def has_prev(self) -> bool:
+        return self.page > 1
+
+    @property
+    def has_next(self) -> bool:
+        return self.page < self.pages
+
+    @property
+    def prev_num(self) -> int:
+        return self.page - 1
+
+    @property
+    def next_num(self) -> int:
+        return self.page + 1
+
+
+class QnaSearchService:
+    """질문 제목/본문, 답변 본문 검색 (Oracle Text 또는 인메모리 역색인)"""
+
+    def __init__(self, backend: str = QNA_SEARCH_BACKEND):
+        self.backend = backend
+        self.index = NgramSearchIndex()
+        self._built = False
+        self._building = False
+        self._pending: list[tuple[str, int, tuple]] = []  # 색인 생성 중 들어온 변경 (생성 후 순서대로 반영)
+        self._build_lock = threading.Lock()
+        self._state_lock = threading.Lock()
+
+    def _use_oracle_text(self) -> bool:
+        if self.backend == "memory":
+            return False
+        if self.backend == "oracle_text":
+            return True
+        return db.engine.dialect.name == "oracle"
+
+    @staticmethod
+    def _load_documents():
+        """(질문 id, 제목, 본문, [(답변 id, 답변 본문)]) 목록"""
+        questions = Question.query.options(selectinload(Question.answer_set)).all()
+        return [(q.id, q.subject, q.content, [(a.id, a.content) for a in q.answer_set]) for q in questions]
+
+    # 인메모리 색인은 첫 검색 시 한 번만 DB에서 만들고, 이후에는 증분 갱신
+    def _ensure_built(self) -> None:
+        if self._built:
+            return
+        with self._build_lock:
+            if self._built:
+                return
+            # DB를 읽기 전에 표시해 두어야 조회 이후 commit된 변경이 빠지지 않음 (훅이 대기열에 쌓음)
+            with self._state_lock:
+                self._building = True
+            try:
+                indexed_answers = set()
+                for doc_id, subject, content, answers in self._load_documents():
+                    self.index.upsert(doc_id, subject, content, [text for _, text in answers])
+                    indexed_answers.update(answer_id for answer_id, _ in answers)
+            except Exception:
+                with self._state_lock:
+                    self._building = False
+                    self._pending = []
+                self.index = NgramSearchIndex()
+                raise
+
+            with self._state_lock:
+                for op, doc_id, args in self._pending:
+                    # 조회 결과에 이미 들어간 답변은 다시 더하지 않음 (질문 갱신/삭제는 여러 번 반영해도 같음)
+                    if op == "answer" and args[0] in indexed_answers:
+                        continue
+                    self._apply(op, doc_id, args)
+                self._pending = []
+                self._building = False
+                self._built = True
+            print(f"[QnaSearch] 인메모리 색인 생성 완료: {len(self.index)}건")
+
+    def _apply(self, op: str, doc_id: int, args: tuple) -> None:
+        if op == "upsert":
+            self.index.upsert(doc_id, *args)
+        elif op == "remove":
+            self.index.remove(doc_id)
+        elif op == "answer":
+            self.index.add_text(doc_id, args[1])
+
+    def _on_change(self, op: str, doc_id: int, *args) -> None:
+        with self._state_lock:
+            if self._building:
+                self._pending.append((op, doc_id, args))
+            elif self._built:
+                self._apply(op, doc_id, args)
+
+    def _tracking(self) -> bool:
+        # 색인을 아직 만들지 않았으면 첫 검색 때 DB에서 전체를 읽으므로 훅은 아무것도 하지 않음
+        # (이 확인 뒤에 생성이 시작되어도 commit이 먼저이므로 생성 시 조회 결과에 포함됨)
+        return self._building or self._built
+
+    # --- 증분 갱신 훅 (QuestionRepository에서 commit 이후 호출) ---
+    def on_question_saved(self, question: Question) -> None:
+        if not self._tracking():
+            return
+        self._on_change("upsert", question.id, question.subject, question.content,
+                        [a.content for a in question.answer_set])
+
+    def on_question_deleted(self, question_id: int) -> None:
+        if not self._tracking():
+            return
+        self._on_change("remove", question_id)
+
+    def on_answer_created(self, answer: Answer) -> None:
+        if not self._tracking():
+            return
+        self._on_change("answer", answer.question_id, answer.id, answer.content)
+
+    # --- 검색 ---
+    def search(self, query: str, page: int = 1, per_page: int = 10) -> SearchPage:
+        query = (query or "").strip()
+        page = max(1, page)
+
+        ranked = self._search_ids(query) if query else []
+        start = (page - 1) * per_page
+        page_ids = [doc_id for doc_id, _ in ranked[start:start + per_page]]
+
+        items = []
+        if page_ids:
+            rows = (
+                Question.query
+                .options(joinedload(Question.user), selectinload(Question.answer_set))
+                .filter(Question.id.in_(page_ids))
+                .all()
+            )
+            by_id = {q.id: q for q in rows}
+            items = [by_id[i] for i in page_ids if i in by_id]
+
+        return SearchPage(items=items, total=len(ranked), page=page, per_page=per_page, query=query)
+
+    def _search_ids(self, query: str) -> list[tuple[int, float]]:
+        if self._use_oracle_text():
+            try:
+                return self._search_oracle_text(query)
+            except Exception as e:
+                # CONTEXT 인덱스가 없는 DB 등 -> 인메모리 색인으로 전환
+                print(f"[QnaSearch] Oracle Text 검색 실패, 인메모리 색인 사용: {e}")
+                db.session.rollback()
+                self.backend = "memory"
+
+        self._ensure_built()
+        return self.index.search(query)
+
+    @staticmethod
+    def _oracle_text_query(query: str) -> str:
+        # CONTEXT 인덱스는 KOREAN_MORPH_LEXER(형태소 단위)로 만들었으므로 bigram이 아닌 띄어쓰기 단어를 그대로 넘김
+        # (질의어도 같은 lexer로 분석됨). CONTAINS 예약어/특수문자 문제를 피하려고 각 단어를 {}로 감싸서 ACCUM 검색
+        terms = [w.replace("{", "").replace("}", "") for w in query.split()]
+        return " ACCUM ".join("{" + t + "}" for t in dict.fromkeys(terms) if t)
+
+    def _search_oracle_text(self, query: str) -> list[tuple[int, float]]:
+        contains_query = self._oracle_text_query(query)
+        if not contains_query:
+            return []
+
+        scores: dict[int, float] = {}
+        question_rows = db.session.execute(
+            text(
+                "SELECT id, SCORE(1) * 2 + SCORE(2) AS score FROM question "
+                "WHERE CONTAINS(subject, :q, 1) > 0 OR CONTAINS(content, :q, 2) > 0"
+            ),
+            {"q": contains_query},
+        )
+        for row in question_rows:
+            scores[row.id] = scores.get(row.id, 0.0) + float(row.score)
+
+        answer_rows = db.session.execute(
+            text(
+                "SELECT question_id, SUM(SCORE(1)) AS score FROM answer "
+                "WHERE CONTAINS(content, :q, 1) > 0 GROUP BY question_id"
+            ),
+            {"q": contains_query},
+        )
+        for row in answer_rows:
+            scores[row.question_id] = scores.get(row.question_id, 0.0) + float(row.score)
+
+        return sorted(scores.items(), key=lambda x: (-x[1], -x[0]))
+
+
+# 프로세스 공용 인스턴스 (색인을 요청마다 다시 만들지 않도록)
+qna_search = QnaSearchService()
@@ -0,0 +1,98 @@
+# 동일한 요청이 이미 진행 중이면 새로 보내지 않고 같은 결과를 기다리게 하는 single-flight 유틸
+import asyncio
+import json
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable
+
+
+def make_flight_key(*parts: Any) -> str:
+    """dict 키 순서 등에 관계없이 같은 요청이면 같은 키가 나오도록 정규화"""
+    return json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class FlightStats:
+    def __init__(self):
+        self.leaders = 0     # 실제로 백엔드에 보낸 호출 수
+        self.coalesced = 0   # 진행 중인 호출에 합류한 수
+
+    def as_dict(self, in_flight: int) -> dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced, "in_flight": in_flight}
+
+
+class SingleFlight:
+    """스레드용. 같은 키의 호출은 먼저 시작한 스레드의 결과(또는 예외)를 공유한다."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[str, Future] = {}
+        self.stats = FlightStats()
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._calls[key] = Future()
+                self.stats.leaders += 1
+            else:
+                self.stats.coalesced += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    def as_dict(self) -> dict:
+        return self.stats.as_dict(len(self._calls))
+
+
+class _AsyncCall:
+    def __init__(self, task: asyncio.Task):
+        self.task = task
+        self.waiters = 0
+
+
+class AsyncSingleFlight:
+    """
+    이벤트 루프용. 실제 작업은 별도 Task로 실행하고 호출자들은 shield로 기다린다.
+    한 호출자가 취소돼도 나머지는 계속 기다리며, 기다리는 호출자가 모두 사라지면 작업도 취소한다.
+    """
+
+    def __init__(self):
+        self._calls: dict[str, _AsyncCall] = {}
+        self.stats = FlightStats()
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = self._calls[key] = _AsyncCall(asyncio.ensure_future(factory()))
+            call.task.add_done_callback(lambda _t, k=key, c=call: self._forget(k, c))
+            self.stats.leaders += 1
+        else:
+            self.stats.coalesced += 1
+
+        call.waiters += 1
+        try:
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                call.task.cancel()
+
+    def _forget(self, key: str, call: _AsyncCall) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def as_dict(self) -> dict:
+        return self.stats.as_dict(len(self._calls))
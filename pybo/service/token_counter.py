@@ -0,0 +1,47 @@
+# 프롬프트 토큰 수 계산
+# LLM_TOKENIZER(예: meta-llama/Meta-Llama-3-8B-Instruct 또는 로컬 경로)가 설정되어 있으면 실제 토크나이저를,
+# 없거나 로드에 실패하면 빠른 근사치를 사용
+import os
+import re
+import threading
+
+LLM_TOKENIZER = os.getenv("LLM_TOKENIZER", "")
+
+_HANGUL = re.compile(r"[가-힣ㄱ-ㆎ]")
+
+_tokenizer = None
+_tokenizer_loaded = False
+_tokenizer_lock = threading.Lock()
+
+
+def estimate_tokens(text: str) -> int:
+    """Llama-3 토크나이저 기준 근사: 한글 1글자 ≈ 1토큰, 그 외 문자 4글자 ≈ 1토큰"""
+    if not text:
+        return 0
+    hangul = len(_HANGUL.findall(text))
+    return hangul + (len(text) - hangul + 3) // 4
+
+
+def _get_tokenizer():
+    global _tokenizer, _tokenizer_loaded
+    if _tokenizer_loaded:
+        return _tokenizer
+    with _tokenizer_lock:
+        if not _tokenizer_loaded:
+            if LLM_TOKENIZER:
+                try:
+                    from transformers import AutoTokenizer
+                    _tokenizer = AutoTokenizer.from_pretrained(LLM_TOKENIZER)
+                except Exception as e:
+                    print(f"[TokenCounter] 토크나이저 로드 실패, 근사치 사용: {e}")
+            _tokenizer_loaded = True
+    return _tokenizer
+
+
+def count_tokens(text: str) -> int:
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return estimate_tokens(text)
+    return len(tokenizer.encode(text, add_special_tokens=False))
@@ -0,0 +1,206 @@
+# 도구 결과 캐시 (도구명 + 정규화한 인자 기준, 도구별 TTL + 데이터/인덱스 버전이 바뀌면 무효화)
+# ToolClient(Flask 쪽)와 MCP 서버 양쪽에서 사용
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import nullcontext
+from typing import Callable, Optional
+
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "1") == "1"
+# 캐시할 도구와 TTL(초). 목록에 없는 도구(LLM 생성 도구 등)는 캐시하지 않음
+TOOL_CACHE_TTLS = os.getenv("TOOL_CACHE_TTLS", "db_forecast_search=3600,rag_search=86400")
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "2000"))
+TOOL_CACHE_VERSION_TTL = float(os.getenv("TOOL_CACHE_VERSION_TTL", "60"))  # 데이터/인덱스 버전 재확인 주기(초)
+
+BASE_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+# RagService도 이 경로를 사용 (실행 위치와 관계없이 프로젝트 기준)
+RAG_PERSIST_DIRECTORY = os.path.join(BASE_DIR, "data", "chroma_db")
+RAG_JSONL_PATH = os.path.join(BASE_DIR, "data", "jsonl", "rag_data.jsonl")
+
+# 도구 서버 프로세스의 로컬 파일로 결과가 정해지는 도구. 버전(파일 지문)은 도구를 실행하는 프로세스에서만
+# 알 수 있으므로, 다른 프로세스의 MCP 서버를 호출하는 쪽에서는 캐시하지 않음 (서버 쪽 캐시가 담당)
+LOCAL_INDEX_TOOLS = ("rag_search",)
+
+# 이 문구로 시작하는 결과(호출/조회 실패)는 저장하지 않음
+ERROR_MARKERS = ("MCP 도구 호출 오류", "DB 조회 중 오류", "Error executing tool", "Unknown tool")
+
+
+def parse_ttls(value: str) -> dict[str, float]:
+    ttls = {}
+    for item in value.split(","):
+        name, _, ttl = item.strip().partition("=")
+        if name and ttl:
+            ttls[name.strip()] = float(ttl)
+    return ttls
+
+
+def normalize_args(arguments: dict) -> str:
+    """인자 순서/문자열 앞뒤 공백이 달라도 같은 키가 되도록 정규화"""
+    def norm(v):
+        if isinstance(v, str):
+            return " ".join(v.split())
+        if isinstance(v, dict):
+            return {k: norm(x) for k, x in v.items()}
+        if isinstance(v, list):
+            return [norm(x) for x in v]
+        return v
+    return json.dumps(norm(arguments or {}), ensure_ascii=False, sort_keys=True)
+
+
+def rag_index_version(persist_directory: str = RAG_PERSIST_DIRECTORY, jsonl_path: str = RAG_JSONL_PATH) -> str:
+    """벡터 인덱스 / 원본 JSONL 파일의 크기, 수정 시각이 바뀌면 달라지는 버전 (임베딩 모델을 로드하지 않음)"""
+    parts = []
+    if os.path.isdir(persist_directory):
+        for root, _, files in os.walk(persist_directory):
+            for name in sorted(files):
+                st = os.stat(os.path.join(root, name))
+                parts.append(f"{name}:{st.st_size}:{st.st_mtime_ns}")
+    if os.path.exists(jsonl_path):
+        st = os.stat(jsonl_path)
+        parts.append(f"jsonl:{st.st_size}:{st.st_mtime_ns}")
+    return hashlib.sha1("|".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def forecast_data_version() -> str:
+    from pybo.service.region_repository import RegionRepository
+    return RegionRepository().get_data_version()
+
+
+class ToolResultCache:
+    """
+    메모리 LRU. 항목마다 저장 당시의 버전을 함께 두고, 조회 시 현재 버전과 다르면 버림(stale).
+    버전은 도구별 provider 함수로 구하며 version_ttl 동안 재사용 (매 호출 DB 집계 방지)
+    조회 결과 상태: hit / miss / stale / off(캐시 대상 아님)
+    """
+
+    def __init__(self, ttls: Optional[dict[str, float]] = None, max_entries: int = TOOL_CACHE_MAX_ENTRIES,
+                 version_ttl: float = TOOL_CACHE_VERSION_TTL, enabled: bool = TOOL_CACHE_ENABLED):
+        self.ttls = parse_ttls(TOOL_CACHE_TTLS) if ttls is None else ttls
+        self.max_entries = max_entries
+        self.version_ttl = version_ttl
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[str, str, float, str]] = OrderedDict()  # key -> (도구, 결과, 만료 시각, 버전)
+        self._providers: dict[str, Callable[[], str]] = {}
+        self._versions: dict[str, tuple[Optional[str], float]] = {}
+        self.hits = self.misses = self.stale = self.stores = 0
+
+    def cacheable(self, tool_name: str) -> bool:
+        return self.enabled and tool_name in self.ttls
+
+    def set_version(self, tool_name: str, provider: Callable[[], str]) -> None:
+        self._providers[tool_name] = provider
+        self._versions.pop(tool_name, None)
+
+    def version(self, tool_name: str, refresh: bool = False) -> Optional[str]:
+        """현재 데이터/인덱스 버전. provider가 없으면 "" (TTL로만 만료), 확인 실패 시 None (캐시 사용 안 함)"""
+        provider = self._providers.get(tool_name)
+        if provider is None:
+            return ""
+        cached = self._versions.get(tool_name)
+        if not refresh and cached and time.monotonic() - cached[1] < self.version_ttl:
+            return cached[0]
+        try:
+            version = provider()
+        except Exception as e:
+            print(f"[ToolCache] {tool_name} 버전 확인 실패, 캐시 미사용: {e}")
+            version = None
+        self._versions[tool_name] = (version, time.monotonic())
+        return version
+
+    @staticmethod
+    def make_key(tool_name: str, arguments: dict) -> str:
+        return hashlib.sha256(f"{tool_name}\n{normalize_args(arguments)}".encode("utf-8")).hexdigest()
+
+    def lookup(self, tool_name: str, arguments: dict) -> tuple[Optional[str], str]:
+        if not self.cacheable(tool_name):
+            return None, "off"
+        version = self.version(tool_name)
+        if version is None:
+            return None, "off"
+
+        key = self.make_key(tool_name, arguments)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None, "miss"
+            _, text, expires_at, entry_version = entry
+            if expires_at < time.time() or entry_version != version:
+                del self._entries[key]
+                self.stale += 1
+                return None, "stale"
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return text, "hit"
+
+    def get(self, tool_name: str, arguments: dict) -> Optional[str]:
+        return self.lookup(tool_name, arguments)[0]
+
+    def put(self, tool_name: str, arguments: dict, text: str) -> None:
+        if not self.cacheable(tool_name) or not isinstance(text, str) or text.startswith(ERROR_MARKERS):
+            return
+        version = self.version(tool_name)
+        if version is None:
+            return
+        key = self.make_key(tool_name, arguments)
+        with self._lock:
+            self._entries[key] = (tool_name, text, time.time() + self.ttls[tool_name], version)
+            self._entries.move_to_end(key)
+            self.stores += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tool_name: Optional[str] = None) -> int:
+        """도구 하나(또는 전체)의 캐시 삭제 후 버전도 다시 확인. 삭제한 항목 수 반환"""
+        with self._lock:
+            keys = [k for k, entry in self._entries.items() if tool_name is None or entry[0] == tool_name]
+            for key in keys:
+                del self._entries[key]
+        if tool_name is None:
+            self._versions.clear()
+        else:
+            self._versions.pop(tool_name, None)
+        return len(keys)
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses + self.stale
+        return {
+            "enabled": self.enabled,
+            "ttls": self.ttls,
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "stale": self.stale,
+            "stores": self.stores,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            "versions": {name: v for name, (v, _) in self._versions.items()},
+        }
+
+
+def register_default_versions(cache: ToolResultCache, app_context: Callable = nullcontext) -> None:
+    """
+    db_forecast_search -> 지역 데이터 버전, rag_search -> 벡터 인덱스 버전
+    (rag_search 버전은 이 프로세스의 인덱스 파일 기준이므로 도구를 직접 실행하는 프로세스에서만 의미가 있음)
+    """
+    def data_version():
+        with app_context():
+            return forecast_data_version()
+
+    cache.set_version("db_forecast_search", data_version)
+    cache.set_version("rag_search", rag_index_version)
+
+
+# 싱글톤 (프로세스당 하나)
+_tool_cache_instance = None
+
+
+def get_tool_cache() -> ToolResultCache:
+    global _tool_cache_instance
+    if _tool_cache_instance is None:
+        _tool_cache_instance = ToolResultCache()
+    return _tool_cache_instance
@@ -0,0 +1,65 @@
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy.orm import make_transient_to_detached
+
+from pybo import db
+from pybo.models import Users
+
+USER_CACHE_TTL = 300      # 초
+USER_CACHE_MAXSIZE = 1024
+
+
+class UserCache:
+    """
+    로그인 사용자 행을 id 기준으로 잠깐 보관하는 TTL 캐시.
+    세션에 묶이지 않은 컬럼 값만 저장하고, 꺼낼 때 현재 요청의 세션에 merge(load=False) 하므로
+    스레드 간에 ORM 객체를 공유하지 않으며 추가 쿼리도 발생하지 않는다.
+    """
+
+    def __init__(self, ttl: float = USER_CACHE_TTL, maxsize: int = USER_CACHE_MAXSIZE):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._rows: OrderedDict[int, tuple[dict, float]] = OrderedDict()
+
+    def get(self, user_id: int) -> Users | None:
+        with self._lock:
+            entry = self._rows.get(user_id)
+            if entry and time.monotonic() - entry[1] < self.ttl:
+                self._rows.move_to_end(user_id)
+                values = entry[0]
+            else:
+                values = None
+
+        if values is None:
+            user = db.session.get(Users, user_id)
+            if user is None:
+                return None
+            self._put(user)
+            return user
+
+        snapshot = Users(**values)
+        make_transient_to_detached(snapshot)
+        return db.session.merge(snapshot, load=False)
+
+    def _put(self, user: Users) -> None:
+        values = {c.key: getattr(user, c.key) for c in Users.__table__.columns}
+        with self._lock:
+            self._rows[user.id] = (values, time.monotonic())
+            self._rows.move_to_end(user.id)
+            while len(self._rows) > self.maxsize:
+                self._rows.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        with self._lock:
+            self._rows.pop(user_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+
+# 프로세스 공용 인스턴스
+user_cache = UserCache()
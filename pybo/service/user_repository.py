@@ -1,5 +1,6 @@
 from pybo import db
 from pybo.models import Users
+from pybo.service.user_cache import user_cache
 
 
 class UserRepository:
@@ -20,7 +21,14 @@ class UserRepository:
         db.session.add(user)
 
     def commit(self):
+        # 변경/삭제되는 사용자는 캐시에서 제거 (비밀번호 변경 등)
+        changed = [
+            obj.id for obj in list(db.session.dirty) + list(db.session.deleted)
+            if isinstance(obj, Users) and obj.id is not None
+        ]
         db.session.commit()
+        for user_id in changed:
+            user_cache.invalidate(user_id)
 
     def rollback(self):
         db.session.rollback()
@@ -16,38 +16,13 @@ document.addEventListener("DOMContentLoaded", function () {
     const aiSummary = document.getElementById("aiSummary");
     const aiContent = document.getElementById("aiContent");
 
-    // 모델 교체 및 UI 업데이트 함수 (수정됨)
+    // 모델 설정 UI 업데이트 함수
     async function updateModelSettingsUI() {
         const selected = document.querySelector('input[name="modelVersion"]:checked');
         const ver = selected ? selected.value : "final";
         const config = modelHistory[ver];
-        const reportBtn = reportForm ? reportForm.querySelector("button[type='submit']") : null;
-
-        // 서버에 모델 교체 요청
-        if (reportBtn) {
-            reportBtn.disabled = true;
-            reportBtn.innerHTML = '<span class="spinner-border spinner-border-sm"></span> 모델 전환 중...';
-        }
-
-        try {
-            console.log(`서버 모델 교체 요청: ${ver}`);
-            const switchResp = await fetch("/genai-api/switch-model", {
-                method: "POST",
-                headers: { "Content-Type": "application/json" },
-                body: JSON.stringify({ model_version: ver })
-            });
-            const switchData = await switchResp.json();
-            if (switchData.success) {
-                console.log(`모델 교체 성공: ${ver}`);
-            }
-        } catch (err) {
-            console.error("모델 교체 중 오류:", err);
-        } finally {
-            if (reportBtn) {
-                reportBtn.disabled = false;
-                reportBtn.innerHTML = '<i class="bi bi-magic mr-2"></i> 보고서 생성';
-            }
-        }
+        // 서버 모델은 바꾸지 않음: 보고서/정책/Q&A 요청마다 model_version(getModelVer())을 함께 보내면
+        // 서버가 해당 버전을 처리하는 백엔드로 라우팅한다
 
         // 기존 UI 제어 로직
         const trainingInputs = [
@@ -88,6 +63,52 @@ document.addEventListener("DOMContentLoaded", function () {
         return document.querySelector('input[name="modelVersion"]:checked')?.value || "final";
     }
 
+    // SSE 스트리밍 요청 (token / step / done / error 이벤트를 받는 즉시 콜백 호출)
+    async function streamGenAI(url, body, handlers) {
+        const resp = await fetch(url, {
+            method: "POST",
+            headers: { "Content-Type": "application/json", "Accept": "text/event-stream" },
+            body: JSON.stringify(Object.assign({}, body, { stream: true })),
+        });
+
+        // 입력 검증 오류 등은 일반 JSON으로 내려옴
+        if (!resp.ok || !resp.body || !(resp.headers.get("Content-Type") || "").includes("text/event-stream")) {
+            const data = await resp.json().catch(() => ({}));
+            if (handlers.onError) handlers.onError(data.error || "오류 발생");
+            return;
+        }
+
+        const reader = resp.body.getReader();
+        const decoder = new TextDecoder("utf-8");
+        let buffer = "";
+
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) break;
+            buffer += decoder.decode(value, { stream: true });
+
+            let sep;
+            while ((sep = buffer.indexOf("\n\n")) >= 0) {
+                const raw = buffer.slice(0, sep);
+                buffer = buffer.slice(sep + 2);
+
+                let event = "message";
+                let dataLine = "";
+                raw.split("\n").forEach(line => {
+                    if (line.startsWith("event:")) event = line.slice(6).trim();
+                    else if (line.startsWith("data:")) dataLine += line.slice(5).trim();
+                });
+                if (!dataLine) continue;
+
+                const data = JSON.parse(dataLine);
+                if (event === "token" && handlers.onToken) handlers.onToken(data.text);
+                else if (event === "step" && handlers.onStep) handlers.onStep(data);
+                else if (event === "done" && handlers.onDone) handlers.onDone(data.result);
+                else if (event === "error" && handlers.onError) handlers.onError(data.error);
+            }
+        }
+    }
+
     // 연도 선택 로직 (기존 유지)
     const startSelect = document.getElementById('startYear');
     const endSelect = document.getElementById('endYear');
@@ -118,31 +139,43 @@ document.addEventListener("DOMContentLoaded", function () {
             if(loadingSpinner) loadingSpinner.style.display = "block";
             if(reportBtn) { reportBtn.disabled = true; reportBtn.innerHTML = "생성 중..."; }
 
+            let streamed = "";
             try {
-                const resp = await fetch("/genai-api/report", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify({
-                        district: document.getElementById("regionSelect").value,
-                        start_year: parseInt(document.getElementById("startYear").value),
-                        end_year: parseInt(document.getElementById("endYear").value),
-                        model_version: modelVer,
-                        prompt: "report"
-                    }),
+                await streamGenAI("/genai-api/report", {
+                    district: document.getElementById("regionSelect").value,
+                    start_year: parseInt(document.getElementById("startYear").value),
+                    end_year: parseInt(document.getElementById("endYear").value),
+                    model_version: modelVer,
+                    prompt: "report"
+                }, {
+                    onStep: (step) => {
+                        if (reportBtn) reportBtn.innerHTML = `생성 중... (${step.action})`;
+                    },
+                    onToken: (text) => {
+                        // 첫 토큰부터 본문을 바로 표시
+                        if (!streamed) {
+                            loadingSpinner.style.display = "none";
+                            aiTitle.textContent = "분석 보고서";
+                            aiSummary.textContent = "생성 중...";
+                            resultSection.style.display = "block";
+                        }
+                        streamed += text;
+                        aiContent.innerText = streamed;
+                    },
+                    onDone: (result) => {
+                        let parsedData = { title: "분석 결과", summary: "정보 없음", content: result };
+                        try {
+                            const cleanJson = result.replace(/```json/g, "").replace(/```/g, "").trim();
+                            parsedData = JSON.parse(cleanJson);
+                        } catch (err) { parsedData.content = result; }
+
+                        aiTitle.textContent = parsedData.title || "분석 보고서";
+                        aiSummary.textContent = parsedData.summary || "요약 없음";
+                        aiContent.innerText = parsedData.content || "";
+                        resultSection.style.display = "block";
+                    },
+                    onError: (error) => alert(error || "오류 발생"),
                 });
-                const data = await resp.json();
-                if (data.success) {
-                    let parsedData = { title: "분석 결과", summary: "정보 없음", content: data.result };
-                    try {
-                        const cleanJson = data.result.replace(/```json/g, "").replace(/```/g, "").trim();
-                        parsedData = JSON.parse(cleanJson);
-                    } catch (err) { parsedData.content = data.result; }
-
-                    aiTitle.textContent = parsedData.title || "분석 보고서";
-                    aiSummary.textContent = parsedData.summary || "요약 없음";
-                    aiContent.innerText = parsedData.content || "";
-                    resultSection.style.display = "block";
-                } else { alert(data.error || "오류 발생"); }
             } catch (err) { alert("서버 통신 오류"); }
             finally {
                 loadingSpinner.style.display = "none";
@@ -161,14 +194,18 @@ document.addEventListener("DOMContentLoaded", function () {
             policyBtn.disabled = true;
             resultArea.style.display = "block";
             resultArea.textContent = "생성 중...";
+            let streamed = "";
             try {
-                const resp = await fetch("/genai-api/policy", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify({ prompt: input.value, model_version: getModelVer() }),
+                await streamGenAI("/genai-api/policy", { prompt: input.value, model_version: getModelVer() }, {
+                    onToken: (text) => {
+                        streamed += text;
+                        resultArea.textContent = streamed;
+                    },
+                    onDone: (result) => { resultArea.textContent = result; },
+                    onError: (error) => { resultArea.textContent = error; },
                 });
-                const data = await resp.json();
-                resultArea.textContent = data.success ? data.result : data.error;
+            } catch (err) {
+                resultArea.textContent = "서버 통신 오류가 발생했습니다.";
             } finally { policyBtn.disabled = false; }
         });
     }
@@ -205,18 +242,22 @@ document.addEventListener("DOMContentLoaded", function () {
             chat.scrollTop = chat.scrollHeight;
 
             try {
-                const resp = await fetch("/genai-api/qa", {
-                    method: "POST",
-                    headers: { "Content-Type": "application/json" },
-                    body: JSON.stringify({ question: q, model_version: getModelVer() }),
-                });
-                const data = await resp.json();
-
-                // 생성된 로딩 버블을 찾아 실제 답변으로 교체
+                // 토큰이 도착하는 대로 로딩 버블을 실제 답변으로 교체
+                let streamed = "";
                 const loadingBubble = document.getElementById(tempLoadingId);
-                if (loadingBubble) {
-                    loadingBubble.innerHTML = data.success ? data.result : "답변을 가져오는 중 오류가 발생했습니다.";
-                }
+                await streamGenAI("/genai-api/qa", { question: q, model_version: getModelVer() }, {
+                    onToken: (text) => {
+                        streamed += text;
+                        if (loadingBubble) loadingBubble.textContent = streamed;
+                        chat.scrollTop = chat.scrollHeight;
+                    },
+                    onDone: (result) => {
+                        if (loadingBubble) loadingBubble.textContent = result;
+                    },
+                    onError: () => {
+                        if (loadingBubble) loadingBubble.innerHTML = "답변을 가져오는 중 오류가 발생했습니다.";
+                    },
+                });
             } catch (err) {
                 const loadingBubble = document.getElementById(tempLoadingId);
                 if (loadingBubble) {
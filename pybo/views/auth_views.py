@@ -1,10 +1,10 @@
 # pybo/views/auth_views.py
 from functools import wraps
 
-from flask import Blueprint, url_for, render_template, request, flash, session, g
+from flask import Blueprint, url_for, render_template, request, flash, session, g, has_request_context
+from flask.ctx import _AppCtxGlobals
 from werkzeug.utils import redirect
 
-from pybo import db  # load_logged_in_user에서 Users.query 대신 repo 써도 되지만, 우선 기존 import 유지
 from pybo.forms import (
     UserCreateForm,
     UserLoginForm,
@@ -14,7 +14,7 @@ from pybo.forms import (
 )
 from pybo.service.auth_service import AuthService
 from pybo.service.user_repository import UserRepository
-from pybo.models import Users
+from pybo.service.user_cache import user_cache
 
 bp = Blueprint('auth', __name__, url_prefix='/auth')
 
@@ -62,17 +62,28 @@ def login():
     return render_template('auth/login.html', form=form, auth_page=True)
 
 
-@bp.before_app_request
 def load_logged_in_user():
     """
-    매 요청마다 session의 user_id로 사용자 객체를 g.user에 세팅.
-    (기존 동작 그대로 유지)
+    session의 user_id로 사용자 객체를 로딩.
+    매 요청마다 조회하지 않고, g.user에 처음 접근할 때 한 번만 호출된다. (LazyUserGlobals)
     """
+    if not has_request_context():
+        return None
     user_id = session.get('user_id')
     if user_id is None:
-        g.user = None
-    else:
-        g.user = Users.query.get(user_id)
+        return None
+    return user_cache.get(user_id)
+
+
+class LazyUserGlobals(_AppCtxGlobals):
+    """g.user를 실제로 읽는 요청에서만 사용자 조회 (/data/*, /genai-api/* 등은 조회 없음)"""
+
+    def __getattr__(self, name):
+        if name == 'user':
+            user = load_logged_in_user()
+            self.user = user
+            return user
+        return super().__getattr__(name)
 
 
 @bp.route('/logout')
@@ -1,8 +1,15 @@
-from flask import Blueprint, jsonify, request
+from flask import Blueprint, Response, current_app, jsonify, request, stream_with_context
 from pybo.service.data_service import DataService
+from pybo.service.export_service import ExportService
 
 bp = Blueprint("data", __name__, url_prefix="/data")
 data_service = DataService()
+export_service = ExportService()
+
+
+def _split_arg(name: str) -> list[str]:
+    raw = request.args.get(name, default="", type=str)
+    return [v.strip() for v in raw.split(",") if v.strip()]
 
 
 @bp.route("/test") # 서버/블루프린트 정상 작동 테스트용
@@ -53,3 +60,49 @@ def predict_series():
     district = request.args.get("district", default="전체", type=str)
     data = data_service.get_predict_series(district=district)
     return jsonify(data)
+
+
+
+# 자치구 비교/순위 API (예: /data/compare?districts=강남구,송파구&metric=child_user)
+@bp.route("/compare")
+def compare():
+    districts = _split_arg("districts")
+    metric = request.args.get("metric", default="child_user", type=str)
+
+    data = data_service.get_compare_data(districts=districts, metric=metric)
+    if not data["success"]:
+        return jsonify(data), 400
+    return jsonify(data)
+
+
+
+# 실측/예측 테이블 내보내기 API (예: /data/export/region_forecast?format=csv&columns=district,year&start_year=2025)
+@bp.route("/export/<dataset>")
+def export(dataset):
+    fmt = request.args.get("format", default="csv", type=str).lower()
+    columns = _split_arg("columns")
+    districts = _split_arg("districts")
+    start_year = request.args.get("start_year", type=int)
+    end_year = request.args.get("end_year", type=int)
+
+    error = export_service.validate(dataset, fmt, columns)
+    if error:
+        return jsonify({"success": False, "error": error}), 400
+
+    columns = export_service.resolve_columns(dataset, columns)
+    arraysize = current_app.config.get("EXPORT_FETCH_ARRAYSIZE", 1000)
+    args = (dataset, columns, start_year, end_year, districts, arraysize)
+
+    if fmt == "parquet":
+        body = export_service.iter_parquet(*args)
+        mimetype = "application/vnd.apache.parquet"
+    else:
+        body = export_service.iter_csv(*args)
+        mimetype = "text/csv"
+
+    # 전체 결과를 메모리에 올리지 않고 배치 단위로 바로 전송
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={dataset}.{fmt}"},
+    )
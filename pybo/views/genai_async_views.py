@@ -0,0 +1,40 @@
+# ASGI 서버(asgi.py)에서 Flask보다 먼저 처리하는 비동기 GenAI 라우트
+# 응답 형식은 genai_views의 같은 경로와 동일. 요청을 기다리는 동안 워커 스레드를 잡지 않으므로
+# 워커 하나로 I/O(MCP 도구, LLM)를 기다리는 QA 요청 여러 개를 동시에 처리할 수 있음
+import traceback
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from pybo.agent.qa_graph import arun_qa
+
+URL_PREFIX = "/genai-api"  # genai_views.bp와 같은 접두사
+
+
+async def qa_v2(request: Request) -> JSONResponse:
+    try:
+        data = await request.json()
+    except ValueError:
+        data = {}
+    if not isinstance(data, dict):
+        data = {}
+    question = (data.get("question") or "").strip()
+    model_ver = data.get("model_version", "final")
+
+    if not question:
+        return JSONResponse({"success": False, "error": "질문을 입력해 주세요."}, status_code=400)
+
+    try:
+        answer = await arun_qa(question, model_version=model_ver)
+        return JSONResponse({"success": True, "result": answer})
+    except Exception:
+        # 콘솔에 전체 스택트레이스 출력
+        print("[qa_v2 async] error")
+        traceback.print_exc()
+        return JSONResponse({"success": False, "error": "qa_v2 error (check server log)"}, status_code=500)
+
+
+routes = [
+    Route(f"{URL_PREFIX}/qa_v2", qa_v2, methods=["POST"]),
+]
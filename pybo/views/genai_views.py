@@ -1,27 +1,141 @@
-from flask import Blueprint, request, jsonify, render_template, current_app, g
-import requests
+from flask import Blueprint, request, jsonify, render_template, current_app, g, Response, stream_with_context, url_for, session
 import traceback
+import json
 import os
+import hmac
+import uuid
 from pybo.agent.qa_graph import run_qa
 from pybo.service.genai_service import get_genai_service
+from pybo.service.llm_cache import get_llm_cache
+from pybo.service.llm_client import get_llm_client
+from pybo.service.tool_cache import get_tool_cache
+from pybo.service.job_service import get_job_queue, JobFailed, JobQueueFull
+from pybo.service.precompute_service import get_precompute_service, is_failed_result
 
 # Blueprint 설정 (URL 프리픽스 확인: /genai-api)
 bp = Blueprint("genai_api", __name__, url_prefix="/genai-api")
 
 genai_service = get_genai_service()
+precompute_service = get_precompute_service()
 
 
-# 모델 변경
+# LLM/도구 오류 안내 문구로 끝난 작업은 실패로 기록 (완료로 남으면 같은 요청이 결과 보관 시간 동안 오류 문구를 재사용함)
+def _fail_on_fallback(events):
+    for event, data in events:
+        if event == "done" and is_failed_result(data):
+            raise JobFailed("AI 서버 오류로 결과를 생성하지 못했습니다. 잠시 후 다시 시도해주세요.")
+        yield event, data
+
+
+# 백그라운드 작업 (보고서/정책): 에이전트 단계(step)만 기록하고 토큰 스트리밍은 하지 않음
+job_queue = get_job_queue()
+job_queue.register("report", lambda p: _fail_on_fallback(
+    genai_service.stream_report_with_data("report", stream=False, **p)
+))
+job_queue.register("policy", lambda p: _fail_on_fallback(genai_service.stream_policy(
+    p["prompt"], stream=False, district=p["district"], model_version=p["model_version"]
+)))
+
+
+# 스트리밍 요청 여부 (body의 stream: true 또는 Accept: text/event-stream)
+def _wants_stream(data: dict) -> bool:
+    return bool(data.get("stream")) or "text/event-stream" in request.headers.get("Accept", "")
+
+
+# 대화 구분 키 (로그인 사용자는 사용자 id, 비로그인은 세션마다 발급)
+def _conversation_id() -> str:
+    if g.user:
+        return f"user:{g.user.id}"
+    if "genai_conversation_id" not in session:
+        session["genai_conversation_id"] = uuid.uuid4().hex
+    return f"session:{session['genai_conversation_id']}"
+
+
+# 비동기 작업 요청 여부 (body의 async: true 또는 Prefer: respond-async)
+def _wants_async(data: dict) -> bool:
+    return bool(data.get("async")) or "respond-async" in request.headers.get("Prefer", "")
+
+
+# 작업 등록 후 바로 job id 반환 (대기열이 가득 차면 429)
+# result가 있으면(사전 생성 결과) 실행 없이 완료된 작업으로 등록해 같은 형식으로 응답
+def _job_response(kind: str, params: dict, result: str | None = None):
+    try:
+        if result is not None:
+            job, created = job_queue.submit_completed(kind, params, result)
+        else:
+            job, created = job_queue.submit(kind, params)
+    except JobQueueFull:
+        res = jsonify({"success": False, "error": "요청이 많아 처리할 수 없습니다. 잠시 후 다시 시도해주세요."})
+        res.status_code = 429
+        res.headers["Retry-After"] = "10"
+        return res
+
+    return jsonify({
+        "success": True,
+        "job_id": job.id,
+        "status": job.status,
+        "created": created,
+        "status_url": url_for(".job_status", job_id=job.id),
+        "events_url": url_for(".job_events", job_id=job.id),
+    }), 202
+
+
+# 야간 배치로 미리 만든 결과 응답 (비동기 요청이면 완료된 작업, 스트리밍 요청이면 done 이벤트 하나만 보냄)
+def _precomputed_response(result: str, data: dict, kind: str, params: dict):
+    if _wants_async(data):
+        return _job_response(kind, params, result=result)
+    if _wants_stream(data):
+        return _sse_response(iter([("done", result)]), "")
+    return jsonify({"success": True, "result": result, "precomputed": True})
+
+
+# 미리 생성된 결과 조회 (테이블이 없거나 조회 실패 시 실시간 생성으로 진행)
+def _lookup_precomputed(getter, *args):
+    try:
+        return getter(*args)
+    except Exception:
+        current_app.logger.exception("precomputed lookup error")
+        return None
+
+
+# (event, data) 이벤트를 Server-Sent Events 응답으로 변환
+# 클라이언트 연결이 끊기면 generator가 닫히면서 진행 중인 LLM 스트리밍 요청도 취소됨
+# (에이전트 중간 단계의 동기 LLM/도구 호출은 취소되지 않고, 끝난 뒤 다음 이벤트에서 중단)
+def _sse_response(events, error_message: str):
+    def generate():
+        try:
+            for event, data in events:
+                if event == "token":
+                    payload = {"text": data}
+                elif event == "done":
+                    payload = {"result": data}
+                else:
+                    payload = data
+                yield f"event: {event}\ndata: {json.dumps(payload, ensure_ascii=False)}\n\n"
+        except Exception:
+            current_app.logger.exception("genai stream error")
+            yield f"event: error\ndata: {json.dumps({'error': error_message}, ensure_ascii=False)}\n\n"
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+# 모델 변경 (이전 화면 호환용)
+# 백엔드 모델을 전역으로 바꾸지 않음. 각 요청이 model_version을 싣고 오면 라우터가 해당 버전 백엔드로 보냄
 @bp.route("/switch-model", methods=["POST"])
 def switch_model():
-    data = request.get_json()
-    try:
-        # 런포드 서버의 /switch_model 엔드포인트 호출
-        runpod_url = os.getenv("RUNPOD_API_URL").replace("/generate", "/switch_model")
-        res = requests.post(runpod_url, json=data, timeout=60)
-        return jsonify({"success": True, "result": res.json()})
-    except Exception as e:
-        return jsonify({"success": False, "error": str(e)}), 500
+    data = request.get_json() or {}
+    model_ver = data.get("model_version", "final")
+    router = get_llm_client().router
+    if not router.has_backend(model_ver):
+        return jsonify({"success": False, "error": f"{model_ver} 모델을 처리할 서버가 없습니다."}), 400
+    return jsonify({
+        "success": True,
+        "result": {"model_version": model_ver, "backends": [b.as_dict() for b in router.pool(model_ver)]},
+    })
 
 # 보고서 생성
 @bp.route("/report", methods=["POST"])
@@ -34,14 +148,38 @@ def generate_report():
 
     if not district or not end_year:
         return jsonify({"success": False, "error": "자치구와 연도를 모두 선택해주세요."}), 400
+    try:
+        start_year, end_year = int(start_year), int(end_year)
+    except (TypeError, ValueError):
+        return jsonify({"success": False, "error": "연도는 숫자로 입력해주세요."}), 400
+
+    job_params = {"district": district, "start_year": start_year, "end_year": end_year, "model_version": model_ver}
+    precomputed = _lookup_precomputed(precompute_service.get_report, district, start_year, end_year, model_ver)
+    if precomputed is not None:
+        return _precomputed_response(precomputed, data, "report", job_params)
+
+    if _wants_async(data):
+        return _job_response("report", job_params)
+
+    if _wants_stream(data):
+        return _sse_response(
+            genai_service.stream_report_with_data(
+                user_prompt="report",
+                district=district,
+                start_year=start_year,
+                end_year=end_year,
+                model_version=model_ver
+            ),
+            "보고서 생성 중 오류가 발생했습니다.",
+        )
 
     try:
         # model_version 파라미터 전달 추가
         result_text = genai_service.generate_report_with_data(
             user_prompt="report",
             district=district,
-            start_year=int(start_year),
-            end_year=int(end_year),
+            start_year=start_year,
+            end_year=end_year,
             model_version=model_ver
         )
         return jsonify({"success": True, "result": result_text})
@@ -53,19 +191,52 @@ def generate_report():
 def generate_policy():
     data = request.get_json() or {}
     prompt = (data.get("prompt") or "").strip()
+    district = (data.get("district") or "전체").strip()
     model_ver = data.get("model_version", "final") # 모델 버전 추가
 
+    # 정책 에이전트 임무는 자치구 기준으로만 만들어지므로 (prompt 미사용) 사전 생성 결과를 그대로 사용 가능
+    job_params = {"prompt": prompt, "district": district, "model_version": model_ver}
+    precomputed = _lookup_precomputed(precompute_service.get_policy, district, model_ver)
+    if precomputed is not None:
+        return _precomputed_response(precomputed, data, "policy", job_params)
+
+    if _wants_async(data):
+        return _job_response("policy", job_params)
+
+    if _wants_stream(data):
+        return _sse_response(
+            genai_service.stream_policy(prompt, district=district, model_version=model_ver),
+            "정책 생성 중 오류가 발생했습니다.",
+        )
+
     try:
-        text = genai_service.generate_policy(prompt, model_version=model_ver)
+        text = genai_service.generate_policy(prompt, district=district, model_version=model_ver)
         return jsonify({"success": True, "result": text})
     except Exception as e:
         return jsonify({"success": False, "error": str(e)}), 500
 
+# 작업 상태 조회 (폴링)
+@bp.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    job = job_queue.get(job_id)
+    if job is None:
+        return jsonify({"success": False, "error": "작업을 찾을 수 없습니다."}), 404
+    return jsonify({"success": True, "job": job.to_dict()})
+
+
+# 작업 진행 상황 (SSE: 에이전트 단계마다 step, 끝나면 done)
+@bp.route("/jobs/<job_id>/events", methods=["GET"])
+def job_events(job_id):
+    if job_queue.get(job_id) is None:
+        return jsonify({"success": False, "error": "작업을 찾을 수 없습니다."}), 404
+    return _sse_response(job_queue.iter_events(job_id), "작업 처리 중 오류가 발생했습니다.")
+
 # AI Q&A (지표 설명 + QA 통합)
 @bp.route("/qa", methods=["POST"])
 def qa():
     data = request.get_json() or {}
     question = (data.get("question") or "").strip()
+    model_ver = data.get("model_version", "final")
 
     if not question:
         return jsonify({"success": False, "error": "질문을 입력해 주세요."}), 400
@@ -75,11 +246,22 @@ def qa():
     if hasattr(g, "user_id") and getattr(g, "user", None):
         user_id = g.user.id
 
+    if _wants_stream(data):
+        return _sse_response(
+            genai_service.stream_qa_with_log(
+                question=question, user_id=user_id, page="genai",
+                conversation_id=_conversation_id(), model_version=model_ver
+            ),
+            "답변 생성 중 오류가 발생했습니다.",
+        )
+
     try:
         answer = genai_service.answer_qa_with_log(
             question=question,
             user_id=user_id,
-            page="genai"
+            page="genai",
+            conversation_id=_conversation_id(),
+            model_version=model_ver
         )
         return jsonify({"success": True, "result": answer})
     except Exception as e:
@@ -87,6 +269,13 @@ def qa():
         return jsonify({"success": False, "error": "답변 생성 중 오류가 발생했습니다."}), 500
 
 
+# 대화 기록 초기화
+@bp.route("/qa/reset", methods=["POST"])
+def qa_reset():
+    genai_service.conversations.clear(_conversation_id())
+    return jsonify({"success": True})
+
+
 # 설정 변경 API (JSON 반환으로 변경됨)
 @bp.route("/config", methods=["POST"])
 def config():
@@ -127,12 +316,13 @@ def summarize():
 def qa_v2():
     data = request.get_json() or {}
     question = (data.get("question") or "").strip()
+    model_ver = data.get("model_version", "final")
 
     if not question:
         return jsonify({"success": False, "error": "질문을 입력해 주세요."}), 400
 
     try:
-        answer = run_qa(question)
+        answer = run_qa(question, model_version=model_ver)
         return jsonify({"success": True, "result": answer})
     except Exception:
         # 콘솔에 전체 스택트레이스 출력
@@ -142,4 +332,53 @@ def qa_v2():
         return jsonify({
             "success": False,
             "error": "qa_v2 error (check server log)"
-        }), 500
\ No newline at end of file
+        }), 500
+
+
+# 관리자 여부 (X-Admin-Token 헤더가 GENAI_ADMIN_TOKEN과 일치, 토큰 미설정 시 항상 거부)
+# Users 모델에 관리자 구분 컬럼이 없으므로 로그인 계정으로는 판단하지 않음
+def _is_admin() -> bool:
+    token = os.getenv("GENAI_ADMIN_TOKEN")
+    header = request.headers.get("X-Admin-Token", "")
+    return bool(token and header and hmac.compare_digest(token, header))
+
+
+# LLM 응답 캐시 통계
+@bp.route("/cache/stats", methods=["GET"])
+def cache_stats():
+    if not _is_admin():
+        return jsonify({"success": False, "error": "권한이 없습니다."}), 403
+    return jsonify({"success": True, "result": get_llm_cache().stats()})
+
+
+# LLM 응답 캐시 비우기 (model_version을 주면 해당 모델 응답만 삭제)
+@bp.route("/cache/purge", methods=["POST"])
+def cache_purge():
+    if not _is_admin():
+        return jsonify({"success": False, "error": "권한이 없습니다."}), 403
+    data = request.get_json(silent=True) or {}
+    deleted = get_llm_cache().purge(data.get("model_version"))
+    return jsonify({"success": True, "deleted": deleted})
+
+
+# 도구 결과 캐시 비우기 (tool을 주면 해당 도구 결과만 삭제, 데이터 재적재/인덱스 재생성 직후 사용)
+@bp.route("/tool-cache/purge", methods=["POST"])
+def tool_cache_purge():
+    if not _is_admin():
+        return jsonify({"success": False, "error": "권한이 없습니다."}), 403
+    data = request.get_json(silent=True) or {}
+    deleted = get_tool_cache().invalidate(data.get("tool"))
+    return jsonify({"success": True, "deleted": deleted})
+
+
+# LLM 클라이언트 / 도구 호출 통계 (대기열, 중복 요청 합류, 캐시)
+@bp.route("/stats", methods=["GET"])
+def stats():
+    if not _is_admin():
+        return jsonify({"success": False, "error": "권한이 없습니다."}), 403
+    return jsonify({"success": True, "result": {
+        "llm": get_llm_client().stats(),
+        "tools": genai_service.agent.tool_client.stats(),
+        "jobs": job_queue.stats(),
+        "conversations": genai_service.conversations.stats(),
+    }})
@@ -1,6 +1,8 @@
-from flask import Blueprint, url_for, render_template
+from flask import Blueprint, url_for, render_template, Response
 from werkzeug.utils import redirect
 
+from pybo.service import metrics
+
 bp = Blueprint('main', __name__, url_prefix='/')
 
 @bp.route('/')
@@ -38,3 +40,7 @@ def privacy():
     return render_template('policy/privacy.html')
 
 
+# Prometheus 수집용 GenAI 지표 (LLM 지연시간, 토큰 수, 재시도/타임아웃, 도구 호출 시간)
+@bp.route('/metrics')
+def metrics_endpoint():
+    return Response(metrics.render(), content_type=metrics.CONTENT_TYPE)
@@ -12,11 +12,24 @@ qna_service = QnaService()
 # 질문 목록
 @bp.route('/list/')
 def _list():
-    page = request.args.get('page', type=int, default=1)
-    question_list = qna_service.get_question_list(page=page, per_page=10)
+    # keyset 페이징: ?after=<커서> 다음 페이지, ?before=<커서> 이전 페이지
+    question_list = qna_service.get_question_list_keyset(
+        after=request.args.get('after'),
+        before=request.args.get('before'),
+        per_page=10,
+    )
 
     return render_template('question/qna.html', question_list=question_list)
 
+# 질문/답변 검색
+@bp.route('/search/')
+def search():
+    keyword = request.args.get('q', default='', type=str)
+    page = request.args.get('page', type=int, default=1)
+    result = qna_service.search_questions(keyword, page=page, per_page=10)
+
+    return render_template('question/search.html', question_list=result, keyword=keyword)
+
 # 질문 상세
 @bp.route('/detail/<int:question_id>/')
 def detail(question_id):
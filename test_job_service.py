@@ -0,0 +1,73 @@
+"""
+백그라운드 작업 큐 테스트 (LLM/DB 없이 실행)
+
+    python -m pytest -q test_job_service.py
+"""
+import os
+import sys
+import time
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+from pybo.service.job_service import JobFailed, JobQueue, MemoryJobStore, SqliteJobStore
+
+
+def _wait(queue: JobQueue, job_id: str, timeout: float = 5.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = queue.get(job_id)
+        if job.finished:
+            return job
+        queue.wait_for_update(0.05)
+    raise AssertionError("작업이 끝나지 않음")
+
+
+def _fallback():
+    yield "step", {"iteration": 1}
+    raise JobFailed("AI 서버 오류")
+
+
+def test_failed_result_is_not_reused():
+    for store in (MemoryJobStore(), SqliteJobStore(":memory:")):
+        queue = JobQueue(store=store)
+        queue.register("report", lambda p: _fallback())
+        job, created = queue.submit("report", {"district": "강남구"})
+        job = _wait(queue, job.id)
+        assert created and job.status == "failed" and job.error == "AI 서버 오류"
+
+        retry, created = queue.submit("report", {"district": "강남구"})
+        assert created and retry.id != job.id
+
+
+def test_done_result_is_reused_and_precomputed_job_completed():
+    queue = JobQueue()
+    queue.register("policy", lambda p: iter([("done", "정책")]))
+    job, _ = queue.submit("policy", {"district": "중구"})
+    assert _wait(queue, job.id).result == "정책"
+    again, created = queue.submit("policy", {"district": "중구"})
+    assert not created and again.id == job.id
+
+    done, created = queue.submit_completed("policy", {"district": "마포구"}, "사전 생성 정책")
+    assert created and done.status == "done" and done.finished_at is not None
+    assert queue.submit("policy", {"district": "마포구"})[0].id == done.id
+
+
+def test_store_skips_jobs_without_finished_at():
+    store = MemoryJobStore()
+    queue = JobQueue(store=store)
+    queue.register("report", lambda p: iter([]))
+    job, _ = queue.submit("report", {"x": 1})
+    _wait(queue, job.id)
+    job.finished_at = None  # 상태만 바뀐 순간
+    now = time.time()
+    assert store.find_reusable(job.dedup_key, now, 600) is None
+    assert store.purge_expired(now, 0) == 0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")
@@ -0,0 +1,70 @@
+"""
+LLM 응답 캐시(SQLite) 테스트: 누적 크기 관리, 조회 시각 일괄 기록, 이벤트 루프 밖 실행
+
+    python -m pytest -q test_llm_cache.py
+"""
+import asyncio
+import os
+import sys
+import threading
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+from pybo.service.llm_cache import LLMResponseCache
+
+
+def _db_bytes(cache: LLMResponseCache) -> int:
+    return cache._sum_bytes(cache._db())
+
+
+def test_running_total_matches_table():
+    cache = LLMResponseCache(path=":memory:", max_bytes=100, sweep_interval=3600)
+    for i in range(10):
+        cache.put(f"k{i}", "가" * 10)  # 30바이트
+    cache.put("k9", "나" * 5)           # 같은 키 덮어쓰기
+    assert cache._total_bytes == _db_bytes(cache) <= 100
+    assert cache.evictions > 0
+    assert cache.purge() >= 1 and cache._total_bytes == 0
+
+
+def test_access_time_written_in_batches_and_before_eviction():
+    cache = LLMResponseCache(path=":memory:", max_bytes=90, access_flush=100, sweep_interval=3600)
+    for key in ("a", "b", "c"):
+        cache.put(key, "가" * 10)
+    assert cache.get("a") is not None  # 조회 시각은 아직 기록하지 않음
+    last_access = dict(cache._db().execute("SELECT key, last_access FROM llm_cache").fetchall())
+    assert last_access["a"] < last_access["c"]
+
+    # 제거 직전에 모아 둔 조회 시각을 반영 -> 최근에 읽은 a 대신 b가 제거됨
+    cache.put("d", "가" * 10)
+    keys = {k for (k,) in cache._db().execute("SELECT key FROM llm_cache").fetchall()}
+    assert keys == {"a", "c", "d"}
+
+
+def test_async_access_runs_off_loop_thread():
+    cache = LLMResponseCache(path=":memory:")
+    threads = []
+    original = cache.get
+
+    def get(key):
+        threads.append(threading.current_thread().name)
+        return original(key)
+
+    cache.get = get
+
+    async def run():
+        await cache.aput("k", "응답")
+        return await cache.aget("k"), threading.current_thread().name
+
+    value, loop_thread = asyncio.run(run())
+    assert value == "응답"
+    assert threads and threads[0] != loop_thread and threads[0].startswith("llm-cache")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")
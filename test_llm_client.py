@@ -0,0 +1,317 @@
+import os
+import sys
+import threading
+import time
+
+# 프로젝트 루트를 경로에 추가 (DB 없이 실행 가능하도록 기본값 지정)
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+from fake_runpod_server import start_fake_server
+from pybo.service.llm_client import LLMClient, LLMError
+from pybo.service.llm_cache import LLMResponseCache
+from pybo.service.llm_router import ModelRouter, parse_backends
+
+
+def test_generate_sync():
+    server = start_fake_server()
+    try:
+        client = LLMClient(api_url=server.url)
+        text = client.generate("지시", "강남구 질문", model_version="cp100")
+        assert text == "[cp100] 강남구 질문"
+    finally:
+        server.shutdown()
+
+
+def test_concurrency_limits():
+    server = start_fake_server(delay=0.2)
+    try:
+        client = LLMClient(api_url=server.url, max_concurrency=4, per_model_concurrency=2)
+
+        threads = [
+            threading.Thread(target=client.generate, args=("지시", f"q{i}"), kwargs={"model_version": "final"})
+            for i in range(6)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        stats = client.stats()
+        assert server.max_active <= 2  # 같은 모델은 2개까지만 동시 처리
+        assert stats["models"]["final"]["requests"] == 6
+        assert stats["queue"]["max_wait_sec"] > 0
+    finally:
+        server.shutdown()
+
+
+def test_retry_on_503():
+    server = start_fake_server()
+    try:
+        server.fail_next = 1
+        client = LLMClient(api_url=server.url, backoff_factor=0.01)
+        assert client.generate("지시", "재시도").endswith("재시도")
+        assert len(server.requests) == 2
+    finally:
+        server.shutdown()
+
+
+def test_cancel():
+    server = start_fake_server(delay=5.0)
+    try:
+        client = LLMClient(api_url=server.url)
+        started = time.time()
+        try:
+            client.generate("지시", "취소", is_cancelled=lambda: time.time() - started > 0.3)
+            assert False, "취소되어야 함"
+        except LLMError as e:
+            assert e.kind == "cancelled"
+        assert time.time() - started < 3.0  # 응답을 기다리면 5초
+    finally:
+        server.shutdown()
+
+
+def test_cancelled_on_loop_is_llm_error():
+    import asyncio
+
+    class CancelledClient(LLMClient):
+        async def _generate(self, payload, timeout, task_type):
+            raise asyncio.CancelledError()
+
+    # 루프 쪽에서 작업이 취소되면 future.result()는 concurrent.futures.CancelledError를 던짐
+    try:
+        CancelledClient(api_url="http://127.0.0.1:9").generate("지시", "취소")
+        assert False, "취소되어야 함"
+    except LLMError as e:
+        assert e.kind == "cancelled"
+
+
+def test_stream_tokens_arrive_incrementally():
+    server = start_fake_server(delay=0.1, token_delay=0.05)
+    try:
+        server.responses = ["지역아동센터 이용 아동 수는 증가 추세입니다."]
+        client = LLMClient(api_url=server.url)
+
+        started = time.time()
+        arrivals = []
+        tokens = []
+        for token in client.stream("지시", "질문"):
+            arrivals.append(time.time() - started)
+            tokens.append(token)
+
+        assert "".join(tokens) == "지역아동센터 이용 아동 수는 증가 추세입니다."
+        assert len(tokens) > 1
+        assert arrivals[0] < arrivals[-1] - 0.2  # 첫 토큰이 전체 완료보다 먼저 도착
+    finally:
+        server.shutdown()
+
+
+def test_stream_not_retried_after_first_token():
+    import httpx
+
+    class DropAfterTwoTokens(httpx.AsyncByteStream):
+        async def __aiter__(self):
+            yield b'{"token": "first "}\n'
+            yield b'{"token": "second"}\n'
+            raise httpx.ReadError("connection reset")
+
+    class Transport(httpx.AsyncBaseTransport):
+        requests = 0
+
+        async def handle_async_request(self, request):
+            Transport.requests += 1
+            return httpx.Response(200, headers={"content-type": "application/x-ndjson"}, stream=DropAfterTwoTokens())
+
+    client = LLMClient(api_url="http://llm.test/generate", transport=Transport(), backoff_factor=0.01)
+    tokens = []
+    try:
+        for token in client.stream("지시", "질문"):
+            tokens.append(token)
+        assert False, "LLMError가 발생해야 함"
+    except LLMError as e:
+        assert e.kind == "request"
+    # 이미 보낸 토큰을 다시 보내지 않음 (재요청 없음)
+    assert tokens == ["first ", "second"]
+    assert Transport.requests == 1
+
+
+def test_stop_sequences_end_generation_early():
+    from pybo.agent.tool_agent import STOP_WORDS
+
+    react = "통계가 필요하다.\nAction: db_forecast_search\nAction Input: {\"district\": \"강남구\"}"
+    invented = "\nObservation: 지어낸 결과\n사용자 질문: 다음 질문" + "가" * 300
+    server = start_fake_server(token_delay=0.01)
+    try:
+        client = LLMClient(api_url=server.url)
+
+        # 백엔드가 중지 문자열에서 멈춤
+        server.responses = [react + invented]
+        assert client.generate("지시", "질문", stop=STOP_WORDS, temperature=0.9) == react
+        assert server.generated_tokens == -(-len(react) // server.token_size)  # 중지 문자열 뒤는 생성하지 않음
+        assert server.requests[-1]["stop"] == STOP_WORDS
+        assert client.stats()["stop"]["early_stops"] == 1
+
+        # 백엔드가 중지 문자열을 무시해도 스트리밍은 클라이언트가 읽기를 멈춤
+        server.honour_stop = False
+        server.responses = [react + invented]
+        assert "".join(client.stream("지시", "질문", stop=STOP_WORDS, temperature=0.9)).strip() == react
+        # 클라이언트가 연결을 끊으면 서버는 다음 토큰 전송에서 생성을 중단
+        for _ in range(100):
+            if server.aborted:
+                break
+            time.sleep(0.02)
+        assert server.aborted == 1
+        stop_stats = client.stats()["stop"]
+        assert stop_stats["early_stops"] == 2 and stop_stats["saved_tokens"] > 0
+
+        # 일반 응답은 절약은 없지만 결과는 같게 잘라냄
+        server.responses = [react + invented]
+        assert client.generate("지시", "질문", stop=STOP_WORDS, temperature=0.9) == react
+        assert client.stats()["stop"]["early_stops"] == 2
+    finally:
+        server.shutdown()
+
+
+def test_response_cache():
+    server = start_fake_server()
+    try:
+        cache = LLMResponseCache(path=":memory:", max_bytes=200)
+        client = LLMClient(api_url=server.url, cache=cache)
+
+        first = client.generate("지시", "강남구 질문", model_version="cp100", temperature=0.1)
+        second = client.generate("지시", "강남구 질문", model_version="cp100", temperature=0.1)
+        assert first == second and len(server.requests) == 1
+
+        # 모델 버전 / 샘플링 파라미터가 다르면 별도 항목
+        client.generate("지시", "강남구 질문", model_version="final", temperature=0.1)
+        client.generate("지시", "강남구 질문", model_version="cp100", temperature=0.1, max_new_tokens=128)
+        assert len(server.requests) == 3
+
+        # 임계값보다 높은 temperature는 캐시하지 않음
+        client.generate("지시", "강남구 질문", temperature=0.9)
+        client.generate("지시", "강남구 질문", temperature=0.9)
+        assert len(server.requests) == 5
+        assert cache.stats()["skipped"] == 2
+
+        # 스트리밍도 같은 캐시 사용
+        assert "".join(client.stream("지시", "강남구 질문", model_version="cp100", temperature=0.1)) == first
+
+        # 용량 초과 시 오래 안 쓴 항목부터 제거
+        for i in range(20):
+            client.generate("지시", f"서초구 질문 {i}", temperature=0.1)
+        stats = cache.stats()
+        assert stats["bytes"] <= 200 and stats["evictions"] > 0
+    finally:
+        server.shutdown()
+
+
+def test_coalesce_identical_requests():
+    server = start_fake_server(delay=0.3)
+    try:
+        client = LLMClient(api_url=server.url)
+        results = []
+
+        threads = [
+            threading.Thread(target=lambda: results.append(client.generate("지시", "같은 질문", temperature=0.9)))
+            for _ in range(5)
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(server.requests) == 1
+        assert len(set(results)) == 1 and len(results) == 5
+        assert client.stats()["coalescing"]["coalesced"] == 4
+    finally:
+        server.shutdown()
+
+
+def test_coalesced_waiter_survives_leader_cancel():
+    server = start_fake_server(delay=0.5)
+    try:
+        client = LLMClient(api_url=server.url)
+        result = {}
+
+        def follower():
+            time.sleep(0.1)
+            result["text"] = client.generate("지시", "취소 공유")
+
+        t = threading.Thread(target=follower)
+        t.start()
+        started = time.time()
+        try:
+            client.generate("지시", "취소 공유", is_cancelled=lambda: time.time() - started > 0.2)
+        except LLMError as e:
+            assert e.kind == "cancelled"
+        t.join()
+
+        assert result["text"].endswith("취소 공유")
+        assert len(server.requests) == 1
+    finally:
+        server.shutdown()
+
+
+def test_route_by_model_version():
+    final = start_fake_server(delay=0.2, models=("final",))
+    checkpoints = start_fake_server(delay=0.2, models=("cp100", "cp200"))
+    try:
+        router = ModelRouter(parse_backends(f"final={final.url};cp100,cp200={checkpoints.url}"))
+        client = LLMClient(router=router)
+
+        # 버전이 다른 요청이 모델 교체 없이 동시에 처리됨
+        results = {}
+        threads = [
+            threading.Thread(target=lambda v=v: results.__setitem__(v, client.generate("지시", "질문", model_version=v)))
+            for v in ("final", "cp100", "cp200")
+        ]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert results == {v: f"[{v}] 질문" for v in ("final", "cp100", "cp200")}
+        assert checkpoints.max_active == 2  # 같은 백엔드의 두 버전이 동시에 처리됨
+        assert [r["model_version"] for r in final.requests] == ["final"]
+        assert sorted(r["model_version"] for r in checkpoints.requests) == ["cp100", "cp200"]
+
+        try:
+            client.generate("지시", "질문", model_version="cp999")
+            assert False, "백엔드가 없는 버전은 실패해야 함"
+        except LLMError as e:
+            assert e.kind == "request"
+    finally:
+        final.shutdown()
+        checkpoints.shutdown()
+
+
+def test_unhealthy_backend_skipped():
+    import socket
+
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    dead_url = f"http://127.0.0.1:{sock.getsockname()[1]}/generate"
+    sock.close()
+
+    server = start_fake_server()
+    try:
+        router = ModelRouter({"final": [dead_url, server.url]}, unhealthy_after=1, cooldown=60)
+        client = LLMClient(router=router, retries=1, backoff_factor=0.01)
+
+        # 첫 요청은 죽은 백엔드에서 실패 -> 같은 풀의 다른 백엔드로 재시도
+        for i in range(4):
+            assert client.generate("지시", f"q{i}").endswith(f"q{i}")
+
+        dead, alive = router.status()["final"]["backends"]
+        assert not dead["healthy"] and dead["requests"] == 1
+        assert alive["requests"] == 4 and len(server.requests) == 4
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")
@@ -0,0 +1,121 @@
+"""
+qa_v2 비동기 경로 테스트: 대역 도구(지연 0.2초)로 동시 요청을 보내 한 프로세스에서 겹쳐서 처리되는지 확인
+
+    python -m pytest -q test_qa_async.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+import httpx
+from mcp.server.fastmcp import FastMCP
+from starlette.applications import Starlette
+
+from pybo.agent import qa_graph
+from pybo.agent.tool_transport import InProcessTransport
+from pybo.views import genai_async_views
+
+mcp = FastMCP("qa-async-test", log_level="WARNING")
+
+
+@mcp.tool()
+async def rag_search(question: str) -> str:
+    await asyncio.sleep(0.2)
+    return f"{question} 관련 지침"
+
+
+@mcp.tool()
+async def db_forecast_search(district: str = "전체", start_year: int = 2023, end_year: int = 2030) -> str:
+    await asyncio.sleep(0.2)
+    if district == "중구":
+        return f"{district}의 {start_year}~{end_year} 기간 데이터가 없습니다."
+    return "\n".join(f"- {y}년: {y - 1900}명" for y in range(start_year, end_year + 1))
+
+
+@mcp.tool()
+async def llama_generate(instruction: str, input_text: str, model_version: str = "final",
+                         temperature: float = 0.3, max_new_tokens: int = 512) -> str:
+    await asyncio.sleep(0.2)
+    return f"[{model_version}] {input_text.splitlines()[-1]}"
+
+
+def _with_stand_in_tools(fn):
+    transport = InProcessTransport(server=mcp)
+    original = qa_graph.get_tool_transport
+    qa_graph.get_tool_transport = lambda url: transport
+    try:
+        return fn()
+    finally:
+        qa_graph.get_tool_transport = original
+
+
+def test_run_qa_uses_shared_loop():
+    answers = _with_stand_in_tools(lambda: [qa_graph.run_qa("인건비 기준", model_version="cp100") for _ in range(2)])
+    assert answers == ["[cp100] 질문: 인건비 기준"] * 2
+
+
+def test_graph_routes_and_runs_branches_in_parallel():
+    async def run(question):
+        return await qa_graph.ainvoke_qa(question)
+
+    # 인사말: 검색 없이 바로 답변
+    greeting = _with_stand_in_tools(lambda: asyncio.run(run("안녕하세요")))
+    assert greeting["route"] == "greeting"
+    assert set(greeting["timings"]) == {"router", "answer", "total"}
+
+    # 단순 통계 조회: LLM 없이 DB 값으로 템플릿 답변
+    lookup = _with_stand_in_tools(lambda: asyncio.run(run("강남구 2025년 아동 인구 예측치 알려줘")))
+    assert lookup["route"] == "lookup" and lookup["district"] == "강남구" and lookup["years"] == [2025]
+    assert lookup["answer"].startswith("강남구의 2025년 지역아동센터 이용 아동 수 예측치입니다.")
+    assert "- 2025년: 125명" in lookup["answer"]
+    assert set(lookup["timings"]) == {"router", "lookup", "total"}
+
+    # 조회 결과가 없으면 템플릿 대신 문서 검색 후 LLM 답변
+    no_data = _with_stand_in_tools(lambda: asyncio.run(run("중구 2025년 아동 인구 예측치 알려줘")))
+    assert no_data["route"] == "docs" and "예측치입니다" not in no_data["answer"]
+    assert {"lookup", "rag", "join", "answer"} <= set(no_data["timings"])
+
+    # 통계가 필요한 분석 질문: rag_search와 db_forecast_search를 동시에 실행 후 합침
+    data = _with_stand_in_tools(lambda: asyncio.run(run("강남구 2025년 아동 인구 증가 원인 알려줘")))
+    assert data["route"] == "data" and data["district"] == "강남구" and data["years"] == [2025]
+    assert data["data_context"] == "- 2025년: 125명"
+    assert "[통계 데이터]\n- 2025년: 125명" in data["context"] and "[관련 법령/지침]" in data["context"]
+    assert {"router", "rag", "db", "join", "answer"} <= set(data["timings"])
+    # 두 검색(각 0.2초)이 겹쳐서 실행됨
+    assert data["timings"]["total"] < data["timings"]["rag"] + data["timings"]["db"] + data["timings"]["answer"]
+
+    # 일반 질문: 문서 검색만
+    docs = _with_stand_in_tools(lambda: asyncio.run(run("인건비 기준 알려줘")))
+    assert docs["route"] == "docs" and "db" not in docs["timings"]
+    assert docs["context"] == "인건비 기준 알려줘 관련 지침"
+
+
+def test_async_route_serves_concurrent_requests():
+    app = Starlette(routes=genai_async_views.routes)
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            empty = await client.post("/genai-api/qa_v2", json={"question": " "})
+            assert empty.status_code == 400
+
+            started = time.perf_counter()
+            responses = await asyncio.gather(*(
+                client.post("/genai-api/qa_v2", json={"question": f"질문 {i}"}) for i in range(20)
+            ))
+            return responses, time.perf_counter() - started
+
+    responses, elapsed = _with_stand_in_tools(lambda: asyncio.run(run()))
+    assert [r.json() for r in responses] == [{"success": True, "result": f"[final] 질문: 질문 {i}"} for i in range(20)]
+    assert elapsed < 1.5  # 순서대로 처리하면 20 x 0.4초
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")
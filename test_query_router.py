@@ -0,0 +1,91 @@
+"""
+규칙 기반 질문 분석 / 의도 분류 테스트 (DB, LLM 없이 실행)
+
+    python -m pytest -q test_query_router.py
+"""
+import os
+import sys
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+from pybo.service.query_router import lookup_answer, lookup_args, lookup_failed, match_query, route_query
+
+
+def test_match_query_extracts_entities_in_one_pass():
+    e = match_query("강남구와 송파구의 2030년, 2025년 아동 인구 추이")
+    assert e.districts == ["강남구", "송파구"] and e.district == "강남구"
+    assert e.years == [2025, 2030]
+    assert e.metrics == ["아동 인구", "인구", "추이"]
+    assert not e.greeting and e.doc_type is None
+
+
+def test_overlapping_keywords_are_all_found():
+    # "아동 수당": 지표("아동 수")와 인건비("수당")를 모두 찾음 (기존 `k in q` 검사와 같은 결과)
+    e = match_query("아동 수당 기준")
+    assert "아동 수" in e.metrics and e.doc_type == "salary"
+    # 문서 유형 우선순위: salary > support > law
+    assert match_query("아동복지법에 따른 인건비 지원").doc_types == ["salary", "support", "law"]
+    assert match_query("시행규칙 조문").doc_type == "law"
+    assert match_query("20251년 202호").years == []
+
+
+def test_years_parsed_or_flagged():
+    assert match_query("2018년과 2030년").years == [2018, 2030]
+    assert match_query("25년 아동 수").years == [2025]
+    assert match_query("강남구 2025~2027년").years == [2025, 2027]
+    assert match_query("3년 뒤 아동 수").unparsed_years == ["3년"]
+    assert match_query("작년 아동 수").unparsed_years == ["작년"]
+
+
+def test_greeting_only_for_short_questions():
+    assert match_query("Hello").greeting
+    assert route_query("안녕하세요").kind == "greeting"
+    assert not match_query("안녕하세요, 강남구 지역아동센터 인건비 기준을 알려주세요").greeting
+
+
+def test_route_query_intents():
+    assert route_query("강남구의 2025년 아동 인구 예측치를 알려줘").kind == "lookup"
+    assert route_query("서울시 전체 아동 수 전망").kind == "lookup"
+    # 원인/정책/비교, 여러 자치구, 예측 기간 밖 연도, 문서 유형 키워드가 섞이면 에이전트(data)로
+    assert route_query("강남구 아동 인구 변화에 맞춰서 필요한 인건비 지원 정책을 추천해줘").kind == "data"
+    assert route_query("강남구와 송파구 아동 수").kind == "data"
+    assert route_query("강남구 2021년 아동 인구").kind == "data"
+    assert route_query("강남구 25년 아동 수").kind == "lookup"
+    # 예측 기간 밖 연도, 해석할 수 없는 연도 표현은 예측치로 답하지 않음
+    assert route_query("강남구 2018년 아동 수").kind == "data"
+    assert route_query("강남구 18년 아동 수").kind == "data"
+    assert route_query("강남구 작년 아동 수").kind == "data"
+    assert route_query("강남구 3년 뒤 아동 수").kind == "data"
+    # 아동 수가 아닌 지표(전체 인구, 증감, 통계)는 에이전트로
+    assert route_query("강남구 2025년 인구").kind == "data"
+    assert route_query("강남구 아동 수 증가").kind == "data"
+    assert route_query("강남구 2025년 이용자 몇 명").kind == "lookup"
+    assert route_query("강남구 시설 현황").kind == "data"
+    assert route_query("지역아동센터 종사자 인건비 기준에 대해 알려줘").kind == "docs"
+
+
+def test_lookup_template_and_hint():
+    e = route_query("서울 전체 아동 인구 예측").entities
+    assert lookup_args(e) == {"district": "전체", "start_year": 2023, "end_year": 2030}
+    answer = lookup_answer(e, "2023년 서울시 전체 합계: 100명\n")
+    assert answer.startswith("서울시 전체의 2023~2030년 지역아동센터 이용 아동 수 예측치입니다.")
+    assert "2023년 서울시 전체 합계: 100명" in answer
+
+    assert match_query("강남구 2025~2027년 인건비 지원").hint() == "(질문 분석: 자치구=강남구, 연도=2025~2027, 문서유형=salary)"
+    assert match_query("지역아동센터란?").hint() == ""
+
+
+
+def test_lookup_failed_on_error_or_no_data():
+    assert lookup_failed("") and lookup_failed("DB 조회 중 오류 발생: timeout")
+    assert lookup_failed("강남구의 2025~2025 기간 데이터가 없습니다.")
+    assert not lookup_failed("강남구 예측 데이터:\n- 2025년: 120.0명")
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")
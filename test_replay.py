@@ -0,0 +1,112 @@
+"""
+기록/재생 테스트: 대역 LLM 서버 + 대역 도구로 에이전트 실행을 기록한 뒤,
+서버 없이 재생해도 같은 이벤트/답변이 같은 호출 수로 나오는지, 지연시간 배율이 적용되는지 확인
+
+    python -m pytest -q test_replay.py
+"""
+import os
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+from mcp.server.fastmcp import FastMCP
+
+from fake_runpod_server import start_fake_server
+from pybo.agent.tool_agent import ToolAgent
+from pybo.agent.tool_client import ToolClient
+from pybo.agent.tool_transport import InProcessTransport
+from pybo.service import replay
+from pybo.service.llm_client import LLMClient
+from pybo.service.tool_cache import ToolResultCache
+
+mcp = FastMCP("replay-test", log_level="WARNING")
+
+
+@mcp.tool()
+def db_forecast_search(district: str = "전체", start_year: int = 2023, end_year: int = 2030) -> str:
+    time.sleep(0.1)
+    return f"{district} 예측 데이터:\n- 2025년: 120명"
+
+
+class OfflineTransport:
+    """재생 중에는 실제 도구가 호출되면 안 됨"""
+    name = "offline"
+
+    async def acall(self, tool_name, arguments):
+        raise AssertionError(f"재생 중 실제 도구 호출: {tool_name}")
+
+    def call(self, tool_name, arguments):
+        raise AssertionError(f"재생 중 실제 도구 호출: {tool_name}")
+
+    def stats(self):
+        return {}
+
+
+def _agent(api_url: str, tool_transport) -> ToolAgent:
+    client = LLMClient(api_url=api_url, transport=replay.llm_transport())
+    agent = ToolAgent(llm_callback=client.generate, llm_stream_callback=client.stream)
+    agent.tool_client = ToolClient(
+        transport=replay.wrap_tool_transport(tool_transport), cache=ToolResultCache(enabled=False)
+    )
+    return agent
+
+
+def _run(agent: ToolAgent) -> list:
+    return list(agent.run_events("강남구의 2025년 아동 인구 예측치를 알려줘", instruction="지시", stream=True))
+
+
+def test_record_then_replay():
+    path = os.path.join(tempfile.mkdtemp(), "qa_db.jsonl")
+
+    server = start_fake_server(delay=0.2, token_delay=0.01)
+    server.responses = [
+        "통계가 필요하다.\nAction: db_forecast_search\nAction Input: {\"district\": \"강남구\"}",
+        "Final Answer: 강남구의 2025년 예측 아동 수는 120명입니다.",
+    ]
+    try:
+        replay.record_to(path)
+        recorded = _run(_agent(server.url, InProcessTransport(server=mcp)))
+    finally:
+        replay.stop()
+        server.shutdown()
+    assert recorded[-1] == ("done", "강남구의 2025년 예측 아동 수는 120명입니다.")
+
+    # 원래 지연시간으로 재생 (서버 없음)
+    try:
+        fixture = replay.replay_from(path, scale=1.0)
+        agent = _agent(replay.REPLAY_URL, OfflineTransport())
+        started = time.time()
+        assert _run(agent) == recorded
+        elapsed = time.time() - started
+        assert fixture.stats()["llm_calls"] == 2 and fixture.stats()["tool_calls"] == 1
+        assert elapsed >= 0.45  # LLM 0.2초 x 2 + 도구 0.1초
+
+        # 지연 없이 재생 -> 프레임워크 자체 비용만 남음
+        fixture.rewind()
+        fixture.scale = 0.0
+        started = time.time()
+        assert _run(agent) == recorded
+        assert time.time() - started < 0.4  # 원래 지연시간으로 재생하면 0.5초 이상
+
+        # 기록에 없는 요청은 바로 실패
+        try:
+            agent.llm_callback("지시", "기록에 없는 질문")
+            assert False, "ReplayMiss가 발생해야 함"
+        except replay.ReplayMiss:
+            pass
+    finally:
+        replay.stop()
+
+    # 끝나면 같은 프로세스에서 이후 만드는 클라이언트/도구 경로는 감싸지 않음
+    assert replay.mode() is None and replay.llm_transport() is None
+    transport = OfflineTransport()
+    assert replay.wrap_tool_transport(transport) is transport
+
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    print("test_record_then_replay: OK")
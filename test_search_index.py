@@ -0,0 +1,98 @@
+import os
+import sys
+import threading
+from types import SimpleNamespace
+
+# 프로젝트 루트를 경로에 추가 (DB 없이 실행 가능하도록 기본값 지정)
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+from pybo.service.search_index import NgramSearchIndex, tokenize
+from pybo.service.search_service import QnaSearchService
+
+
+def test_tokenize_bigrams():
+    assert tokenize("강남구의 센터") == ["강남", "남구", "구의", "센터"]
+    # 영문/숫자는 단어 그대로, 한 글자 한글은 그대로, 대소문자 무시
+    assert tokenize("RAG 2030년 돌봄 및") == ["rag", "20", "03", "30", "0년", "돌봄", "및"]
+    assert tokenize("") == [] and tokenize(None) == []
+
+
+def test_bm25_ranking():
+    index = NgramSearchIndex()
+    index.upsert(1, "강남구 돌봄", "지역아동센터 이용 아동 수")
+    index.upsert(2, "인건비 기준", "생활복지사 인건비 지급 기준")
+    index.upsert(3, "기타", "강남구 관련 공지")
+
+    # 제목 가중치 때문에 제목에 나온 문서가 먼저, 토큰이 없는 문서는 제외
+    assert [doc_id for doc_id, _ in index.search("강남구")] == [1, 3]
+    assert [doc_id for doc_id, _ in index.search("인건비")] == [2]
+    # 모든 토큰을 포함한 문서가 없으면 하나라도 포함한 문서
+    assert {doc_id for doc_id, _ in index.search("강남구 인건비")} == {1, 2, 3}
+    assert index.search("없는단어") == [] and index.search("") == []
+    assert [doc_id for doc_id, _ in index.search("강남구", limit=1)] == [1]
+
+
+def test_upsert_remove_add_text():
+    index = NgramSearchIndex()
+    index.upsert(1, "질문", "운영비 지원")
+    index.upsert(1, "질문", "인건비 지원")  # 같은 id는 교체
+    assert len(index) == 1
+    assert index.search("운영비") == [] and index.search("인건비")
+
+    index.add_text(1, "급여 기준 답변")
+    assert [doc_id for doc_id, _ in index.search("급여")] == [1]
+
+    index.remove(1)
+    index.remove(1)  # 없는 문서 삭제는 무시
+    assert len(index) == 0 and index.search("인건비") == []
+    assert index._postings == {} and index._total_len == 0
+
+
+def _question(doc_id, subject, content, answers=()):
+    return SimpleNamespace(id=doc_id, subject=subject, content=content,
+                           answer_set=[SimpleNamespace(content=a) for a in answers])
+
+
+def test_changes_during_build_are_applied():
+    loading, release = threading.Event(), threading.Event()
+
+    class SlowBuild(QnaSearchService):
+        @staticmethod
+        def _load_documents():
+            # DB 조회 결과 (답변 10은 이미 포함)
+            loading.set()
+            release.wait(5)
+            return [(1, "강남구 돌봄", "이용 아동", [(10, "운영비 답변")]), (2, "삭제될 질문", "마포구", [])]
+
+    service = SlowBuild(backend="memory")
+    service.on_question_saved(_question(9, "색인 전 질문", "종로구"))  # 생성 전 변경은 무시 (조회 결과에 포함됨)
+
+    builder = threading.Thread(target=service._ensure_built)
+    builder.start()
+    assert loading.wait(5)
+    # 조회 이후 commit된 변경
+    service.on_question_saved(_question(3, "새 질문", "인건비 기준"))
+    service.on_answer_created(SimpleNamespace(id=10, question_id=1, content="운영비 답변"))  # 조회 결과에 이미 있음
+    service.on_answer_created(SimpleNamespace(id=11, question_id=1, content="급여 답변"))
+    service.on_question_deleted(2)
+    release.set()
+    builder.join(5)
+
+    assert service._built and not service._pending
+    assert [doc_id for doc_id, _ in service.index.search("인건비")] == [3]
+    assert [doc_id for doc_id, _ in service.index.search("급여")] == [1]
+    assert service.index.search("마포구") == [] and service.index.search("종로구") == []
+    assert service.index._docs[1]["운영"] == 1  # 답변 10이 두 번 더해지지 않음
+
+    # 생성 후에는 바로 반영
+    service.on_question_saved(_question(4, "서초구", "정원"))
+    assert [doc_id for doc_id, _ in service.index.search("서초구")] == [4]
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")
@@ -0,0 +1,44 @@
+import os
+import sys
+import threading
+import time
+
+# 프로젝트 루트를 경로에 추가 (DB 없이 실행 가능하도록 기본값 지정)
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+from pybo.service.single_flight import SingleFlight
+
+
+def test_tool_call_coalescing():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(1)
+        release.wait(5)  # 나머지 호출이 모두 합류할 때까지 진행 중으로 유지
+        return "결과"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("db_forecast_search", slow))) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for _ in range(250):
+        if flights.as_dict()["coalesced"] == 3:
+            break
+        time.sleep(0.02)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert results == ["결과"] * 4 and len(calls) == 1
+    assert flights.as_dict() == {"leaders": 1, "coalesced": 3, "in_flight": 0}
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")
@@ -0,0 +1,139 @@
+import os
+import sys
+import threading
+
+# 프로젝트 루트를 경로에 추가 (DB 없이 실행 가능하도록 기본값 지정)
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+from fake_runpod_server import start_fake_server
+from pybo.agent.tool_agent import PlanStep, ToolAgent
+from pybo.service.llm_client import LLMClient
+from pybo.service.tool_cache import ToolResultCache
+
+
+def test_agent_streams_final_answer():
+    server = start_fake_server(token_delay=0.01)
+    try:
+        server.responses = ["상담 의도 파악\nFinal Answer: 안녕하세요! 무엇을 도와드릴까요?\nQ: 다음 질문"]
+        client = LLMClient(api_url=server.url)
+        agent = ToolAgent(llm_callback=client.generate, llm_stream_callback=client.stream)
+
+        events = list(agent.run_events("안녕?", instruction="지시"))
+        streamed = "".join(data for event, data in events if event == "token")
+
+        assert events[-1] == ("done", "안녕하세요! 무엇을 도와드릴까요?")
+        assert streamed.strip() == "안녕하세요! 무엇을 도와드릴까요?"
+        assert sum(1 for event, _ in events if event == "token") > 1
+    finally:
+        server.shutdown()
+
+
+def test_agent_plan_skips_react_loop():
+    llm_calls = []
+    agent = ToolAgent(llm_callback=lambda *a, **k: llm_calls.append(a) or "")
+
+    class RecordingTools:
+        calls = []
+
+        def call_tool_traced(self, name, args):
+            self.calls.append((name, args))
+            return ("2030년: 120명" if name == "db_forecast_search" else f"보고서({args['data_context']})"), "off"
+
+    agent.tool_client = RecordingTools()
+    plan = [
+        PlanStep("data", "db_forecast_search", lambda r: {"district": "강남구"}),
+        PlanStep("report", "create_report_task", lambda r: {"data_context": r["data"], "district": "강남구"}),
+    ]
+    events = list(agent.run_plan_events(plan, model_version="cp100"))
+
+    assert llm_calls == []  # 다음 Action을 묻는 LLM 호출 없음
+    assert [e for e, _ in events] == ["step", "step", "done"]
+    assert events[-1] == ("done", "보고서(2030년: 120명)")
+    assert RecordingTools.calls[1] == (
+        "create_report_task", {"data_context": "2030년: 120명", "district": "강남구", "model_version": "cp100"}
+    )
+
+
+def test_agent_plan_streams_final_generation():
+    from pybo.agent.prompts import REPORT_TASK_INSTRUCTION
+    from pybo.service import metrics
+
+    streamed_calls = []
+
+    def llm_stream(instruction, input_text, **kwargs):
+        streamed_calls.append((instruction, input_text, kwargs))
+        yield from ["- 요약: ", "증가 ", "추세"]
+
+    agent = ToolAgent(llm_callback=lambda *a, **k: "", llm_stream_callback=llm_stream)
+
+    class RecordingTools:
+        calls = []
+
+        def call_tool_traced(self, name, args):
+            self.calls.append(name)
+            return "2030년: 120명", "off"
+
+    agent.tool_client = RecordingTools()
+    plan = [
+        PlanStep("data", "db_forecast_search", lambda r: {"district": "강남구"}),
+        PlanStep("report", "create_report_task", lambda r: {"data_context": r["data"], "district": "강남구"}),
+    ]
+    events = list(agent.run_plan_events(plan, model_version="cp100", stream=True, task_type="report"))
+
+    # 생성 도구는 호출하지 않고 같은 지침으로 직접 스트리밍
+    assert RecordingTools.calls == ["db_forecast_search"]
+    assert [e for e, _ in events] == ["step", "step", "token", "token", "token", "done"]
+    assert events[-1] == ("done", "- 요약: 증가 추세")
+    instruction, input_text, kwargs = streamed_calls[0]
+    assert instruction == REPORT_TASK_INSTRUCTION and input_text == "지역: 강남구\n데이터:\n2030년: 120명"
+    assert kwargs["model_version"] == "cp100" and kwargs["task_type"] == "report"
+    assert 'genai_agent_iterations_count{task_type="report"}' in metrics.render()
+
+
+def test_agent_runs_actions_in_parallel():
+    from pybo.agent.tool_client import ToolClient
+
+    responses = iter([
+        "지침과 통계가 모두 필요하다.\n"
+        "Action: rag_search\nAction Input: {\"question\": \"돌봄 지원 기준\"}\n"
+        "Action: db_forecast_search\nAction Input: {\"district\": \"강남구\"}",
+        "Final Answer: 두 결과를 종합한 답변입니다.",
+    ])
+    inputs = []
+
+    def llm(instruction, llm_input, **kwargs):
+        inputs.append(llm_input)
+        return next(responses)
+
+    # 두 도구가 동시에 실행 중이어야 둘 다 통과 (순서대로 실행하면 시간 초과)
+    both_running = threading.Barrier(2, timeout=5)
+    overlapped = []
+
+    class SlowTools(ToolClient):
+        def _call_tool_sync(self, tool_name, arguments):
+            try:
+                both_running.wait()
+                overlapped.append(True)
+            except threading.BrokenBarrierError:
+                overlapped.append(False)
+            return f"{tool_name} 결과"
+
+    agent = ToolAgent(llm_callback=llm)
+    agent.tool_client = SlowTools(cache=ToolResultCache(enabled=False))
+
+    events = list(agent.run_events("강남구 돌봄 지원 기준과 아동 수 추이는?", instruction="지시", stream=False))
+
+    assert [d["action"] for e, d in events if e == "step"] == ["rag_search", "db_forecast_search"]
+    assert events[-1] == ("done", "두 결과를 종합한 답변입니다.")
+    assert len(inputs) == 2  # 도구 2개를 한 번의 루프에서 처리
+    assert "[1] rag_search: rag_search 결과" in inputs[1] and "[2] db_forecast_search" in inputs[1]
+    assert overlapped == [True, True]  # 두 도구가 동시에 실행됨
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")
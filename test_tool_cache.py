@@ -0,0 +1,95 @@
+import os
+import sys
+import time
+
+# 프로젝트 루트를 경로에 추가 (DB 없이 실행 가능하도록 기본값 지정)
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+from pybo.service.tool_cache import RAG_JSONL_PATH, RAG_PERSIST_DIRECTORY, ToolResultCache
+
+
+class CountingTransport:
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+
+    def call(self, tool_name, arguments):
+        from mcp import types
+
+        self.calls += 1
+        return types.CallToolResult(content=[types.TextContent(type="text", text=f"{tool_name} 결과")])
+
+
+def test_rag_paths_resolved_from_project_root():
+    assert RAG_PERSIST_DIRECTORY == os.path.join(BASE_DIR, "data", "chroma_db")
+    assert RAG_JSONL_PATH == os.path.join(BASE_DIR, "data", "jsonl", "rag_data.jsonl")
+
+
+def test_rag_search_cached_only_in_process():
+    from pybo.agent.tool_client import ToolClient
+
+    cache = ToolResultCache(ttls={"rag_search": 60, "db_forecast_search": 60}, version_ttl=0)
+    cache.set_version("rag_search", lambda: "local-index")
+    args = {"question": "운영비 지원 기준"}
+
+    # MCP 서버 호출: 이 프로세스의 파일로는 서버 인덱스 버전을 알 수 없으므로 캐시하지 않음
+    remote = ToolClient(transport=CountingTransport("mcp"), cache=cache)
+    assert remote.call_tool_traced("rag_search", args) == ("rag_search 결과", "off")
+    assert remote.call_tool_traced("rag_search", args)[1] == "off"
+    assert remote.transport.calls == 2 and cache.stats()["entries"] == 0
+    # DB 조회 도구는 그대로 캐시
+    remote.call_tool_traced("db_forecast_search", {"district": "강남구"})
+    assert remote.call_tool_traced("db_forecast_search", {"district": "강남구"})[1] == "hit"
+
+    local = ToolClient(transport=CountingTransport("inprocess"), cache=cache)
+    assert local.call_tool_traced("rag_search", args)[1] == "miss"
+    assert local.call_tool_traced("rag_search", args)[1] == "hit"
+    assert local.transport.calls == 1
+
+
+def test_tool_result_cache():
+    from pybo.agent.tool_client import ToolClient
+
+    version = {"db": "v1"}
+    cache = ToolResultCache(ttls={"db_forecast_search": 1.0}, version_ttl=0)
+    cache.set_version("db_forecast_search", lambda: version["db"])
+
+    class CountingTools(ToolClient):
+        calls = 0
+
+        def _call_tool_sync(self, tool_name, arguments):
+            CountingTools.calls += 1
+            return "MCP 도구 호출 오류 (llama_generate): 실패" if tool_name == "llama_generate" else f"{arguments} 결과"
+
+    client = CountingTools(cache=cache)
+    args = {"district": "강남구", "start_year": 2025}
+    assert client.call_tool_traced("db_forecast_search", args)[1] == "miss"
+    # 인자 순서/공백이 달라도 같은 항목
+    assert client.call_tool_traced("db_forecast_search", {"start_year": 2025, "district": " 강남구 "})[1] == "hit"
+    assert CountingTools.calls == 1
+
+    # 데이터 버전이 바뀌면 다시 조회
+    version["db"] = "v2"
+    assert client.call_tool_traced("db_forecast_search", args)[1] == "stale"
+    assert client.call_tool_traced("db_forecast_search", args)[1] == "hit"
+
+    # TTL 만료
+    time.sleep(1.1)
+    assert client.call_tool_traced("db_forecast_search", args)[1] == "stale"
+    assert CountingTools.calls == 3
+
+    # 캐시 대상이 아닌 도구 / 오류 결과는 저장하지 않음
+    assert client.call_tool_traced("llama_generate", {"prompt": "x"})[1] == "off"
+    cache.ttls["llama_generate"] = 60
+    client.call_tool_traced("llama_generate", {"prompt": "x"})
+    assert client.call_tool_traced("llama_generate", {"prompt": "x"})[1] == "miss"
+    assert cache.invalidate("db_forecast_search") == 1
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")
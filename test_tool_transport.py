@@ -0,0 +1,153 @@
+"""
+도구 호출 경로 동등성 테스트: MCP HTTP(연결 풀) vs 같은 프로세스 직접 호출(InProcessTransport)
+같은 FastMCP 서버를 HTTP로 띄운 것과 직접 호출한 것의 결과 텍스트 / 오류 여부가 같아야 한다.
+
+    python -m pytest -q test_tool_transport.py
+"""
+import os
+import socket
+import sys
+import threading
+import time
+
+BASE_DIR = os.path.abspath(os.path.dirname(__file__))
+sys.path.insert(0, BASE_DIR)
+os.environ.setdefault("DB_URI", "sqlite://")
+
+import uvicorn
+from mcp.server.fastmcp import FastMCP
+
+from pybo.agent.tool_client import ToolClient
+from pybo.agent.tool_transport import InProcessTransport, MCPHttpTransport
+
+# 실제 도구 서버와 같은 설정의 대역 서버 (RAG 모델/DB 없이 실행)
+mcp = FastMCP("parity", stateless_http=True, json_response=True, log_level="WARNING")
+
+
+@mcp.tool()
+def db_forecast_search(district: str = "전체", start_year: int = 2023, end_year: int = 2030) -> str:
+    return "\n".join(f"{district} {y}년: {y - 2000}명" for y in range(start_year, end_year + 1))
+
+
+@mcp.tool()
+async def create_report_task(data_context: str, district: str, model_version: str = "final") -> str:
+    return f"[{model_version}] {district} 보고서\n{data_context}"
+
+
+@mcp.tool()
+def broken_tool(question: str) -> str:
+    raise ValueError(f"처리 실패: {question}")
+
+
+@mcp.tool()
+def stats_tool(district: str) -> dict:
+    return {"district": district, "total": 120}
+
+
+@mcp.tool()
+def slow_sync_tool(seconds: float) -> str:
+    time.sleep(seconds)  # 임베딩 검색/DB 조회처럼 루프를 막는 동기 도구
+    return "ok"
+
+
+@mcp.tool()
+async def loop_id_tool() -> str:
+    import asyncio
+    return str(id(asyncio.get_running_loop()))
+
+
+CASES = [
+    ("db_forecast_search", {}),
+    ("db_forecast_search", {"district": "강남구", "start_year": 2025, "end_year": 2027}),
+    ("db_forecast_search", {"district": "중구", "start_year": "2026", "end_year": 2027}),  # 문자열 -> int 변환
+    ("db_forecast_search", {"start_year": "작년"}),                                         # 타입 오류
+    ("create_report_task", {"data_context": "2030년: 1명", "district": "종로구", "model_version": "cp100"}),
+    ("create_report_task", {"district": "종로구"}),                                          # 필수 인자 누락
+    ("broken_tool", {"question": "강남구"}),                                                 # 도구 내부 예외
+    ("stats_tool", {"district": "마포구"}),                                                  # dict 반환
+    ("no_such_tool", {}),                                                                  # 없는 도구
+]
+
+_http_url = None
+
+
+def _start_http_server() -> str:
+    global _http_url
+    if _http_url is None:
+        sock = socket.socket()
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+        sock.close()
+        server = uvicorn.Server(uvicorn.Config(mcp.streamable_http_app(), host="127.0.0.1", port=port, log_level="warning"))
+        threading.Thread(target=server.run, daemon=True).start()
+        while not server.started:
+            time.sleep(0.05)
+        _http_url = f"http://127.0.0.1:{port}/mcp"
+    return _http_url
+
+
+def _normalize(result) -> tuple:
+    return result.isError, [c.text for c in result.content], result.structuredContent
+
+
+def test_results_match():
+    http = MCPHttpTransport(_start_http_server())
+    local = InProcessTransport(server=mcp)
+    for tool_name, arguments in CASES:
+        expected = _normalize(http.call(tool_name, arguments))
+        actual = _normalize(local.call(tool_name, arguments))
+        assert actual == expected, f"{tool_name}({arguments}): http={expected} / inprocess={actual}"
+
+
+def test_async_results_match():
+    import asyncio
+
+    http = MCPHttpTransport(_start_http_server())
+    local = InProcessTransport(server=mcp)
+
+    async def run(transport):
+        return [_normalize(r) for r in await asyncio.gather(*(transport.acall(n, a) for n, a in CASES))]
+
+    assert asyncio.run(run(local)) == asyncio.run(run(http))
+
+
+def test_tool_client_text_matches():
+    http = ToolClient(transport=MCPHttpTransport(_start_http_server()))
+    local = ToolClient(transport=InProcessTransport(server=mcp))
+    for tool_name, arguments in CASES:
+        assert local.call_tool(tool_name, arguments) == http.call_tool(tool_name, arguments)
+
+    calls = [("db_forecast_search", {"district": "강남구"}), ("stats_tool", {"district": "마포구"})]
+    assert local.call_tools(calls) == http.call_tools(calls)
+
+
+def test_inprocess_sync_tools_do_not_block_loop():
+    import asyncio
+    from pybo.agent.tool_transport import in_process_call
+
+    local = InProcessTransport(server=mcp)
+
+    async def run():
+        started = time.perf_counter()
+        results = await asyncio.gather(*(local.acall("slow_sync_tool", {"seconds": 0.5}) for _ in range(4)))
+        return results, time.perf_counter() - started
+
+    results, elapsed = asyncio.run(run())
+    assert [r.content[0].text for r in results] == ["ok"] * 4
+    assert elapsed < 1.5  # 루프에서 그대로 실행하면 4 x 0.5초
+    assert not in_process_call()
+
+
+def test_inprocess_reuses_worker_loop():
+    # 호출마다 asyncio.run으로 루프를 새로 만들지 않고 작업 스레드의 루프를 계속 사용
+    local = InProcessTransport(server=mcp, max_workers=1)
+    loop_ids = {local.call("loop_id_tool", {}).content[0].text for _ in range(3)}
+    assert len(loop_ids) == 1
+    assert local.stats()["errors"] == 0
+
+
+if __name__ == "__main__":
+    for name, fn in list(globals().items()):
+        if name.startswith("test_") and callable(fn):
+            fn()
+            print(f"{name}: OK")